@@ -0,0 +1,186 @@
+"""Seeded synthetic orders"""
+
+import random
+from typing import Iterator
+
+from calculator import (
+    Order,
+    BaseItem,
+    Pipe,
+    RectPipe,
+    RoundPipe,
+    Costs,
+    Multipliers,
+    Cut,
+    Hole,
+    CustomHole,
+    RectHole,
+    RoundHole,
+    SheetItem,
+    TubeItem,
+    Tube,
+)
+
+
+costs = Costs(
+    welding=600 / 1000,
+    sundry=5,
+    cleaning=1000 / 1_000_000,
+    weld_cleaning=90 / 1000,
+    painting=260 / 1_000_000,
+    paint=280 / 1_000_000,
+    riveting=10,
+    bending=15,
+    countersink=20,
+    threading=20,
+    project=500,
+)
+multipliers = Multipliers(work=2.0, materials=1.3, manager=1.1, vat=1.2)
+
+
+def make_pipes() -> list[Pipe]:
+    return [
+        RectPipe(1.018, 4, 5, 34 / 1000, 75 / 1000, width=100, height=100),
+        RectPipe(0.6, 2, 4, 30 / 1000, 50 / 1000, width=40, height=20),
+        RectPipe(0.9, 3, 5, 32 / 1000, 60 / 1000, width=80, height=40),
+        RoundPipe(0.8, 3, 5, 40 / 1000, 60 / 1000, diameter=57),
+        RoundPipe(0.5, 2, 4, 30 / 1000, 40 / 1000, diameter=32),
+    ]
+
+
+class OrderGenerator:
+    """Realistic random orders, the same ones for the same seed.
+
+    Tube items mix rect and round pipes, straight, angled and missing end
+    cuts, bent tubes, holes and welded sheet parts. Every order also has a
+    separate sheet item. With `interned` cuts and holes are shared the way
+    `OrderLoader` shares them.
+    """
+
+    cuts = (90, 90, 90, 45, 45, 60, 30)
+
+    def __init__(self, seed: int = 0, interned: bool = False) -> None:
+        self.rng = random.Random(seed)
+        self.interned = interned
+        self.pipes = make_pipes()
+
+    def make_cut(self) -> Cut | None:
+        rng = self.rng
+        if rng.random() < 0.1:
+            return None
+        cut = Cut(
+            rng.choice(self.cuts),
+            side=rng.choice((None, "width", "height")),
+            welding_ratio=rng.choice((0.0, 0.5, 1.0)),
+        )
+        return cut.interned() if self.interned else cut
+
+    def make_hole(self) -> Hole:
+        rng = self.rng
+        kind = rng.random()
+        if kind < 0.5:
+            hole: Hole = RoundHole(
+                diameter=rng.choice((8, 10, 12.5)),
+                count=rng.randint(1, 4),
+                through=rng.random() < 0.3,
+            )
+        elif kind < 0.9:
+            hole = RectHole(
+                width=rng.choice((20, 40)),
+                height=rng.choice((30, 60)),
+                count=rng.randint(1, 2),
+                through=rng.random() < 0.3,
+            )
+        else:
+            hole = CustomHole(
+                length=round(rng.uniform(10, 300), 1), count=rng.randint(1, 3)
+            )
+        return hole.interned() if self.interned else hole
+
+    def make_tube(self) -> Tube:
+        rng = self.rng
+        holes = [
+            self.make_hole() for _ in range(rng.choice((0, 0, 1, 2, 3)))
+        ]
+        bended_cuts = [
+            Cut(90, rng.choice(("width", "height")))
+            for _ in range(rng.choice((0, 0, 0, 1, 2)))
+        ]
+        if self.interned:
+            bended_cuts = [cut.interned() for cut in bended_cuts]
+        return Tube(
+            rng.choice(self.pipes),
+            round(rng.uniform(200, 6000), 1),
+            is_ours=rng.random() < 0.9,
+            is_weld_cleaned=rng.random() < 0.3,
+            is_bended=bool(bended_cuts) or rng.random() < 0.2,
+            is_cleaned=rng.random() < 0.3,
+            holes=holes,
+            left_cut=self.make_cut(),
+            right_cut=self.make_cut(),
+            extra_bending_count=rng.choice((0, 0, 0, 1)),
+            threading_count=rng.choice((0, 0, 0, 2)),
+            bended_cuts=bended_cuts,
+            countersink_count=rng.choice((0, 0, 0, 1)),
+        )
+
+    def make_sheet_item(self, name: str) -> SheetItem:
+        rng = self.rng
+        return SheetItem(
+            name,
+            round(rng.uniform(50, 400), 2),
+            count=rng.randint(1, 4),
+            bending_count=rng.randint(0, 3),
+            sundries_count=rng.randint(0, 4),
+            riveting_count=rng.randint(0, 4),
+            extra_welding_length=rng.choice((0.0, 120.0)),
+            sheet_area=round(rng.uniform(1e4, 1e5)),
+            is_cleaned=rng.random() < 0.3,
+            is_painted=rng.random() < 0.3,
+        )
+
+    def make_tube_item(self, name: str, tubes: int) -> TubeItem:
+        rng = self.rng
+        return TubeItem(
+            name,
+            count=rng.randint(1, 20),
+            project_hours=rng.choice((0, 0, 1, 2.5)),
+            is_painted=rng.random() < 0.5,
+            is_cleaned=rng.random() < 0.2,
+            transport_cost=rng.choice((0.0, 0.0, 450.0)),
+            is_weld_cleaned=rng.random() < 0.3,
+            sundry_welding_count=rng.randint(0, 5),
+            extra_sundries_count=rng.randint(0, 3),
+            extra_riveting_count=rng.randint(0, 2),
+            tubes=[self.make_tube() for _ in range(tubes)],
+            sheet_items=[
+                self.make_sheet_item(f"{name}, лист {index + 1}")
+                for index in range(rng.choice((0, 0, 1, 2)))
+            ],
+        )
+
+    def make_order(self, number: int, items: int, tubes: int) -> Order:
+        tube_items: list[BaseItem] = [
+            self.make_tube_item(f"Изделие {index + 1}", tubes)
+            for index in range(items)
+        ]
+        return Order(
+            number,
+            f"Бенчмарк {number}",
+            items=[*tube_items, self.make_sheet_item("Лист")],
+        )
+
+
+def make_order(
+    items: int, tubes: int, seed: int = 0, interned: bool = False
+) -> Order:
+    """An order of `items` tube items with `tubes` tubes each."""
+    return OrderGenerator(seed, interned).make_order(1, items, tubes)
+
+
+def iter_orders(
+    count: int, items: int, tubes: int, seed: int = 0
+) -> Iterator[Order]:
+    generator = OrderGenerator(seed, interned=True)
+    for number in range(1, count + 1):
+        yield generator.make_order(number, items, tubes)
@@ -0,0 +1,25 @@
+"""Memory per priced tube"""
+
+import tracemalloc
+
+from .generators import costs, make_order, multipliers
+
+
+def measure(items: int, tubes: int, interned: bool) -> tuple[float, float]:
+    tracemalloc.start()
+    order = make_order(items, tubes, interned=interned)
+    built = tracemalloc.get_traced_memory()[0]
+    order.calculate(costs, multipliers)
+    priced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = items * tubes
+    return built / count, priced / count
+
+
+if __name__ == "__main__":
+    for interned in (False, True):
+        built, priced = measure(2_000, 10, interned)
+        print(
+            f"{'interned' if interned else 'plain':>8}: "
+            f"built {built:7.1f} B/tube, priced {priced:7.1f} B/tube"
+        )
@@ -0,0 +1,193 @@
+"""Calculation, report and memory scaling
+
+    python -m benchmarks.run --sizes 10x5 100x10 --output results.json
+    python -m benchmarks.run --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from calculator import Order
+
+from .generators import costs, make_order, multipliers
+
+
+T = TypeVar("T")
+
+SIZES = ((10, 5), (100, 10), (1_000, 10), (1_000, 50))
+
+
+def measure(
+    function: Callable[[T], Any], make_argument: Callable[[], T], repeat: int
+) -> float:
+    """Best time of `repeat` runs, each on a freshly made argument."""
+    best = float("inf")
+    for _ in range(repeat):
+        argument = make_argument()
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def build(size: tuple[int, int]) -> None:
+    make_order(*size)
+
+
+def calculate(order: Order) -> None:
+    order.calculate(costs, multipliers)
+
+
+def recalculate(order: Order) -> None:
+    order.items[0].tubes[0].length += 1  # type: ignore
+    order.recalculate()
+
+
+def geometry(order: Order) -> None:
+    for item in order.items:
+        for tube in getattr(item, "tubes", ()):
+            tube.incuts_count
+            tube.cutting_length
+            tube.welding_length
+            tube.area
+            tube.bended_cut_lengths
+
+
+def report(order: Order) -> None:
+    str(order)
+
+
+def calculated(items: int, tubes: int) -> Callable[[], Order]:
+    def make() -> Order:
+        order = make_order(items, tubes)
+        calculate(order)
+        return order
+
+    return make
+
+
+def measure_memory(items: int, tubes: int) -> tuple[float, float]:
+    tracemalloc.start()
+    try:
+        order = make_order(items, tubes, interned=True)
+        built = tracemalloc.get_traced_memory()[0]
+        calculate(order)
+        priced = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return built, priced
+
+
+def run_size(items: int, tubes: int, repeat: int) -> dict[str, Any]:
+    fresh = partial(make_order, items, tubes)
+    built, priced = measure_memory(items, tubes)
+    return {
+        "items": items,
+        "tubes": tubes,
+        "build": measure(build, lambda: (items, tubes), repeat),
+        "calculate": measure(calculate, fresh, repeat),
+        "recalculate": measure(recalculate, calculated(items, tubes), repeat),
+        "geometry": measure(geometry, fresh, repeat),
+        "report": measure(report, calculated(items, tubes), repeat),
+        "built_bytes": built,
+        "priced_bytes": priced,
+    }
+
+
+def get_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: list[tuple[int, int]], repeat: int) -> dict[str, Any]:
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": get_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": [run_size(items, tubes, repeat) for items, tubes in sizes],
+    }
+
+
+TIMINGS = ("build", "calculate", "recalculate", "geometry", "report")
+
+
+def format_results(
+    results: dict[str, Any], baseline: dict[str, Any] | None = None
+) -> str:
+    previous = {
+        (row["items"], row["tubes"]): row
+        for row in (baseline or {}).get("results", ())
+    }
+    header = f"{'size':>10}" + "".join(f"{name:>14}" for name in TIMINGS)
+    lines = [header + f"{'KiB/tube':>10}"]
+    for row in results["results"]:
+        old = previous.get((row["items"], row["tubes"]))
+        line = f"{row['items']:>6}x{row['tubes']:<3}"
+        for name in TIMINGS:
+            cell = f"{row[name] * 1000:.1f}ms"
+            if old is not None and old[name]:
+                cell += f" {row[name] / old[name]:.2f}"
+            line += f"{cell:>14}"
+        per_tube = row["priced_bytes"] / (row["items"] * row["tubes"]) / 1024
+        lines.append(line + f"{per_tube:>10.2f}")
+    return "\n".join(lines)
+
+
+def parse_size(value: str) -> tuple[int, int]:
+    items, _, tubes = value.partition("x")
+    try:
+        return int(items), int(tubes)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"size must look like 100x10, not {value!r}"
+        ) from None
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_size,
+        default=list(SIZES),
+        metavar="ITEMSxTUBES",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument(
+        "--compare", help="print time ratios against saved results"
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+
+    results = run(args.sizes, args.repeat)
+    print(format_results(results, baseline))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+            fp.write("\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
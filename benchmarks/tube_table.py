@@ -0,0 +1,53 @@
+"""TubeTable vs per-object Tube properties"""
+
+import time
+
+from calculator import Order, TubeTable
+
+from .generators import make_order
+
+
+def per_object(order: Order) -> None:
+    for item in order.items:
+        for tube in getattr(item, "tubes", ()):
+            tube.incuts_count
+            tube.cutting_length
+            tube.welding_length
+            tube.area
+            tube.cutting_cost
+
+
+def vectorized(order: Order) -> None:
+    compute(TubeTable.from_order(order))
+
+
+def compute(table: TubeTable) -> None:
+    table.incuts_count
+    table.cutting_length
+    table.welding_length
+    table.area
+    table.cutting_cost
+
+
+def measure(function, make_argument, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        argument = make_argument()
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    print(f"{'tubes':>7} {'objects':>10} {'table':>10} {'compute':>10}")
+    for items in (100, 1_000, 10_000):
+        objects = measure(per_object, lambda: make_order(items, 5))
+        table = measure(vectorized, lambda: make_order(items, 5))
+        order = make_order(items, 5)
+        prebuilt = measure(compute, lambda: TubeTable.from_order(order))
+        print(
+            f"{items * 5:>7} {objects * 1000:8.1f}ms {table * 1000:8.1f}ms "
+            f"{prebuilt * 1000:8.1f}ms  "
+            f"x{objects / table:.1f} / x{objects / prebuilt:.1f}"
+        )
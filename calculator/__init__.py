@@ -1,9 +1,34 @@
+from .hashing import *
+from .cached import Cached as Cached
 from .price import Price as Price
+from .price import PriceBreakdown as PriceBreakdown
+from .price import TubePricing as TubePricing
+from .price import ItemPricing as ItemPricing
+from .price import OrderPricing as OrderPricing
 from .costs import Costs as Costs
 from .multipliers import Multipliers as Multipliers
+from .summary import *
 from .hole import *
 from .cut import *
 from .pipe import *
 from .tube import Tube as Tube
+from .tube import TubeGroup as TubeGroup
+from .tube import group_tubes as group_tubes
 from .item import *
-from .order import Order as Order
\ No newline at end of file
+from .order import Order as Order
+from .order import price_order as price_order
+from .table import TubeTable as TubeTable
+from .parallel import *
+from .price_cache import *
+from .stock import *
+from .loader import *
+from .profiling import *
+from .scenarios import *
+from .service import *
+from .catalog import *
+from .export import *
+from .schedule import *
+from .rates import *
+from .nesting import *
+from .archive import *
+from .analytics import *
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""Batch quoting, export and the quoting service
+
+    python -m calculator quote orders.jsonl more.csv --costs rates.json
+    python -m calculator export orders.jsonl --costs rates.json -o tables
+    python -m calculator serve --costs rates.json --port 8000
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor
+from concurrent.futures import wait
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Mapping, TextIO
+
+from . import (
+    Costs,
+    Multipliers,
+    OrderExporter,
+    Pipe,
+    PipeCatalog,
+    PriceBreakdown,
+    QuoteService,
+    TABLE_WRITERS,
+    export_specs,
+    init_worker,
+    iter_file_specs,
+    load_rates,
+    quote_specs,
+)
+
+
+Quote = dict[str, Any]
+
+
+class JsonLinesQuoteWriter:
+    def __init__(self, fp: TextIO) -> None:
+        self.fp = fp
+
+    def write(self, quote: Quote) -> None:
+        if "error" in quote:
+            return
+        for item in quote["items"]:
+            self.fp.write(
+                json.dumps(
+                    {
+                        "order": quote["number"],
+                        "order_name": quote["name"],
+                        "item": item["name"],
+                        "count": item["count"],
+                        "prices": item["prices"],
+                    },
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+        self.fp.flush()
+
+
+class CsvQuoteWriter:
+    columns = [
+        "order",
+        "order_name",
+        "item",
+        "count",
+        *(
+            f"{operation}_{part}"
+            for operation in PriceBreakdown.operations
+            for part in ("cost", "final")
+        ),
+    ]
+
+    def __init__(self, fp: TextIO) -> None:
+        self.fp = fp
+        self.writer = csv.writer(fp)
+        self.writer.writerow(self.columns)
+
+    def write(self, quote: Quote) -> None:
+        if "error" in quote:
+            return
+        for item in quote["items"]:
+            prices = item["prices"]
+            self.writer.writerow(
+                [
+                    quote["number"],
+                    quote["name"],
+                    item["name"],
+                    item["count"],
+                    *(
+                        prices[operation][part] if operation in prices else ""
+                        for operation in PriceBreakdown.operations
+                        for part in ("cost", "final")
+                    ),
+                ]
+            )
+        self.fp.flush()
+
+
+WRITERS = {"jsonl": JsonLinesQuoteWriter, "csv": CsvQuoteWriter}
+
+
+@dataclass
+class QuoteTotals:
+    orders: int = 0
+    items: int = 0
+    errors: int = 0
+    cost: float = 0.0
+    final: float = 0.0
+
+    def add(self, quote: Quote) -> None:
+        if "error" in quote:
+            self.errors += 1
+            return
+        self.orders += 1
+        self.items += len(quote["items"])
+        self.cost += quote["total"]["cost"]
+        self.final += quote["total"]["final"]
+
+    def format(self, elapsed: float) -> str:
+        throughput = self.orders / elapsed if elapsed else 0.0
+        return (
+            f"{self.orders} заказов, {self.items} изделий, "
+            f"{self.cost:,.2f} руб -> {self.final:,.2f} руб\n"
+            f"{elapsed:,.2f} с, {throughput:,.1f} заказов/с"
+            + (f", {self.errors} ошибок" if self.errors else "")
+        )
+
+
+def iter_quotes(
+    specs: Iterable[dict[str, Any]],
+    costs: Costs,
+    multipliers: Multipliers,
+    jobs: int,
+    chunk_size: int,
+    pipes: Mapping[str, Pipe] | None = None,
+    function: Callable[..., list[Quote]] = quote_specs,
+) -> Iterator[Quote]:
+    """Results of `function`, `quote_specs` or `export_specs`, for `specs`
+    in the order they are finished.
+
+    Orders are read and submitted lazily, at most two chunks per process
+    are waiting at a time, so memory does not grow with the input.
+    """
+    iterator = iter(specs)
+    chunks = iter(lambda: list(islice(iterator, chunk_size)), [])
+    if jobs == 1:
+        init_worker(pipes)
+        for chunk in chunks:
+            yield from function(chunk, costs, multipliers)
+        return
+
+    with ProcessPoolExecutor(
+        jobs, initializer=init_worker, initargs=(pipes,)
+    ) as executor:
+        pending: set[Future[list[Quote]]] = set()
+        for chunk in chunks:
+            pending.add(
+                executor.submit(function, chunk, costs, multipliers)
+            )
+            if len(pending) >= jobs * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in wait(pending).done:
+            yield from future.result()
+
+
+def quote(args: argparse.Namespace) -> int:
+    costs, multipliers = load_rates(args.costs)
+    pipes = PipeCatalog.load(args.catalog) if args.catalog else None
+    specs = (spec for path in args.files for spec in iter_file_specs(path))
+
+    output_format = args.format
+    if output_format is None:
+        suffix = Path(args.output).suffix if args.output else ""
+        output_format = "csv" if suffix == ".csv" else "jsonl"
+    if args.output:
+        fp = open(args.output, "w", encoding="utf-8", newline="")
+    else:
+        fp = sys.stdout
+
+    totals = QuoteTotals()
+    start = perf_counter()
+    try:
+        writer = WRITERS[output_format](fp)
+        for quote in iter_quotes(
+            specs, costs, multipliers, args.jobs, args.chunk_size, pipes
+        ):
+            totals.add(quote)
+            if "error" in quote:
+                print(
+                    f"заказ {quote['number']}: {quote['error']}",
+                    file=sys.stderr,
+                )
+            writer.write(quote)
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+    print(totals.format(perf_counter() - start), file=sys.stderr)
+    return 1 if totals.errors else 0
+
+
+def export(args: argparse.Namespace) -> int:
+    costs, multipliers = load_rates(args.costs)
+    pipes = PipeCatalog.load(args.catalog) if args.catalog else None
+    specs = (spec for path in args.files for spec in iter_file_specs(path))
+
+    errors = 0
+    start = perf_counter()
+    writer = TABLE_WRITERS[args.format](args.output, args.prefix)
+    with OrderExporter(writer, args.chunk_rows) as exporter:
+        for result in iter_quotes(
+            specs,
+            costs,
+            multipliers,
+            args.jobs,
+            args.chunk_size,
+            pipes,
+            export_specs,
+        ):
+            if "error" in result:
+                errors += 1
+                print(
+                    f"заказ {result['number']}: {result['error']}",
+                    file=sys.stderr,
+                )
+            else:
+                exporter.add_rows(result["tables"])
+    elapsed = perf_counter() - start
+    counts = ", ".join(
+        f"{table}: {count}" for table, count in exporter.counts.items()
+    )
+    print(
+        f"{counts}\n{elapsed:,.2f} с"
+        + (f", {errors} ошибок" if errors else ""),
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    costs, multipliers = load_rates(args.costs)
+    pipes = PipeCatalog.load(args.catalog) if args.catalog else None
+    service = QuoteService(costs, multipliers, args.jobs, pipes=pipes)
+    print(f"http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m calculator", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    quote_parser = commands.add_parser(
+        "quote", help="price order files, one line per item"
+    )
+    quote_parser.add_argument(
+        "files", nargs="+", help="orders as JSON Lines or .csv"
+    )
+    quote_parser.add_argument(
+        "--output", "-o", help="write to a .csv or .jsonl file"
+    )
+    quote_parser.add_argument("--format", choices=sorted(WRITERS))
+    quote_parser.add_argument("--chunk-size", type=int, default=16)
+    quote_parser.set_defaults(handler=quote, jobs=os.cpu_count() or 1)
+
+    export_parser = commands.add_parser(
+        "export", help="price order files into order, item, tube and "
+        "operation tables"
+    )
+    export_parser.add_argument(
+        "files", nargs="+", help="orders as JSON Lines or .csv"
+    )
+    export_parser.add_argument(
+        "--output", "-o", required=True, help="directory for the tables"
+    )
+    export_parser.add_argument("--prefix", default="")
+    export_parser.add_argument(
+        "--format", choices=sorted(TABLE_WRITERS), default="csv"
+    )
+    export_parser.add_argument("--chunk-size", type=int, default=16)
+    export_parser.add_argument(
+        "--chunk-rows", type=int, default=65_536, help="rows per write"
+    )
+    export_parser.set_defaults(handler=export, jobs=os.cpu_count() or 1)
+
+    serve_parser = commands.add_parser("serve", help="run the HTTP service")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.set_defaults(handler=serve, jobs=None)
+
+    for subparser in (quote_parser, export_parser, serve_parser):
+        subparser.add_argument(
+            "--costs",
+            required=True,
+            help='JSON file {"costs": {...}, "multipliers": {...}}',
+        )
+        subparser.add_argument(
+            "--catalog", help="pipe catalogue, .csv or .npz snapshot"
+        )
+        subparser.add_argument(
+            "--jobs", "-j", type=int, help="worker processes"
+        )
+
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # stdout was closed early, as by `| head`: stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, RuntimeError) as error:
+        parser.exit(2, f"{parser.prog}: {error}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
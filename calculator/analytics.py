@@ -0,0 +1,331 @@
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from . import Order, OrderArchive, PriceBreakdown, get_records
+
+
+@dataclass
+class Aggregate:
+    """Result of a group-by: one row per distinct combination of `keys`,
+    in ascending key order."""
+
+    keys: dict[str, np.ndarray]
+    values: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.values.values()), ()))
+
+    @property
+    def rows(self) -> list[tuple[object, ...]]:
+        columns = [
+            _to_list(column)
+            for column in (*self.keys.values(), *self.values.values())
+        ]
+        return list(zip(*columns))
+
+    def to_dict(self) -> dict[tuple[object, ...], tuple[float, ...]]:
+        """Values by key, as tuples even for a single key or value."""
+        size = len(self.keys)
+        return {row[:size]: row[size:] for row in self.rows}
+
+    def __str__(self) -> str:
+        lines = ["\t".join([*self.keys, *self.values])]
+        size = len(self.keys)
+        for row in self.rows:
+            lines.append(
+                "\t".join(
+                    [
+                        *(str(value) for value in row[:size]),
+                        *(f"{value:,.2f}" for value in row[size:]),
+                    ]
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+
+class Portfolio:
+    """Calculated orders as the columns of the `orders`, `items` and
+    `tubes` tables of an archive, for vectorized group-by queries.
+
+    The sheet items of tube items are split off the `items` into a
+    `sheet_items` table, so item totals count them once, as part of their
+    tube item. The archive tables are kept as they are, memory-mapped ones
+    are not copied: the rows of `items` and `sheet_items` are gathered per
+    column, and the columns referring to item rows are renumbered to
+    match, `parent` to the row of the tube item and `first_sheet_item` to
+    a row of `sheet_items`. The record arrays of the properties keep the
+    archive numbering, `get_column` gives the renumbered one.
+
+    Besides the archive fields every table has the derived columns
+    `order_number`, `month` (the order date truncated to the month, NaT
+    without a date) and `quantity` (pieces: 1 per order, `count` per item,
+    the item count per tube, per sheet item `count` times that of its
+    tube item). Tubes also have the `is_painted` flag of their item.
+
+        portfolio = Portfolio.from_orders(orders)
+        portfolio.group_by("tubes", ["pipe", "month"], "welding_length")
+        portfolio.share("items", "area", "is_painted")
+        portfolio.operation_totals("margin")
+    """
+
+    # table of the archive every table has its rows in
+    sources = {
+        "orders": "orders",
+        "items": "items",
+        "sheet_items": "items",
+        "tubes": "tubes",
+    }
+
+    def __init__(
+        self, orders: np.ndarray, items: np.ndarray, tubes: np.ndarray
+    ) -> None:
+        self.tables = {"orders": orders, "items": items, "tubes": tubes}
+        self._columns: dict[tuple[str, str], np.ndarray] = {}
+        nested = items["parent"] >= 0
+        # archive rows of the tables taking a part of one, None for all
+        self._rows: dict[str, np.ndarray | None] = {
+            "items": None,
+            "sheet_items": np.flatnonzero(nested),
+        }
+        if len(self._rows["sheet_items"]):
+            self._rows["items"] = np.flatnonzero(~nested)
+            # new row of every archive item row, the rows before it kept
+            rows = np.concatenate(([0], np.cumsum(~nested)))
+            sheet_rows = np.concatenate(([0], np.cumsum(nested)))
+            self._columns[("orders", "first_item")] = rows[
+                orders["first_item"]
+            ]
+            self._columns[("tubes", "item")] = rows[tubes["item"]]
+            self._columns[("items", "first_sheet_item")] = sheet_rows[
+                self._gather("items", "first_sheet_item")
+            ]
+            self._columns[("sheet_items", "parent")] = rows[
+                self._gather("sheet_items", "parent")
+            ]
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order]) -> "Portfolio":
+        return cls(**get_records(orders))
+
+    @classmethod
+    def from_archive(cls, archive: OrderArchive) -> "Portfolio":
+        return cls(**archive.tables)
+
+    @property
+    def orders(self) -> np.ndarray:
+        return self.tables["orders"]
+
+    @property
+    def items(self) -> np.ndarray:
+        return self._get_rows("items")
+
+    @property
+    def sheet_items(self) -> np.ndarray:
+        return self._get_rows("sheet_items")
+
+    @property
+    def tubes(self) -> np.ndarray:
+        return self.tables["tubes"]
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def get_size(self, table: str) -> int:
+        """Number of rows of a table."""
+        if table not in self.sources:
+            raise KeyError(f"unknown table {table!r}")
+        rows = self._rows.get(table)
+        if rows is None:
+            return len(self.tables[self.sources[table]])
+        return len(rows)
+
+    def get_column(self, table: str, name: str) -> np.ndarray:
+        """Field or derived column of a table, derived and gathered ones
+        are computed once."""
+        if table not in self.sources:
+            raise KeyError(f"unknown table {table!r}")
+        key = (table, name)
+        column = self._columns.get(key)
+        if column is not None:
+            return column
+        fields = self.tables[self.sources[table]].dtype.fields
+        assert fields is not None
+        if name not in fields:
+            column = self._derive(table, name)
+        elif self._rows.get(table) is None:
+            return self.tables[self.sources[table]][name]
+        else:
+            column = self._gather(table, name)
+        self._columns[key] = column
+        return column
+
+    def group_by(
+        self,
+        table: str,
+        keys: Sequence[str],
+        values: str | Sequence[str],
+        weight: str | None = "quantity",
+    ) -> Aggregate:
+        """Sums of `values` columns of `table` per distinct combination of
+        `keys` columns, each multiplied by the `weight` column, `quantity`
+        by default, so per-piece values add up to totals."""
+        if isinstance(values, str):
+            values = [values]
+        codes, size, index = self._group(table, keys)
+        weights = (
+            None if weight is None else self.get_column(table, weight)
+        )
+        sums = {}
+        for name in values:
+            column = self.get_column(table, name).astype(np.float64)
+            if weights is not None:
+                column = column * weights
+            sums[name] = np.bincount(codes, weights=column, minlength=size)
+        return Aggregate(self._group_keys(table, keys, index), sums)
+
+    def share(
+        self,
+        table: str,
+        value: str,
+        flag: str,
+        weight: str | None = "quantity",
+    ) -> float:
+        """Part of the total of `value` that rows with `flag` set have, like
+        the painted share of the area."""
+        column = self.get_column(table, value).astype(np.float64)
+        if weight is not None:
+            column = column * self.get_column(table, weight)
+        total = column.sum()
+        if not total:
+            return 0.0
+        return float(column[self.get_column(table, flag)].sum() / total)
+
+    def get_operation_prices(self, part: str = "final") -> np.ndarray:
+        """Price `part` of every item for all pieces, one column per
+        operation of `PriceBreakdown.operations`. The margin is the final
+        price less the cost."""
+        if part == "cost":
+            prices = self.get_column("items", "price_cost")
+        elif part == "final":
+            prices = self.get_column("items", "price_final")
+        elif part == "margin":
+            prices = self.get_column("items", "price_final") - self.get_column(
+                "items", "price_cost"
+            )
+        else:
+            raise ValueError(f"unknown price part {part!r}")
+        return prices * self.get_column("items", "count")[:, None]
+
+    def operation_totals(
+        self, part: str = "final", by: Sequence[str] = ()
+    ) -> Aggregate:
+        """Totals of a price `part` per operation, and per the `by` columns
+        of the items. Operations no item prices are left out."""
+        prices = self.get_operation_prices(part)
+        codes, size, index = self._group("items", by)
+        operations = np.flatnonzero(
+            np.bitwise_or.reduce(
+                self.get_column("items", "price_mask"), initial=0
+            )
+            >> np.arange(len(PriceBreakdown.operations), dtype=np.uint32)
+            & 1
+        )
+        totals = np.zeros((size, len(operations)))
+        for column, operation in enumerate(operations.tolist()):
+            totals[:, column] = np.bincount(
+                codes, weights=prices[:, operation], minlength=size
+            )
+        keys = {
+            name: np.repeat(column, len(operations))
+            for name, column in self._group_keys("items", by, index).items()
+        }
+        keys["operation"] = np.tile(
+            np.array(PriceBreakdown.operations, dtype=object)[operations], size
+        )
+        return Aggregate(keys, {part: totals.ravel()})
+
+    def _group(
+        self, table: str, keys: Sequence[str]
+    ) -> tuple[np.ndarray, int, np.ndarray]:
+        # group of every row, the number of groups and a row of each group
+        rows = self.get_size(table)
+        if not keys:
+            size = 1 if rows else 0
+            return np.zeros(rows, dtype=np.intp), size, np.zeros(size, int)
+        codes = []
+        sizes = []
+        for name in keys:
+            _, inverse = np.unique(
+                self.get_column(table, name), return_inverse=True
+            )
+            codes.append(inverse.ravel())
+            sizes.append(int(inverse.max(initial=-1)) + 1)
+        combined = np.ravel_multi_index(codes, sizes) if rows else codes[0]
+        _, index, inverse = np.unique(
+            combined, return_index=True, return_inverse=True
+        )
+        return inverse.ravel(), len(index), index
+
+    def _group_keys(
+        self, table: str, keys: Sequence[str], index: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        return {name: self.get_column(table, name)[index] for name in keys}
+
+    def _get_rows(self, table: str) -> np.ndarray:
+        rows = self._rows[table]
+        if rows is None:
+            return self.tables[self.sources[table]]
+        return self.tables[self.sources[table]][rows]
+
+    def _gather(self, table: str, name: str) -> np.ndarray:
+        # archive field of the rows of a table, without the renumbering
+        column = self.tables[self.sources[table]][name]
+        rows = self._rows[table]
+        return column if rows is None else column[rows]
+
+    def _derive(self, table: str, name: str) -> np.ndarray:
+        if table == "orders":
+            if name == "order_number":
+                return self.get_column("orders", "number")
+            if name == "month":
+                return self.get_column("orders", "date").astype("M8[M]")
+            if name == "quantity":
+                return np.ones(self.get_size("orders"), dtype=np.int64)
+        elif table == "items":
+            if name == "quantity":
+                return self.get_column("items", "count")
+            if name in ("order_number", "month"):
+                return self.get_column("orders", name)[
+                    self.get_column("items", "order")
+                ]
+        elif table == "sheet_items":
+            if name == "quantity":
+                parent = self.get_column("sheet_items", "parent")
+                return (
+                    self.get_column("sheet_items", "count")
+                    * self.get_column("items", "count")[parent]
+                )
+            if name in ("order_number", "month"):
+                return self.get_column("orders", name)[
+                    self.get_column("sheet_items", "order")
+                ]
+        elif table == "tubes":
+            item = self.get_column("tubes", "item")
+            if name in ("order_number", "month", "quantity", "is_painted"):
+                return self.get_column("items", name)[item]
+            if name == "order":
+                return self.get_column("items", "order")[item]
+        raise KeyError(f"{table} have no column {name!r}")
+
+
+def _to_list(column: np.ndarray) -> list[object]:
+    if column.dtype.kind == "S":
+        return [value.decode("utf-8", "ignore") for value in column.tolist()]
+    if column.dtype.kind == "M":
+        return [str(value) for value in column]
+    return column.tolist()
+
+
+__all__ = ["Aggregate", "Portfolio"]
@@ -0,0 +1,477 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+from typing import IO, Any, Iterable
+
+import numpy as np
+
+from . import (
+    BaseItem,
+    Order,
+    PriceBreakdown,
+    RoundPipe,
+    SheetItem,
+)
+
+
+MAGIC = b"TUBEARC\x00"
+VERSION = 2
+NAME_SIZE = 96
+ALIGNMENT = 64
+
+OPERATIONS = PriceBreakdown.operations
+# values of the item `kind` and tube `pipe_kind` fields
+ITEM_KINDS = ("tube", "sheet")
+PIPE_KINDS = ("rect", "round")
+
+ORDER_DTYPE = np.dtype(
+    [
+        ("number", "i8"),
+        ("name", f"S{NAME_SIZE}"),
+        ("date", "M8[D]"),
+        ("first_item", "i8"),
+        ("item_count", "i4"),
+        ("incuts_count", "i8"),
+        ("cutting_length", "f8"),
+        ("cutting_cost", "f8"),
+        ("adjusted_cutting_price", "f8"),
+        ("cost", "f8"),
+        ("final", "f8"),
+    ]
+)
+ITEM_DTYPE = np.dtype(
+    [
+        ("order", "i8"),
+        ("parent", "i8"),
+        ("kind", "u1"),
+        ("is_painted", "?"),
+        ("is_cleaned", "?"),
+        ("is_weld_cleaned", "?"),
+        ("count", "i4"),
+        ("name", f"S{NAME_SIZE}"),
+        ("first_tube", "i8"),
+        ("tube_count", "i4"),
+        ("first_sheet_item", "i8"),
+        ("sheet_item_count", "i4"),
+        ("incuts_count", "i8"),
+        ("cutting_length", "f8"),
+        ("cutting_cost", "f8"),
+        ("welding_length", "f8"),
+        ("area", "f8"),
+        ("bending_count", "i8"),
+        ("sundries_count", "i8"),
+        ("riveting_count", "i8"),
+        ("countersink_count", "i8"),
+        ("threading_count", "i8"),
+        ("pipe_cost", "f8"),
+        ("carrying_cost", "f8"),
+        ("sheet_cost", "f8"),
+        ("cleaning_area", "f8"),
+        ("weld_cleaning_length", "f8"),
+        ("price_mask", "u4"),
+        ("price_cost", "f8", (len(OPERATIONS),)),
+        ("price_final", "f8", (len(OPERATIONS),)),
+    ]
+)
+TUBE_DTYPE = np.dtype(
+    [
+        ("item", "i8"),
+        ("pipe", "S32"),
+        ("pipe_kind", "u1"),
+        ("is_ours", "?"),
+        ("is_cleaned", "?"),
+        ("is_weld_cleaned", "?"),
+        ("length", "f8"),
+        ("incuts_count", "i4"),
+        ("bending_count", "i4"),
+        ("cutting_length", "f8"),
+        ("welding_length", "f8"),
+        ("area", "f8"),
+        ("pipe_cost", "f8"),
+        ("cutting_cost", "f8"),
+        ("carrying_cost", "f8"),
+    ]
+)
+TABLES = {"orders": ORDER_DTYPE, "items": ITEM_DTYPE, "tubes": TUBE_DTYPE}
+
+_header = struct.Struct("<8sII")
+
+
+class OrderRecords:
+    """Rows of the archive tables for calculated orders, converted to
+    structured arrays by `take`. Items refer to their order and tubes to
+    their item by row, orders and items to their first item and tube, with
+    rows counted from the first order added.
+
+    The sheet items of a tube item have rows of their own after the items
+    of the order, with the row of the tube item as `parent` and their
+    count per tube item. The `parent` of an order's own items is -1, and
+    only they count toward `item_count` and the order's prices.
+    """
+
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(TABLES, 0)
+        self._rows: dict[str, list[tuple[Any, ...]]] = {
+            name: [] for name in TABLES
+        }
+
+    def __len__(self) -> int:
+        return len(self._rows["orders"])
+
+    def add(self, order: Order) -> None:
+        order_row = self.counts["orders"] + len(self._rows["orders"])
+        items = self._rows["items"]
+        tubes = self._rows["tubes"]
+        first_item = self.counts["items"] + len(items)
+        cost = final = 0.0
+        nested: list[tuple[int, SheetItem]] = []
+        for item in order.items:
+            total = item.prices["total"]
+            cost += total.cost * item.count
+            final += total.final * item.count
+            item_row = self.counts["items"] + len(items)
+            first_tube = self.counts["tubes"] + len(tubes)
+            for tube in getattr(item, "tubes", ()):
+                tubes.append(
+                    (
+                        item_row,
+                        str(tube.pipe).encode()[:32],
+                        int(isinstance(tube.pipe, RoundPipe)),
+                        tube.is_ours,
+                        tube.is_cleaned,
+                        tube.is_weld_cleaned,
+                        tube.length,
+                        tube.incuts_count,
+                        tube.bending_count,
+                        tube.cutting_length,
+                        tube.welding_length,
+                        tube.area,
+                        tube.pipe_cost,
+                        tube.cutting_cost,
+                        tube.carrying_cost,
+                    )
+                )
+            tube_count = self.counts["tubes"] + len(tubes) - first_tube
+            sheet_items = getattr(item, "sheet_items", ())
+            first_sheet_item = first_item + len(order.items) + len(nested)
+            nested.extend((item_row, sheet) for sheet in sheet_items)
+            items.append(
+                _item_record(
+                    item,
+                    order_row,
+                    -1,
+                    first_tube,
+                    tube_count,
+                    first_sheet_item,
+                    len(sheet_items),
+                )
+            )
+        first_tube = self.counts["tubes"] + len(tubes)
+        for parent, sheet in nested:
+            items.append(
+                _item_record(
+                    sheet,
+                    order_row,
+                    parent,
+                    first_tube,
+                    0,
+                    self.counts["items"] + len(items),
+                    0,
+                )
+            )
+
+        summary = order.summary
+        self._rows["orders"].append(
+            (
+                order.number,
+                _encode(order.name),
+                np.datetime64(order.date, "D")
+                if order.date is not None
+                else np.datetime64("NaT", "D"),
+                first_item,
+                len(order.items),
+                summary.incuts_count,
+                summary.cutting_length,
+                summary.cutting_cost,
+                summary.adjusted_cutting_price,
+                cost,
+                final,
+            )
+        )
+
+    def take(self) -> dict[str, np.ndarray]:
+        """Tables of the orders added since the last call."""
+        tables = {}
+        for name, dtype in TABLES.items():
+            rows = self._rows[name]
+            tables[name] = np.array(rows, dtype=dtype)
+            self.counts[name] += len(rows)
+            self._rows[name] = []
+        return tables
+
+
+class ArchiveWriter:
+    """Writes calculated orders to an archive file read by `OrderArchive`.
+
+    Records are converted in chunks of `chunk_size` orders and spooled to
+    temporary files. The archive itself is written by `close` to a
+    temporary file next to `path` and then renamed, so a reader never sees
+    a partial archive. Leaving the `with` block on an exception writes
+    nothing.
+
+    The file starts with `MAGIC`, the format version and the length of a
+    JSON header that gives the offset, record count and NumPy dtype of the
+    `orders`, `items` and `tubes` tables, which follow, each aligned to
+    `ALIGNMENT` bytes. Rows link up as in `OrderRecords`.
+    """
+
+    def __init__(self, path: str | Path, chunk_size: int = 1024) -> None:
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.records = OrderRecords()
+        self._files: dict[str, IO[bytes]] = {
+            name: tempfile.TemporaryFile() for name in TABLES
+        }
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self.discard()
+
+    @property
+    def counts(self) -> dict[str, int]:
+        return self.records.counts
+
+    def add(self, order: Order) -> None:
+        self.records.add(order)
+        if len(self.records) >= self.chunk_size:
+            self.flush()
+
+    def add_all(self, orders: Iterable[Order]) -> None:
+        for order in orders:
+            self.add(order)
+
+    def flush(self) -> None:
+        if not len(self.records):
+            return
+        for name, table in self.records.take().items():
+            self._files[name].write(table.tobytes())
+
+    def close(self) -> None:
+        if not self._files:
+            return
+        self.flush()
+        tables: dict[str, dict[str, Any]] = {}
+        offset = 0
+        for name, dtype in TABLES.items():
+            offset = _align(offset)
+            tables[name] = {
+                "offset": offset,
+                "count": self.counts[name],
+                "dtype": np.lib.format.dtype_to_descr(dtype),
+            }
+            offset += self.counts[name] * dtype.itemsize
+        # table offsets are relative to the end of the header
+        header = json.dumps({"tables": tables}).encode()
+        start = _align(_header.size + len(header))
+        temporary = self.path.with_name(
+            f".{self.path.name}.{os.getpid()}.{id(self):x}"
+        )
+        try:
+            with temporary.open("wb") as fp:
+                fp.write(_header.pack(MAGIC, VERSION, len(header)))
+                fp.write(header)
+                for name in TABLES:
+                    fp.write(bytes(start + tables[name]["offset"] - fp.tell()))
+                    spool = self._files[name]
+                    spool.seek(0)
+                    shutil.copyfileobj(spool, fp)
+            os.replace(temporary, self.path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+        finally:
+            self.discard()
+
+    def discard(self) -> None:
+        """Drop the spooled records without writing the archive."""
+        for spool in self._files.values():
+            spool.close()
+        self._files = {}
+
+
+class OrderArchive:
+    """Read-only view of an archive written by `ArchiveWriter`.
+
+    The file is memory-mapped and `orders`, `items` and `tubes` are NumPy
+    structured arrays over it, so scanning them copies nothing and builds
+    no orders. `price_cost` and `price_final` of the items are indexed by
+    `PriceBreakdown.operations`, a bit of `price_mask` is set for every
+    operation the item prices.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode="r")
+        magic, version, size = _header.unpack_from(self._data)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an order archive")
+        if version != VERSION:
+            raise ValueError(f"unsupported archive version {version}")
+        header = json.loads(
+            bytes(self._data[_header.size : _header.size + size])
+        )
+        start = _align(_header.size + size)
+        self.tables: dict[str, np.ndarray] = {}
+        for name, table in header["tables"].items():
+            dtype = np.lib.format.descr_to_dtype(
+                [tuple(field) for field in table["dtype"]]
+            )
+            begin = start + table["offset"]
+            end = begin + table["count"] * dtype.itemsize
+            self.tables[name] = self._data[begin:end].view(dtype)
+
+    @property
+    def orders(self) -> np.ndarray:
+        return self.tables["orders"]
+
+    @property
+    def items(self) -> np.ndarray:
+        return self.tables["items"]
+
+    @property
+    def tubes(self) -> np.ndarray:
+        return self.tables["tubes"]
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def get_prices(self, operation: str) -> tuple[np.ndarray, np.ndarray]:
+        """Cost and final price of `operation` for every item, per unit."""
+        index = PriceBreakdown.index[operation]
+        return (
+            self.items["price_cost"][:, index],
+            self.items["price_final"][:, index],
+        )
+
+    def get_breakdown(self, item: int) -> PriceBreakdown:
+        record = self.items[item]
+        prices = PriceBreakdown()
+        prices.cost[:] = array("d", record["price_cost"].tobytes())
+        prices.final[:] = array("d", record["price_final"].tobytes())
+        prices.mask = int(record["price_mask"])
+        return prices
+
+    def get_order_items(self, order: int) -> np.ndarray:
+        record = self.orders[order]
+        first = int(record["first_item"])
+        return self.items[first : first + int(record["item_count"])]
+
+    def get_item_tubes(self, item: int) -> np.ndarray:
+        record = self.items[item]
+        first = int(record["first_tube"])
+        return self.tubes[first : first + int(record["tube_count"])]
+
+    def get_sheet_items(self, item: int) -> np.ndarray:
+        record = self.items[item]
+        first = int(record["first_sheet_item"])
+        return self.items[first : first + int(record["sheet_item_count"])]
+
+
+def get_records(orders: Iterable[Order]) -> dict[str, np.ndarray]:
+    """Archive tables of calculated orders, in memory."""
+    records = OrderRecords()
+    for order in orders:
+        records.add(order)
+    return records.take()
+
+
+def write_archive(
+    orders: Iterable[Order], path: str | Path, chunk_size: int = 1024
+) -> dict[str, int]:
+    """Write calculated orders to `path`, return the record counts."""
+    with ArchiveWriter(path, chunk_size) as writer:
+        writer.add_all(orders)
+    return writer.counts
+
+
+def decode_names(names: np.ndarray) -> list[str]:
+    return [name.decode("utf-8", "ignore") for name in names.tolist()]
+
+
+def _item_record(
+    item: BaseItem,
+    order: int,
+    parent: int,
+    first_tube: int,
+    tube_count: int,
+    first_sheet_item: int,
+    sheet_item_count: int,
+) -> tuple[Any, ...]:
+    summary = item.summary
+    prices = item.prices
+    return (
+        order,
+        parent,
+        int(isinstance(item, SheetItem)),
+        item.is_painted,
+        item.is_cleaned,
+        item.is_weld_cleaned,
+        item.count,
+        _encode(item.name),
+        first_tube,
+        tube_count,
+        first_sheet_item,
+        sheet_item_count,
+        summary.incuts_count,
+        summary.cutting_length,
+        summary.cutting_cost,
+        summary.welding_length,
+        summary.area,
+        summary.bending_count,
+        summary.sundries_count,
+        summary.riveting_count,
+        summary.countersink_count,
+        summary.threading_count,
+        summary.pipe_cost,
+        summary.carrying_cost,
+        summary.sheet_cost,
+        summary.cleaning_area,
+        summary.weld_cleaning_length,
+        prices.mask,
+        prices.cost,
+        prices.final,
+    )
+
+
+def _encode(name: str) -> bytes:
+    # cut on a character boundary, the field holds NAME_SIZE bytes
+    encoded = name.encode()
+    if len(encoded) <= NAME_SIZE:
+        return encoded
+    return encoded[:NAME_SIZE].decode("utf-8", "ignore").encode()
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+__all__ = [
+    "ORDER_DTYPE",
+    "ITEM_DTYPE",
+    "TUBE_DTYPE",
+    "OrderRecords",
+    "ArchiveWriter",
+    "OrderArchive",
+    "get_records",
+    "write_archive",
+    "decode_names",
+]
@@ -0,0 +1,109 @@
+from functools import cached_property
+from typing import Any, Iterable
+from weakref import ref
+
+from .hashing import calculate_content_hash
+
+
+class Cached:
+    """Drops `cached_property` values when a dataclass field is assigned.
+
+    Objects listed in `_dependencies` fields (directly or as list elements)
+    are told about this object, so that invalidating them also invalidates
+    it: a tube invalidates its items, an item invalidates its order. Lists
+    are not watched, methods that mutate them must call `invalidate`.
+
+    Invalidation also marks the object dirty until `mark_clean` is called,
+    which lets an order re-price only the items edited since.
+    """
+
+    _dependencies: tuple[str, ...] = ()
+    _cached_names: frozenset[str] = frozenset()
+    _dirty: bool = True
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._cached_names = frozenset(
+            name
+            for klass in cls.__mro__
+            for name, value in vars(klass).items()
+            if isinstance(value, cached_property)
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self._dependencies:
+            for child in _cached_children(self.__dict__.get(name)):
+                child._remove_dependent(self)
+            object.__setattr__(self, name, value)
+            for child in _cached_children(value):
+                child._add_dependent(self)
+        else:
+            object.__setattr__(self, name, value)
+        if name in self.__dataclass_fields__:  # type: ignore
+            self.invalidate()
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop("_dependents", None)
+        for name in self._cached_names:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        for name in self._dependencies:
+            for child in _cached_children(state.get(name)):
+                child._add_dependent(self)
+
+    @cached_property
+    def content_hash(self) -> str:
+        return calculate_content_hash(self)
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def mark_clean(self) -> None:
+        self._dirty = False
+
+    def invalidate(self) -> None:
+        attributes = self.__dict__
+        attributes["_dirty"] = True
+        if not attributes.keys().isdisjoint(self._cached_names):
+            for name in self._cached_names:
+                attributes.pop(name, None)
+        dependents = attributes.get("_dependents")
+        if dependents:
+            for reference in list(dependents.values()):
+                dependent = reference()
+                if dependent is not None:
+                    dependent.invalidate()
+
+    def _append(self, name: str, child: "Cached") -> None:
+        getattr(self, name).append(child)
+        child._add_dependent(self)
+        self.invalidate()
+
+    def _add_dependent(self, dependent: "Cached") -> None:
+        dependents: dict[int, ref[Cached]] = self.__dict__.setdefault(
+            "_dependents", {}
+        )
+        size = len(dependents)
+        if size >= 64 and size & (size - 1) == 0:
+            for key, reference in list(dependents.items()):
+                if reference() is None:
+                    del dependents[key]
+        dependents[id(dependent)] = ref(dependent)
+
+    def _remove_dependent(self, dependent: "Cached") -> None:
+        dependents = self.__dict__.get("_dependents")
+        if dependents:
+            dependents.pop(id(dependent), None)
+
+
+def _cached_children(value: Any) -> Iterable[Cached]:
+    if isinstance(value, Cached):
+        return (value,)
+    if isinstance(value, list):
+        return [child for child in value if isinstance(child, Cached)]  # type: ignore
+    return ()
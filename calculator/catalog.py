@@ -0,0 +1,227 @@
+import csv
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, TextIO
+
+import numpy as np
+
+from . import Pipe, RectPipe, RoundPipe
+
+
+PROFILE_DTYPE = np.dtype(
+    [
+        ("kind", "u1"),
+        ("width", "f8"),
+        ("height", "f8"),
+        ("thickness", "f8"),
+        ("cost", "f8"),
+        ("incut_cost", "f8"),
+        ("cutting_cost", "f8"),
+        ("carrying_cost", "f8"),
+    ]
+)
+KINDS = ("rect", "round")
+EPSILON = 1e-9
+
+
+class PipeCatalog(Mapping[str, Pipe]):
+    """Supplier pipe profiles indexed by designation and dimensions.
+
+    Profiles are kept in one structured array, round pipes store their
+    diameter as both width and height. `Pipe` instances are made on first
+    use and shared afterwards, so the catalog can be handed to
+    `OrderLoader` as its `pipes`. A designation that occurs more than once
+    refers to its first profile.
+
+    The CSV has the columns `type` (`rect` or `round`), `width` and
+    `height` or `diameter`, `thickness`, `cost`, `incut_cost`,
+    `cutting_cost` and `carrying_cost`. `save` writes a binary snapshot
+    that `load` reads without parsing the CSV again.
+    """
+
+    def __init__(
+        self, profiles: np.ndarray, designations: np.ndarray | None = None
+    ) -> None:
+        self.profiles = profiles
+        if designations is None:
+            designations = np.array(
+                [_designation(profile) for profile in profiles], dtype=str
+            )
+        self.designations = designations
+        self._index: dict[str, int] = {}
+        for index, designation in enumerate(designations.tolist()):
+            self._index.setdefault(designation, index)
+        small_side = np.minimum(profiles["width"], profiles["height"])
+        large_side = np.maximum(profiles["width"], profiles["height"])
+        # by kind, then smallest first, for `find_larger`
+        self._by_size = np.lexsort(
+            (
+                profiles["cost"],
+                profiles["thickness"],
+                small_side + large_side,
+                profiles["kind"],
+            )
+        )
+        self._sized_kinds = profiles["kind"][self._by_size]
+        self._sized_perimeter = (small_side + large_side)[self._by_size]
+        self._sized_small_side = small_side[self._by_size]
+        self._sized_large_side = large_side[self._by_size]
+        self._sized_thickness = profiles["thickness"][self._by_size]
+        self._by_thickness = np.argsort(profiles["thickness"], kind="stable")
+        self._thickness = profiles["thickness"][self._by_thickness]
+        self._pipes: dict[int, Pipe] = {}
+
+    @classmethod
+    def from_csv(cls, fp: TextIO) -> "PipeCatalog":
+        rows = []
+        for line, row in enumerate(csv.DictReader(fp), start=2):
+            try:
+                kind = KINDS.index(row["type"])
+                if kind == 1:
+                    width = height = float(row["diameter"])
+                else:
+                    width, height = float(row["width"]), float(row["height"])
+                rows.append(
+                    (
+                        kind,
+                        width,
+                        height,
+                        float(row["thickness"]),
+                        float(row["cost"]),
+                        float(row["incut_cost"]),
+                        float(row["cutting_cost"]),
+                        float(row["carrying_cost"]),
+                    )
+                )
+            except (KeyError, ValueError, TypeError) as error:
+                raise ValueError(f"line {line}: invalid profile: {error}")
+        return cls(np.array(rows, dtype=PROFILE_DTYPE))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PipeCatalog":
+        """Read a CSV catalogue or a snapshot written by `save`."""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path, allow_pickle=False) as snapshot:
+                return cls(snapshot["profiles"], snapshot["designations"])
+        with path.open(encoding="utf-8", newline="") as fp:
+            return cls.from_csv(fp)
+
+    def save(self, path: str | Path) -> None:
+        with open(path, "wb") as fp:
+            np.savez(
+                fp, profiles=self.profiles, designations=self.designations
+            )
+
+    def __getitem__(self, designation: str) -> Pipe:
+        return self.get_pipe(self._index[designation])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, designation: object) -> bool:
+        return designation in self._index
+
+    def get_pipe(self, index: int) -> Pipe:
+        pipe = self._pipes.get(index)
+        if pipe is None:
+            pipe = self._pipes[index] = _make_pipe(self.profiles[index])
+        return pipe
+
+    def find_larger(
+        self,
+        pipe_type: str,
+        width: float,
+        height: float | None = None,
+        thickness: float | None = None,
+    ) -> Pipe | None:
+        """The smallest profile of `pipe_type` that fits around a `width` by
+        `height` section, or a `width` diameter, in either orientation.
+
+        Smaller means a smaller perimeter, then a thinner wall, then a lower
+        cost. With `thickness` the wall must be at least as thick.
+        """
+        if height is None:
+            height = width
+        small, large = sorted((width, height))
+        kind = KINDS.index(pipe_type)
+        start = np.searchsorted(self._sized_kinds, kind, "left")
+        stop = np.searchsorted(self._sized_kinds, kind, "right")
+        # a profile around the section has at least its half perimeter,
+        # the smaller ones are skipped without looking at them
+        start += np.searchsorted(
+            self._sized_perimeter[start:stop],
+            small + large - 2 * EPSILON,
+            "left",
+        )
+        # the first fitting profile is usually near, so the rest are
+        # checked in growing blocks rather than all at once
+        block = 64
+        while start < stop:
+            end = min(start + block, stop)
+            mask = (self._sized_small_side[start:end] >= small - EPSILON) & (
+                self._sized_large_side[start:end] >= large - EPSILON
+            )
+            if thickness is not None:
+                mask &= self._sized_thickness[start:end] >= thickness - EPSILON
+            if mask.any():
+                position = start + int(np.argmax(mask))
+                return self.get_pipe(int(self._by_size[position]))
+            start = end
+            block *= 2
+        return None
+
+    def with_thickness(
+        self, low: float, high: float, pipe_type: str | None = None
+    ) -> list[Pipe]:
+        """Profiles with a wall from `low` to `high` inclusive, thinnest
+        first."""
+        start = np.searchsorted(self._thickness, low - EPSILON, "left")
+        stop = np.searchsorted(self._thickness, high + EPSILON, "right")
+        indices = self._by_thickness[start:stop]
+        if pipe_type is not None:
+            kinds = self.profiles["kind"][indices]
+            indices = indices[kinds == KINDS.index(pipe_type)]
+        return [self.get_pipe(int(index)) for index in indices]
+
+
+def _number(value: float) -> float:
+    # integral values are kept int, so that designations read "100x100x4"
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _designation(profile: np.void) -> str:
+    thickness = _number(profile["thickness"])
+    if profile["kind"] == 1:
+        return f"D{_number(profile['width'])}x{thickness}"
+    first, second = sorted(
+        (_number(profile["width"]), _number(profile["height"]))
+    )
+    return f"{first}x{second}x{thickness}"
+
+
+def _make_pipe(profile: np.void) -> Pipe:
+    rates = [
+        _number(profile[name])
+        for name in (
+            "cost",
+            "thickness",
+            "incut_cost",
+            "cutting_cost",
+            "carrying_cost",
+        )
+    ]
+    if profile["kind"] == 1:
+        return RoundPipe(*rates, diameter=_number(profile["width"]))
+    return RectPipe(
+        *rates,
+        width=_number(profile["width"]),
+        height=_number(profile["height"]),
+    )
+
+
+__all__ = ["PipeCatalog"]
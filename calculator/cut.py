@@ -1,11 +1,22 @@
 from dataclasses import dataclass
-from typing import Literal
+from typing import Any, Literal
+from weakref import WeakValueDictionary
 
-@dataclass
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Cut:
     angle: int = 90
     side: Literal['width', 'height'] | None = None
     welding_ratio: float = 0.0
 
     def __str__(self) -> str:
-        return f'Рез {self.angle}°'
\ No newline at end of file
+        return f'Рез {self.angle}°'
+
+    def interned(self) -> "Cut":
+        """An equal cut shared with the cuts interned before, while any of
+        them is still in use."""
+        key = (self.angle, self.side, self.welding_ratio)
+        return _interned.setdefault(key, self)
+
+
+# keyed by field values, so that only the values hold the cuts
+_interned: WeakValueDictionary[tuple[Any, ...], Cut] = WeakValueDictionary()
@@ -0,0 +1,358 @@
+import csv
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable, TextIO
+
+from . import (
+    BaseItem,
+    Costs,
+    Multipliers,
+    Order,
+    Tube,
+    TubeItem,
+    RoundPipe,
+    calculate_specs,
+)
+
+
+Row = tuple[Any, ...]
+
+# column names and types of the exported tables, prices are per item unit
+TABLES: dict[str, tuple[tuple[str, type], ...]] = {
+    "orders": (
+        ("order", int),
+        ("name", str),
+        ("items", int),
+        ("incuts_count", int),
+        ("cutting_length", float),
+        ("cutting_cost", float),
+        ("adjusted_cutting_price", float),
+        ("cost", float),
+        ("final", float),
+    ),
+    "items": (
+        ("order", int),
+        ("item", int),
+        ("parent", int),
+        ("name", str),
+        ("type", str),
+        ("count", int),
+        ("incuts_count", int),
+        ("cutting_length", float),
+        ("cutting_cost", float),
+        ("welding_length", float),
+        ("area", float),
+        ("bending_count", int),
+        ("sundries_count", int),
+        ("riveting_count", int),
+        ("countersink_count", int),
+        ("threading_count", int),
+        ("cost", float),
+        ("final", float),
+    ),
+    "tubes": (
+        ("order", int),
+        ("item", int),
+        ("tube", int),
+        ("pipe", str),
+        ("pipe_type", str),
+        ("length", float),
+        ("is_ours", bool),
+        ("incuts_count", int),
+        ("cutting_length", float),
+        ("welding_length", float),
+        ("area", float),
+        ("bending_count", int),
+        ("pipe_cost", float),
+        ("cutting_cost", float),
+        ("carrying_cost", float),
+    ),
+    "operations": (
+        ("order", int),
+        ("item", int),
+        ("operation", str),
+        ("cost", float),
+        ("final", float),
+    ),
+}
+
+
+def get_order_rows(order: Order) -> dict[str, list[Row]]:
+    """Rows of every table for a calculated order.
+
+    The sheet items of tube items follow the order's own items, numbered
+    on from them, with the number of their tube item as `parent` and
+    their count per tube item. The `parent` of the order's own items is
+    -1, and only they count toward the order's `items` and prices.
+    """
+    tables: dict[str, list[Row]] = {name: [] for name in TABLES}
+    cost = final = 0.0
+    nested: list[tuple[int, BaseItem]] = []
+    for index, item in enumerate(order.items):
+        total = item.prices["total"]
+        cost += total.cost * item.count
+        final += total.final * item.count
+        _add_item_rows(tables, order.number, index, -1, item)
+        if isinstance(item, TubeItem):
+            tables["tubes"].extend(
+                _tube_row(order.number, index, position, tube)
+                for position, tube in enumerate(item.tubes)
+            )
+            nested.extend((index, sheet) for sheet in item.sheet_items)
+    for index, (parent, sheet) in enumerate(nested, len(order.items)):
+        _add_item_rows(tables, order.number, index, parent, sheet)
+    summary = order.summary
+    tables["orders"].append(
+        (
+            order.number,
+            order.name,
+            len(order.items),
+            summary.incuts_count,
+            summary.cutting_length,
+            summary.cutting_cost,
+            summary.adjusted_cutting_price,
+            cost,
+            final,
+        )
+    )
+    return tables
+
+
+def export_specs(
+    specs: Iterable[dict[str, Any]], costs: Costs, multipliers: Multipliers
+) -> list[dict[str, Any]]:
+    """Price order specifications and return their rows, for process
+    pools like `quote_specs`."""
+    results = []
+    for result in calculate_specs(specs, costs, multipliers):
+        if isinstance(result, Order):
+            result = {
+                "number": result.number,
+                "name": result.name,
+                "tables": get_order_rows(result),
+            }
+        results.append(result)
+    return results
+
+
+class TableWriter(ABC):
+    """Writes the export tables chunk by chunk, one file per table."""
+
+    suffix = ""
+
+    def __init__(self, directory: str | Path, prefix: str = "") -> None:
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, table: str) -> Path:
+        return self.directory / f"{self.prefix}{table}{self.suffix}"
+
+    @abstractmethod
+    def write(self, table: str, rows: list[Row]) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class CsvTableWriter(TableWriter):
+    suffix = ".csv"
+
+    def __init__(self, directory: str | Path, prefix: str = "") -> None:
+        super().__init__(directory, prefix)
+        self._files: dict[str, TextIO] = {}
+        self._writers: dict[str, Any] = {}
+        for table, columns in TABLES.items():
+            fp = self._files[table] = self.get_path(table).open(
+                "w", encoding="utf-8", newline=""
+            )
+            writer = self._writers[table] = csv.writer(fp)
+            writer.writerow(name for name, _ in columns)
+
+    def write(self, table: str, rows: list[Row]) -> None:
+        self._writers[table].writerows(rows)
+
+    def close(self) -> None:
+        for fp in self._files.values():
+            fp.close()
+
+
+class ParquetTableWriter(TableWriter):
+    """Parquet files with one row group per chunk, needs `pyarrow`."""
+
+    suffix = ".parquet"
+
+    def __init__(self, directory: str | Path, prefix: str = "") -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "Parquet export requires pyarrow, install it with "
+                "`pip install pyarrow` or export to CSV"
+            ) from None
+        super().__init__(directory, prefix)
+        types = {
+            int: pa.int64(),
+            float: pa.float64(),
+            str: pa.string(),
+            bool: pa.bool_(),
+        }
+        self._pa = pa
+        self._schemas = {
+            table: pa.schema([(name, types[type_]) for name, type_ in columns])
+            for table, columns in TABLES.items()
+        }
+        self._writers = {
+            table: pq.ParquetWriter(self.get_path(table), schema)
+            for table, schema in self._schemas.items()
+        }
+
+    def write(self, table: str, rows: list[Row]) -> None:
+        schema = self._schemas[table]
+        columns = list(zip(*rows))
+        batch = self._pa.RecordBatch.from_arrays(
+            [
+                self._pa.array(column, type=field.type)
+                for column, field in zip(columns, schema)
+            ],
+            schema=schema,
+        )
+        self._writers[table].write_batch(batch)
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+
+
+TABLE_WRITERS: dict[str, type[TableWriter]] = {
+    "csv": CsvTableWriter,
+    "parquet": ParquetTableWriter,
+}
+
+
+class OrderExporter:
+    """Buffers order rows and hands them to `writer` in chunks of
+    `chunk_size` rows per table, so memory stays bounded."""
+
+    def __init__(self, writer: TableWriter, chunk_size: int = 65_536) -> None:
+        self.writer = writer
+        self.chunk_size = chunk_size
+        self.rows: dict[str, list[Row]] = {name: [] for name in TABLES}
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def __enter__(self) -> "OrderExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add(self, order: Order) -> None:
+        self.add_rows(get_order_rows(order))
+
+    def add_rows(self, tables: dict[str, list[Row]]) -> None:
+        for table, rows in tables.items():
+            buffer = self.rows[table]
+            buffer.extend(rows)
+            self.counts[table] += len(rows)
+            if len(buffer) >= self.chunk_size:
+                self.flush(table)
+
+    def flush(self, table: str | None = None) -> None:
+        for name in (table,) if table else TABLES:
+            if self.rows[name]:
+                self.writer.write(name, self.rows[name])
+                self.rows[name] = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+def export_orders(
+    orders: Iterable[Order],
+    directory: str | Path,
+    file_format: str = "csv",
+    chunk_size: int = 65_536,
+) -> dict[str, int]:
+    """Write calculated orders to one file per table, return row counts."""
+    with OrderExporter(
+        TABLE_WRITERS[file_format](directory), chunk_size
+    ) as exporter:
+        for order in orders:
+            exporter.add(order)
+    return exporter.counts
+
+
+def _add_item_rows(
+    tables: dict[str, list[Row]],
+    order: int,
+    index: int,
+    parent: int,
+    item: BaseItem,
+) -> None:
+    tables["items"].append(_item_row(order, index, parent, item))
+    tables["operations"].extend(
+        (order, index, name, price.cost, price.final)
+        for name, price in item.prices.items()
+    )
+
+
+def _item_row(order: int, index: int, parent: int, item: BaseItem) -> Row:
+    summary = item.summary
+    total = item.prices["total"]
+    return (
+        order,
+        index,
+        parent,
+        item.name,
+        "tube" if isinstance(item, TubeItem) else "sheet",
+        item.count,
+        summary.incuts_count,
+        summary.cutting_length,
+        summary.cutting_cost,
+        summary.welding_length,
+        summary.area,
+        summary.bending_count,
+        summary.sundries_count,
+        summary.riveting_count,
+        summary.countersink_count,
+        summary.threading_count,
+        total.cost,
+        total.final,
+    )
+
+
+def _tube_row(order: int, item: int, index: int, tube: Tube) -> Row:
+    return (
+        order,
+        item,
+        index,
+        str(tube.pipe),
+        "round" if isinstance(tube.pipe, RoundPipe) else "rect",
+        tube.length,
+        tube.is_ours,
+        tube.incuts_count,
+        tube.cutting_length,
+        tube.welding_length,
+        tube.area,
+        tube.bending_count,
+        tube.pipe_cost,
+        tube.cutting_cost,
+        tube.carrying_cost,
+    )
+
+
+__all__ = [
+    "TABLES",
+    "get_order_rows",
+    "export_specs",
+    "TableWriter",
+    "CsvTableWriter",
+    "ParquetTableWriter",
+    "TABLE_WRITERS",
+    "OrderExporter",
+    "export_orders",
+]
@@ -0,0 +1,74 @@
+from dataclasses import fields, is_dataclass
+from datetime import date
+from hashlib import sha256
+from typing import Any
+
+
+# bump when pricing changes so that persisted hashes stop matching
+HASH_VERSION = b"tubesc-1"
+
+
+def content_hash(value: Any) -> str:
+    """Stable hex digest of a dataclass tree: pipes, tubes, items, orders,
+    cuts, holes, `Costs`, `Multipliers` and dates.
+
+    Only dataclass fields take part, so prices and cached quantities do not
+    change the hash, and numbers hash by value: 100 and 100.0 are equal.
+    Objects that cache their own `content_hash` are hashed through it.
+    """
+    cached = _cached_hash(value)
+    if cached is not None:
+        return cached
+    return calculate_content_hash(value)
+
+
+def calculate_content_hash(value: Any) -> str:
+    """Digest of `value` itself, ignoring a `content_hash` it may cache."""
+    hasher = sha256(HASH_VERSION)
+    if is_dataclass(value):
+        _update_fields(hasher, value)
+    else:
+        _update(hasher, value)
+    return hasher.hexdigest()
+
+
+def _cached_hash(value: Any) -> str | None:
+    if hasattr(type(value), "content_hash"):
+        return value.content_hash
+    return None
+
+
+def _update(hasher: Any, value: Any) -> None:
+    cached = _cached_hash(value)
+    if cached is not None:
+        hasher.update(b"h" + cached.encode())
+    elif is_dataclass(value):
+        _update_fields(hasher, value)
+    elif value is None or isinstance(value, bool):
+        hasher.update(repr(value).encode())
+    elif isinstance(value, (int, float)):
+        hasher.update(b"n" + float(value).hex().encode())
+    elif isinstance(value, date):
+        hasher.update(b"t" + value.isoformat().encode())
+    elif isinstance(value, str):
+        encoded = value.encode()
+        hasher.update(b"s%d:" % len(encoded) + encoded)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for element in value:
+            _update(hasher, element)
+            hasher.update(b",")
+        hasher.update(b"]")
+    else:
+        raise TypeError(f"cannot hash {type(value).__name__}")
+
+
+def _update_fields(hasher: Any, value: Any) -> None:
+    hasher.update(b"d" + type(value).__qualname__.encode() + b"(")
+    for field in fields(value):
+        hasher.update(field.name.encode() + b"=")
+        _update(hasher, getattr(value, field.name))
+    hasher.update(b")")
+
+
+__all__ = ["content_hash"]
@@ -1,9 +1,11 @@
-from dataclasses import dataclass, KW_ONLY
+from dataclasses import dataclass, fields, replace, KW_ONLY
 from abc import ABC, abstractmethod
 from math import pi
+from typing import Any, Sequence
+from weakref import WeakValueDictionary
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, weakref_slot=True)
 class Hole(ABC):
     _: KW_ONLY
     count: int = 1
@@ -18,8 +20,17 @@ class Hole(ABC):
     def __str__(self) -> str:
         pass
 
+    def interned(self) -> "Hole":
+        """An equal hole shared with the holes interned before, while any
+        of them is still in use."""
+        key = (
+            type(self),
+            *(getattr(self, field.name) for field in fields(self)),
+        )
+        return _interned.setdefault(key, self)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class RoundHole(Hole):
     diameter: float = 0.0
 
@@ -31,7 +42,7 @@ class RoundHole(Hole):
         return self.diameter * pi
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RectHole(Hole):
     width: float = 0.0
     height: float = 0.0
@@ -44,7 +55,7 @@ class RectHole(Hole):
         return (self.width + self.height) * 2
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CustomHole(Hole):
     length: float = 0.0
 
@@ -52,4 +63,22 @@ class CustomHole(Hole):
         return f'Отв. {"скв. " if self.through else ""}{self.length} - {self.count} шт'
 
 
-__all__ = ["Hole", "RectHole", "RoundHole", "CustomHole"]
+def group_holes(holes: Sequence[Hole]) -> list[Hole]:
+    """Identical holes merged into one hole with their total count, in the
+    order they first occur."""
+    if len(holes) < 2:
+        return list(holes)
+    counts: dict[Hole, int] = {}
+    for hole in holes:
+        shape = replace(hole, count=1)
+        counts[shape] = counts.get(shape, 0) + hole.count
+    if len(counts) == len(holes):
+        return list(holes)
+    return [replace(shape, count=count) for shape, count in counts.items()]
+
+
+# keyed by field values, so that only the values hold the holes
+_interned: WeakValueDictionary[tuple[Any, ...], Hole] = WeakValueDictionary()
+
+
+__all__ = ["Hole", "RectHole", "RoundHole", "CustomHole", "group_holes"]
@@ -1,12 +1,29 @@
 from dataclasses import dataclass, field, KW_ONLY
 from contextlib import contextmanager
 from abc import ABC, abstractmethod
-
-from . import Tube, Costs, Multipliers, Pipe, Price
+from functools import cached_property
+from typing import TYPE_CHECKING, Callable, Iterator, TextIO
+
+from . import (
+    Cached,
+    Tube,
+    TubeGroup,
+    Costs,
+    Multipliers,
+    Pipe,
+    Price,
+    PriceBreakdown,
+    ItemPricing,
+    ItemSummary,
+    group_tubes,
+)
+
+if TYPE_CHECKING:
+    from .price_cache import PriceCache
 
 
 @dataclass
-class BaseItem(ABC):
+class BaseItem(Cached, ABC):
     name: str
     _: KW_ONLY
     count: int = 1
@@ -18,7 +35,22 @@ class BaseItem(ABC):
     is_weld_cleaned: bool = False
 
     def __post_init__(self) -> None:
-        self.prices: dict[str, Price] = dict()
+        self.prices = PriceBreakdown()
+
+    def __str__(self) -> str:
+        return "".join(self.iter_report())
+
+    @abstractmethod
+    def iter_report(self) -> Iterator[str]:
+        pass
+
+    def write_report(self, fp: TextIO) -> None:
+        fp.writelines(self.iter_report())
+
+    @property
+    @abstractmethod
+    def summary(self) -> ItemSummary:
+        pass
 
     @property
     @abstractmethod
@@ -70,24 +102,90 @@ class BaseItem(ABC):
     def threading_count(self) -> int:
         pass
 
-    @abstractmethod
     def calculate_price(
         self,
         adjusted_cutting_cost: float,
         costs: Costs,
         multipliers: Multipliers,
+        cache: "PriceCache | None" = None,
+    ) -> None:
+        if cache is not None and cache.load(
+            self, adjusted_cutting_cost, costs, multipliers
+        ):
+            return
+        self.assign_prices(adjusted_cutting_cost, costs, multipliers)
+        if cache is not None:
+            cache.store(self, adjusted_cutting_cost, costs, multipliers)
+
+    def get_pricing(
+        self,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+        pipes: Callable[[Pipe], Pipe] | None = None,
+    ) -> ItemPricing:
+        """Prices of the item, leaving it and its parts unchanged. Pipes are
+        replaced by `pipes(pipe)` if given, like `RateCard.get_pipe`."""
+        prices = self.calculate_operation_prices(
+            adjusted_cutting_cost,
+            costs,
+            multipliers,
+            self.get_summary(pipes),
+        )
+        return ItemPricing.of(self.name, self.count, prices)
+
+    def assign_prices(
+        self,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+    ) -> None:
+        """Set `prices`, and those of the parts, to what `get_pricing`
+        returns."""
+        self.prices = self.calculate_operation_prices(
+            adjusted_cutting_cost, costs, multipliers, self.summary
+        )
+
+    def get_summary(
+        self, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> ItemSummary:
+        """`summary` with the tube costs of `pipes(tube.pipe)` if given."""
+        return self.summary
+
+    @abstractmethod
+    def calculate_operation_prices(
+        self,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+        summary: ItemSummary,
+    ) -> PriceBreakdown:
+        pass
+
+    def update_cutting_price(
+        self, adjusted_cutting_cost: float, multipliers: Multipliers
     ):
         pass
 
-    def calculate_painting_price(self, costs: Costs, multipliers: Multipliers):
+    def calculate_total_price(self, prices: PriceBreakdown) -> Price:
+        operations = [
+            price for name, price in prices.items() if name != "total"
+        ]
+        return Price(
+            cost=sum(price.cost for price in operations),
+            final=sum(price.final for price in operations),
+        )
+
+    def calculate_painting_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
         if not self.is_painted:
-            self.prices["painting"] = Price()
-            return
+            return Price()
 
-        area = self.area
+        area = summary.area
         work_cost = area * costs.painting
         paint_cost = area * costs.paint
-        self.prices["painting"] = Price(
+        return Price(
             cost=work_cost + paint_cost,
             final=(
                 work_cost * multipliers.work
@@ -97,48 +195,71 @@ class BaseItem(ABC):
             * multipliers.vat,
         )
 
-    def calculate_welding_price(self, costs: Costs, multipliers: Multipliers):
-        welding_cost = self.welding_length * costs.welding
-        self.prices["welding"] = self.get_work_price(welding_cost, multipliers)
+    def calculate_welding_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        welding_cost = summary.welding_length * costs.welding
+        return self.get_work_price(welding_cost, multipliers)
 
-    def calculate_bending_price(self, costs: Costs, multipliers: Multipliers):
-        bending_cost = self.bending_count * costs.bending
-        self.prices["bending"] = self.get_work_price(bending_cost, multipliers)
+    def calculate_bending_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        bending_cost = summary.bending_count * costs.bending
+        return self.get_work_price(bending_cost, multipliers)
 
-    def calculate_riveting_price(self, costs: Costs, multipliers: Multipliers):
-        riveting_cost = self.riveting_count * costs.riveting
-        self.prices["riveting"] = self.get_work_price(
-            riveting_cost, multipliers
-        )
+    def calculate_riveting_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        riveting_cost = summary.riveting_count * costs.riveting
+        return self.get_work_price(riveting_cost, multipliers)
 
     def calculate_countersink_price(
-        self, costs: Costs, multipliers: Multipliers
-    ):
-        countersink_cost = self.countersink_count * costs.countersink
-        self.prices["countersink"] = self.get_work_price(
-            countersink_cost, multipliers
-        )
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        countersink_cost = summary.countersink_count * costs.countersink
+        return self.get_work_price(countersink_cost, multipliers)
 
-    def calculate_threading_price(self, costs: Costs, multipliers: Multipliers):
-        threading_cost = self.threading_count * costs.threading
-        self.prices["threading"] = self.get_work_price(
-            threading_cost, multipliers
-        )
+    def calculate_threading_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        threading_cost = summary.threading_count * costs.threading
+        return self.get_work_price(threading_cost, multipliers)
 
-    def calculate_project_price(self, costs: Costs, multipliers: Multipliers):
+    def calculate_project_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
         project_cost = self.project_hours * costs.project / self.count
-        self.prices["project"] = self.get_work_price(project_cost, multipliers)
+        return self.get_work_price(project_cost, multipliers)
 
-    def calculate_transport_price(self, costs: Costs, multipliers: Multipliers):
-        self.prices["transport"] = self.get_work_price(
-            self.transport_cost, multipliers
-        )
+    def calculate_transport_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        return self.get_work_price(self.transport_cost, multipliers)
+
+    def calculate_sundries_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        sundries_cost = summary.sundries_count * costs.sundry
+        return self.get_materials_price(sundries_cost, multipliers)
 
-    def calculate_sundries_price(self, costs: Costs, multipliers: Multipliers):
-        sundries_cost = self.sundries_count * costs.sundry
-        self.prices["sundries"] = self.get_materials_price(
-            sundries_cost, multipliers
+    def calculate_sheet_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        return self.get_materials_price(summary.sheet_cost, multipliers)
+
+    def calculate_cleaning_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        cleaning_cost = summary.cleaning_area * costs.cleaning
+        return self.get_work_price(cleaning_cost, multipliers)
+
+    def calculate_weld_cleaning_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        weld_cleaning_cost = (
+            summary.weld_cleaning_length * costs.weld_cleaning
         )
+        return self.get_work_price(weld_cleaning_cost, multipliers)
 
     @staticmethod
     def get_work_price(work_cost: float, multipliers: Multipliers) -> Price:
@@ -173,106 +294,105 @@ class SheetItem(BaseItem):
     riveting_count: int = 0  # pyright: ignore[reportIncompatibleMethodOverride]
     countersink_count: int = 0 # pyright: ignore[reportIncompatibleMethodOverride]
     threading_count: int = 0 # pyright: ignore[reportIncompatibleMethodOverride]
+    # blank size and metal thickness for nesting, in mm
+    width: float | None = None
+    height: float | None = None
+    thickness: float | None = None
 
     def __post_init__(self) -> None:
         super().__post_init__()
         if self.is_painted and self.sheet_area is None:
             raise ValueError('is_painted required sheet_area to be set')
 
-    def __str__(self) -> str:
-        result = f"{self.name}: {self.prices['total']}\n"
+    def iter_report(self) -> Iterator[str]:
+        yield f"{self.name}: {self.prices['total']}\n"
 
         if self.prices["sheet"].cost > 0:
-            result += f"\tЛистовой металл: {self.prices['sheet']}\n\n"
+            yield f"\tЛистовой металл: {self.prices['sheet']}\n\n"
 
         if self.prices["sundries"].cost > 0:
-            result += f"\tМетизы: {self.sundries_count} шт, {self.prices['sundries']}\n\n"
+            yield f"\tМетизы: {self.sundries_count} шт, {self.prices['sundries']}\n\n"
 
         if self.prices["riveting"].cost > 0:
-            result += f"\tЗаклёпывание: {self.riveting_count} шт, {self.prices['riveting']}\n\n"
+            yield f"\tЗаклёпывание: {self.riveting_count} шт, {self.prices['riveting']}\n\n"
 
         if self.prices["bending"].cost > 0:
-            result += f"\tГибка: {self.bending_count} шт, {self.prices['bending']}\n\n"
+            yield f"\tГибка: {self.bending_count} шт, {self.prices['bending']}\n\n"
 
         if self.prices["welding"].cost > 0:
-            result += f"\tСварка: {self.welding_length:,.2f} мм, {self.prices['welding']}\n\n"
+            yield f"\tСварка: {self.welding_length:,.2f} мм, {self.prices['welding']}\n\n"
 
         # if self.prices["cleaning"].cost > 0:
         #     result += f"\tЗачистка корщёткой: {self.area:,.2f} мм2, {self.prices['cleaning']}\n\n"
 
         if self.prices["painting"].cost > 0:
-            result += f"\tПокраска: {self.area / 1_000_000:,.2f} м2, {self.prices['painting']}\n\n"
+            yield f"\tПокраска: {self.area / 1_000_000:,.2f} м2, {self.prices['painting']}\n\n"
 
         if self.prices["project"].cost > 0:
-            result += f"\tПроектировка: {self.project_hours} ч / {self.count} шт, {self.prices['project']}\n\n"
-
-        return result
+            yield f"\tПроектировка: {self.project_hours} ч / {self.count} шт, {self.prices['project']}\n\n"
+
+    @cached_property
+    def summary(self) -> ItemSummary:
+        area = self.sheet_area or 0.0
+        welding_length = self.welding_length
+        return ItemSummary(
+            welding_length=welding_length,
+            area=area,
+            bending_count=self.bending_count,
+            sundries_count=self.sundries_count,
+            riveting_count=self.riveting_count,
+            countersink_count=self.countersink_count,
+            threading_count=self.threading_count,
+            sheet_cost=self.sheet_cost,
+            cleaning_area=area if self.is_cleaned else 0.0,
+            weld_cleaning_length=(
+                welding_length if self.is_weld_cleaned else 0.0
+            ),
+        )
 
-    @property
+    @cached_property
     def welding_length(self) -> float:
         return self.sundry_welding_count * 10 + self.extra_welding_length
 
-    @property
+    @cached_property
     def area(self) -> float:
         return self.sheet_area # type: ignore
 
-    @property
+    @cached_property
     def incuts_count(self):
         return 0
 
-    @property
+    @cached_property
     def cutting_length(self):
         return 0.0
 
-    @property
+    @cached_property
     def cutting_cost(self):
         return 0.0
 
-    def calculate_price(
+    def calculate_operation_prices(
         self,
         adjusted_cutting_cost: float,
         costs: Costs,
         multipliers: Multipliers,
-    ):
-        self.prices["sheet"] = self.get_materials_price(
-            self.sheet_cost, multipliers
-        )
-        self.calculate_welding_price(costs, multipliers)
-        self.calculate_bending_price(costs, multipliers)
-        self.calculate_riveting_price(costs, multipliers)
-        self.calculate_weld_cleaning_price(costs, multipliers)
-        self.calculate_transport_price(costs, multipliers)
-        self.calculate_project_price(costs, multipliers)
-        self.calculate_cleaning_price(costs, multipliers)
-        self.calculate_painting_price(costs, multipliers)
-        self.calculate_sundries_price(costs, multipliers)
-        self.calculate_countersink_price(costs, multipliers)
-        self.calculate_threading_price(costs, multipliers)
-
-        self.prices["total"] = Price(
-            cost=sum(price.cost for price in self.prices.values()),
-            final=sum(price.final for price in self.prices.values()),
-        )
-
-    def calculate_cleaning_price(self, costs: Costs, multipliers: Multipliers):
-        if not self.is_cleaned:
-            self.prices["cleaning"] = Price()
-            return
-        cleaning_cost = self.area * costs.cleaning
-        self.prices["cleaning"] = self.get_work_price(
-            cleaning_cost, multipliers
-        )
-
-    def calculate_weld_cleaning_price(
-        self, costs: Costs, multipliers: Multipliers
-    ):
-        weld_cleaning_length = 0
-        if self.is_weld_cleaned:
-            weld_cleaning_length = self.welding_length
-        weld_cleaning_cost = weld_cleaning_length * costs.weld_cleaning
-        self.prices["weld_cleaning"] = self.get_work_price(
-            weld_cleaning_cost, multipliers
-        )
+        summary: ItemSummary,
+    ) -> PriceBreakdown:
+        args = (summary, costs, multipliers)
+        prices = PriceBreakdown()
+        prices["sheet"] = self.calculate_sheet_price(*args)
+        prices["welding"] = self.calculate_welding_price(*args)
+        prices["bending"] = self.calculate_bending_price(*args)
+        prices["riveting"] = self.calculate_riveting_price(*args)
+        prices["weld_cleaning"] = self.calculate_weld_cleaning_price(*args)
+        prices["transport"] = self.calculate_transport_price(*args)
+        prices["project"] = self.calculate_project_price(*args)
+        prices["cleaning"] = self.calculate_cleaning_price(*args)
+        prices["painting"] = self.calculate_painting_price(*args)
+        prices["sundries"] = self.calculate_sundries_price(*args)
+        prices["countersink"] = self.calculate_countersink_price(*args)
+        prices["threading"] = self.calculate_threading_price(*args)
+        prices["total"] = self.calculate_total_price(prices)
+        return prices
 
 
 @dataclass
@@ -282,6 +402,8 @@ class TubeItem(BaseItem):
     tubes: list[Tube] = field(default_factory=list[Tube])
     sheet_items: list[SheetItem] = field(default_factory=list[SheetItem])
 
+    _dependencies = ("tubes", "sheet_items")
+
     def __post_init__(self):
         super().__post_init__()
         # self.tubes: list[Tube] = []
@@ -290,280 +412,351 @@ class TubeItem(BaseItem):
     def __getitem__(self, key: int) -> Tube:
         return self.tubes[key]
 
-    def __str__(self) -> str:
-        result = f"{self.name}: {self.prices['total']}\n"
-        for tube in self.tubes:
-            result += f"\t{tube}\n"
+    def iter_report(self) -> Iterator[str]:
+        yield f"{self.name}: {self.prices['total']}\n"
+        groups = self.tube_groups
+        for group in groups:
+            yield f"\t{group}\n"
         for sheet in self.sheet_items:
-            result += f"\t{sheet.name}: {sheet.prices['total']}\n"
-        result += "\n"
+            yield f"\t{sheet.name}: {sheet.prices['total']}\n"
+        yield "\n"
 
         if self.prices["pipe"].cost > 0:
-            result += f"\tТруба: {self.prices['pipe']}\n"
-            for tube in self.tubes:
+            yield f"\tТруба: {self.prices['pipe']}\n"
+            for group in groups:
+                tube = group.tube
                 if tube.pipe_cost == 0:
                     continue
-                result += f"\t\t{tube}: {tube.pipe.cost * 1000:,.2f} руб/м, {tube.pipe_cost:,.2f} руб\n"
-            result += "\n"
+                yield f"\t\t{group}: {tube.pipe.cost * 1000:,.2f} руб/м, {tube.pipe_cost * group.count:,.2f} руб\n"
+            yield "\n"
 
-        result += f"\tРезка: {self.prices['cutting']} \n"
-        for tube in self.tubes:
-            result += f"\t\t{tube}: {tube.incuts_count} врезки / {tube.cutting_length:,.2f} мм, {tube.cutting_cost:,.2f} руб\n"
+        yield f"\tРезка: {self.prices['cutting']} \n"
+        for group in groups:
+            tube = group.tube
+            yield f"\t\t{group}: {tube.incuts_count * group.count} врезки / {tube.cutting_length * group.count:,.2f} мм, {tube.cutting_cost * group.count:,.2f} руб\n"
             if tube.left_cut is not None:
-                result += f"\t\t\t{tube.left_cut}: {tube.pipe.get_cut_length(tube.left_cut):,.2f} мм\n"
+                yield f"\t\t\t{tube.left_cut}: {tube.left_cut_length:,.2f} мм\n"
             if tube.right_cut is not None:
-                result += f"\t\t\t{tube.right_cut}: {tube.pipe.get_cut_length(tube.right_cut):,.2f} мм\n"
-            for hole in tube.holes:
-                result += f"\t\t\t{hole}: {hole.length:,.2f} мм\n"
-        result += "\n"
+                yield f"\t\t\t{tube.right_cut}: {tube.right_cut_length:,.2f} мм\n"
+            for hole in tube.hole_groups:
+                yield f"\t\t\t{hole}: {hole.length:,.2f} мм\n"
+        yield "\n"
 
         if self.prices["welding"].cost > 0:
-            result += f"\tСварка: {self.welding_length:,.2f} мм, {self.prices['welding']}\n"
-            for tube in self.tubes:
+            yield f"\tСварка: {self.welding_length:,.2f} мм, {self.prices['welding']}\n"
+            for group in groups:
+                tube = group.tube
                 if tube.welding_length == 0:
                     continue
-                result += f"\t\t{tube}: {tube.welding_length:,.2f} мм\n"
+                yield f"\t\t{group}: {tube.welding_length * group.count:,.2f} мм\n"
             for sheet in self.sheet_items:
                 if sheet.welding_length == 0:
                     continue
-                result += f"\t\t{sheet.name} - {sheet.count} шт: {sheet.welding_length:,.2f} мм * {sheet.count} = {sheet.welding_length * sheet.count:,.2f} мм\n"
+                yield f"\t\t{sheet.name} - {sheet.count} шт: {sheet.welding_length:,.2f} мм * {sheet.count} = {sheet.welding_length * sheet.count:,.2f} мм\n"
             if self.sundry_welding_count > 0:
-                result += f"\t\tТочки - {self.sundry_welding_count} шт: 10 * {self.sundry_welding_count} = {self.sundry_welding_count * 10} мм\n"
-            result += "\n"
+                yield f"\t\tТочки - {self.sundry_welding_count} шт: 10 * {self.sundry_welding_count} = {self.sundry_welding_count * 10} мм\n"
+            yield "\n"
 
         if self.prices["weld_cleaning"].cost > 0:
-            result += (
+            yield (
                 f"\tЗачистка сварного шва: {self.prices['weld_cleaning']}\n"
             )
-            for tube in self.tubes:
+            for group in groups:
+                tube = group.tube
                 if not tube.is_weld_cleaned:
                     continue
-                result += f"\t\t{tube}: {tube.length} мм\n"
+                yield f"\t\t{group}: {tube.length * group.count} мм\n"
             if self.is_weld_cleaned:
-                result += f"\t\tСварка: {self.welding_length:,.2f} мм\n"
-            result += "\n"
+                yield f"\t\tСварка: {self.welding_length:,.2f} мм\n"
+            yield "\n"
 
         if self.prices["cleaning"].cost > 0:
-            result += f"\tЗачистка корщёткой: {self.prices['cleaning']}\n"
-            for tube in self.tubes:
+            yield f"\tЗачистка корщёткой: {self.prices['cleaning']}\n"
+            for group in groups:
+                tube = group.tube
                 if not tube.is_cleaned:
                     continue
-                result += f"\t\t{tube}: {tube.area / 1_000_000:,.2f} м2\n"
+                yield f"\t\t{group}: {tube.area * group.count / 1_000_000:,.2f} м2\n"
             for sheet in self.sheet_items:
                 if not sheet.is_cleaned:
                     continue
-                result += (
+                yield (
                     f"\t\t{sheet.name}: {sheet.area / 1_000_000:,.2f} м2\n"
                 )
-            result += "\n"
+            yield "\n"
 
         if self.prices["painting"].cost > 0:
-            result += f"\tПокраска: {self.area / 1_000_000:,.2f} м2, {self.prices['painting']}\n\n"
+            yield f"\tПокраска: {self.area / 1_000_000:,.2f} м2, {self.prices['painting']}\n\n"
 
         if self.prices["sundries"].cost > 0:
-            result += f"\tМетизы: {self.sundries_count} шт, {self.prices['sundries']}\n"
+            yield f"\tМетизы: {self.sundries_count} шт, {self.prices['sundries']}\n"
             for sheet in self.sheet_items:
                 if sheet.sundries_count == 0:
                     continue
-                result += f"\t\t{sheet.name}: {sheet.sundries_count} шт\n"
-            result += "\n"
+                yield f"\t\t{sheet.name}: {sheet.sundries_count} шт\n"
+            yield "\n"
 
         if self.prices["riveting"].cost > 0:
-            result += f"\tЗаклёпывание: {self.riveting_count} шт, {self.prices['riveting']}\n"
+            yield f"\tЗаклёпывание: {self.riveting_count} шт, {self.prices['riveting']}\n"
             for sheet in self.sheet_items:
                 if sheet.riveting_count == 0:
                     continue
-                result += f"\t\t{sheet.name}: {sheet.riveting_count} шт\n"
-            result += "\n"
+                yield f"\t\t{sheet.name}: {sheet.riveting_count} шт\n"
+            yield "\n"
 
         if self.prices["countersink"].cost > 0:
-            result += f"\tЗенковка: {self.countersink_count} шт, {self.prices['countersink']}\n"
+            yield f"\tЗенковка: {self.countersink_count} шт, {self.prices['countersink']}\n"
             for sheet in self.sheet_items:
                 if sheet.countersink_count == 0:
                     continue
-                result += f"\t\t{sheet.name}: {sheet.countersink_count} шт\n"
-            result += "\n"
+                yield f"\t\t{sheet.name}: {sheet.countersink_count} шт\n"
+            yield "\n"
 
         if self.prices["threading"].cost > 0:
-            result += f"\tНарезка резьбы: {self.threading_count} шт, {self.prices['threading']}\n"
+            yield f"\tНарезка резьбы: {self.threading_count} шт, {self.prices['threading']}\n"
             for sheet in self.sheet_items:
                 if sheet.threading_count == 0:
                     continue
-                result += f"\t\t{sheet.name}: {sheet.threading_count} шт\n"
-            for tube in self.tubes:
+                yield f"\t\t{sheet.name}: {sheet.threading_count} шт\n"
+            for group in groups:
+                tube = group.tube
                 if tube.threading_count == 0:
                     continue
-                result += f"\t\t{tube}: {tube.threading_count} шт\n"
-            result += "\n"
+                yield f"\t\t{group}: {tube.threading_count * group.count} шт\n"
+            yield "\n"
 
         if self.prices["bending"].cost > 0:
-            result += (
+            yield (
                 f"\tГибка: {self.bending_count} шт, {self.prices['bending']}\n"
             )
-            for tube in self.tubes:
+            for group in groups:
+                tube = group.tube
                 if tube.bending_count == 0:
                     continue
-                result += f"\t\t{tube}: {tube.bending_count} шт\n"
+                yield f"\t\t{group}: {tube.bending_count * group.count} шт\n"
             for sheet in self.sheet_items:
                 if sheet.bending_count == 0:
                     continue
-                result += f"\t\t{sheet.name}: {sheet.bending_count} шт\n"
-            result += "\n"
+                yield f"\t\t{sheet.name}: {sheet.bending_count} шт\n"
+            yield "\n"
 
-        result += f"\tТаскание: {self.prices['carrying']}\n\n"
+        yield f"\tТаскание: {self.prices['carrying']}\n\n"
 
         if self.prices["sheet"].cost > 0:
-            result += f"\tЛистовой металл: {self.prices['sheet']}\n"
+            yield f"\tЛистовой металл: {self.prices['sheet']}\n"
             for sheet in self.sheet_items:
-                result += f"\t\t{sheet.name}"
+                yield f"\t\t{sheet.name}"
                 if sheet.count > 1:
-                    result += f" - {sheet.count} шт"
-                result += f": {sheet.sheet_cost:,.2f} руб\n"
-            result += "\n"
+                    yield f" - {sheet.count} шт"
+                yield f": {sheet.sheet_cost:,.2f} руб\n"
+            yield "\n"
 
         if self.prices["transport"].cost > 0:
-            result += f"\tТранспортировка: {self.prices['transport']}\n\n"
-
-        result += f"\tПроектировка: {self.project_hours} ч / {self.count} шт, {self.prices['project']}\n\n"
-
-        return result
+            yield f"\tТранспортировка: {self.prices['transport']}\n\n"
+
+        yield f"\tПроектировка: {self.project_hours} ч / {self.count} шт, {self.prices['project']}\n\n"
+
+    @cached_property
+    def tube_groups(self) -> list[TubeGroup]:
+        """Identical tubes grouped, so their geometry is computed once."""
+        return group_tubes(self.tubes)
+
+    @cached_property
+    def summary(self) -> ItemSummary:
+        return self._collect_summary()
+
+    def get_summary(
+        self, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> ItemSummary:
+        if pipes is None:
+            return self.summary
+        return self._collect_summary(pipes)
+
+    def _collect_summary(
+        self, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> ItemSummary:
+        summary = ItemSummary()
+        tubes_welding_length = 0.0
+        for group in self.tube_groups:
+            tube, count = group.tube, group.count
+            if pipes is None:
+                pipe_cost = tube.pipe_cost
+                cutting_cost = tube.cutting_cost
+                carrying_cost = tube.carrying_cost
+            else:
+                pipe = pipes(tube.pipe)
+                pipe_cost = tube.get_pipe_cost(pipe)
+                cutting_cost = tube.get_cutting_cost(pipe)
+                carrying_cost = tube.get_carrying_cost(pipe)
+            summary.incuts_count += tube.incuts_count * count
+            summary.cutting_length += tube.cutting_length * count
+            summary.cutting_cost += cutting_cost * count
+            tubes_welding_length += tube.welding_length * count
+            summary.area += tube.area * count
+            summary.bending_count += tube.bending_count * count
+            summary.countersink_count += tube.countersink_count * count
+            summary.threading_count += tube.threading_count * count
+            summary.pipe_cost += pipe_cost * count
+            summary.carrying_cost += carrying_cost * count
+            if tube.is_cleaned:
+                summary.cleaning_area += tube.area * count
+            if tube.is_weld_cleaned:
+                summary.weld_cleaning_length += tube.length * count
+
+        sheets_welding_length = 0.0
+        for sheet in self.sheet_items:
+            summary.cutting_length += sheet.cutting_length
+            sheets_welding_length += sheet.welding_length * sheet.count
+            summary.bending_count += sheet.bending_count
+            summary.sundries_count += sheet.sundries_count
+            summary.riveting_count += sheet.riveting_count
+            summary.countersink_count += sheet.countersink_count * sheet.count
+            summary.threading_count += sheet.threading_count * sheet.count
+            summary.sheet_cost += sheet.sheet_cost * sheet.count
+
+        summary.sundries_count += self.extra_sundries_count
+        summary.riveting_count += self.extra_sundries_count
+        summary.welding_length = (
+            tubes_welding_length
+            + sheets_welding_length
+            + self.sundry_welding_count * 10
+        )
+        if self.is_weld_cleaned:
+            summary.weld_cleaning_length += summary.welding_length
+        return summary
 
     @property
     def sundries_count(self) -> int:
-        return (
-            sum(sheet.sundries_count for sheet in self.sheet_items)
-            + self.extra_sundries_count
-        )
+        return self.summary.sundries_count
 
     @property
     def countersink_count(self) -> int:
-        return sum(sheet.countersink_count * sheet.count for sheet in self.sheet_items) + sum(tube.countersink_count for tube in self.tubes)
+        return self.summary.countersink_count
 
     @property
     def threading_count(self) -> int:
-        return sum(
-            sheet.threading_count * sheet.count for sheet in self.sheet_items
-        ) + sum(tube.threading_count for tube in self.tubes)
+        return self.summary.threading_count
 
     @property
     def bending_count(self) -> int:
-        return sum(tube.bending_count for tube in self.tubes) + sum(
-            sheet.bending_count for sheet in self.sheet_items
-        )
+        return self.summary.bending_count
 
     @property
     def riveting_count(self) -> int:
-        return (
-            sum(sheet.riveting_count for sheet in self.sheet_items)
-            + self.extra_sundries_count
-        )
+        return self.summary.riveting_count
 
     @property
     def incuts_count(self) -> int:
-        return sum(tube.incuts_count for tube in self.tubes)
+        return self.summary.incuts_count
 
     @property
     def cutting_length(self) -> float:
-        return sum(tube.cutting_length for tube in self.tubes) + sum(
-            sheet.cutting_length for sheet in self.sheet_items
-        )
+        return self.summary.cutting_length
 
     @property
     def cutting_cost(self) -> float:
-        return sum(tube.cutting_cost for tube in self.tubes)
+        return self.summary.cutting_cost
 
     @property
     def welding_length(self) -> float:
-        return (
-            sum(tube.welding_length for tube in self.tubes)
-            + sum(
-                sheet.welding_length * sheet.count for sheet in self.sheet_items
-            )
-            + self.sundry_welding_count * 10
-        )
+        return self.summary.welding_length
 
     @property
     def area(self) -> float:
-        result = sum(tube.area for tube in self.tubes)
-        return result
+        return self.summary.area
 
-    def calculate_price(
+    def get_pricing(
         self,
         adjusted_cutting_cost: float,
         costs: Costs,
         multipliers: Multipliers,
-    ) -> None:
-        for sheet in self.sheet_items:
-            sheet.calculate_price(0.0, costs, multipliers)
-
-        self.prices["cutting"] = self.get_work_price(
-            adjusted_cutting_cost, multipliers
+        pipes: Callable[[Pipe], Pipe] | None = None,
+    ) -> ItemPricing:
+        prices = self.calculate_operation_prices(
+            adjusted_cutting_cost,
+            costs,
+            multipliers,
+            self.get_summary(pipes),
         )
-        self.calculate_pipe_price(costs, multipliers)
-        self.calculate_sheet_price(costs, multipliers)
-        self.calculate_welding_price(costs, multipliers)
-        self.calculate_bending_price(costs, multipliers)
-        self.calculate_riveting_price(costs, multipliers)
-        self.calculate_weld_cleaning_price(costs, multipliers)
-        self.calculate_transport_price(costs, multipliers)
-        self.calculate_project_price(costs, multipliers)
-        self.calculate_cleaning_price(costs, multipliers)
-        self.calculate_painting_price(costs, multipliers)
-        self.calculate_sundries_price(costs, multipliers)
-        self.calculate_carrying_price(multipliers)
-        self.calculate_countersink_price(costs, multipliers)
-        self.calculate_threading_price(costs, multipliers)
-
-        self.prices["total"] = Price(
-            cost=sum(price.cost for price in self.prices.values()),
-            final=sum(price.final for price in self.prices.values()),
+        return ItemPricing.of(
+            self.name,
+            self.count,
+            prices,
+            tuple(
+                group.tube.get_pricing(group.count, pipes)
+                for group in self.tube_groups
+            ),
+            tuple(
+                sheet.get_pricing(0.0, costs, multipliers, pipes)
+                for sheet in self.sheet_items
+            ),
         )
 
-    def calculate_pipe_price(self, costs: Costs, multipliers: Multipliers):
-        pipe_cost = sum(tube.pipe_cost for tube in self.tubes)
-        self.prices["pipe"] = self.get_materials_price(pipe_cost, multipliers)
-
-    def calculate_cleaning_price(self, costs: Costs, multipliers: Multipliers):
-        cleaning_cost = sum(
-            tube.area * costs.cleaning for tube in self.tubes if tube.is_cleaned
-        )
-        self.prices["cleaning"] = self.get_work_price(
-            cleaning_cost, multipliers
-        )
+    def assign_prices(
+        self,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+    ) -> None:
+        for sheet in self.sheet_items:
+            sheet.assign_prices(0.0, costs, multipliers)
+        super().assign_prices(adjusted_cutting_cost, costs, multipliers)
 
-    def calculate_sheet_price(self, costs: Costs, multipliers: Multipliers):
-        sheet_cost = sum(
-            sheet.sheet_cost * sheet.count for sheet in self.sheet_items
+    def calculate_operation_prices(
+        self,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+        summary: ItemSummary,
+    ) -> PriceBreakdown:
+        args = (summary, costs, multipliers)
+        prices = PriceBreakdown()
+        prices["cutting"] = self.get_work_price(
+            adjusted_cutting_cost, multipliers
         )
-        self.prices["sheet"] = self.get_materials_price(sheet_cost, multipliers)
-
-    def calculate_weld_cleaning_price(
-        self, costs: Costs, multipliers: Multipliers
+        prices["pipe"] = self.calculate_pipe_price(*args)
+        prices["sheet"] = self.calculate_sheet_price(*args)
+        prices["welding"] = self.calculate_welding_price(*args)
+        prices["bending"] = self.calculate_bending_price(*args)
+        prices["riveting"] = self.calculate_riveting_price(*args)
+        prices["weld_cleaning"] = self.calculate_weld_cleaning_price(*args)
+        prices["transport"] = self.calculate_transport_price(*args)
+        prices["project"] = self.calculate_project_price(*args)
+        prices["cleaning"] = self.calculate_cleaning_price(*args)
+        prices["painting"] = self.calculate_painting_price(*args)
+        prices["sundries"] = self.calculate_sundries_price(*args)
+        prices["carrying"] = self.calculate_carrying_price(*args)
+        prices["countersink"] = self.calculate_countersink_price(*args)
+        prices["threading"] = self.calculate_threading_price(*args)
+        prices["total"] = self.calculate_total_price(prices)
+        return prices
+
+    def update_cutting_price(
+        self, adjusted_cutting_cost: float, multipliers: Multipliers
     ):
-        weld_cleaning_length = sum(
-            tube.length for tube in self.tubes if tube.is_weld_cleaned
-        )
-        if self.is_weld_cleaned:
-            weld_cleaning_length += self.welding_length
-        weld_cleaning_cost = weld_cleaning_length * costs.weld_cleaning
-        self.prices["weld_cleaning"] = self.get_work_price(
-            weld_cleaning_cost, multipliers
+        self.prices["cutting"] = self.get_work_price(
+            adjusted_cutting_cost, multipliers
         )
+        self.prices["total"] = self.calculate_total_price(self.prices)
 
-    def calculate_carrying_price(self, multipliers: Multipliers):
-        carrying_cost = sum(tube.carrying_cost for tube in self.tubes)
-        self.prices["carrying"] = self.get_work_price(
-            carrying_cost, multipliers
-        )
+    def calculate_pipe_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        return self.get_materials_price(summary.pipe_cost, multipliers)
+
+    def calculate_carrying_price(
+        self, summary: ItemSummary, costs: Costs, multipliers: Multipliers
+    ) -> Price:
+        return self.get_work_price(summary.carrying_cost, multipliers)
 
     @contextmanager
     def add_tube(self, pipe: Pipe, length: float):
         tube = Tube(pipe, length)
-        self.tubes.append(tube)
+        self._append("tubes", tube)
         yield tube
 
     @contextmanager
     def add_sheet_item(self, name: str):
         item = SheetItem(name, 0)
-        self.sheet_items.append(item)
+        self._append("sheet_items", item)
         yield item
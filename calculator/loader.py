@@ -0,0 +1,358 @@
+import csv
+import datetime
+import json
+from dataclasses import fields
+from pathlib import Path
+from types import UnionType
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    Literal,
+    Mapping,
+    TextIO,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from . import (
+    Pipe,
+    RectPipe,
+    RoundPipe,
+    Cut,
+    Hole,
+    RectHole,
+    RoundHole,
+    CustomHole,
+    Tube,
+    BaseItem,
+    TubeItem,
+    SheetItem,
+    Order,
+    Costs,
+    Multipliers,
+)
+
+
+# the pipe catalog of a worker process, only read: every request and batch
+# gets its own loader, so no order sees the inline pipes of another
+_catalog: Mapping[str, Pipe] | None = None
+
+PIPE_TYPES: dict[str, type[Pipe]] = {"rect": RectPipe, "round": RoundPipe}
+HOLE_TYPES: dict[str, type[Hole]] = {
+    "rect": RectHole,
+    "round": RoundHole,
+    "custom": CustomHole,
+}
+
+
+class OrderLoader:
+    """Builds orders from JSON Lines or CSV one order at a time.
+
+    Equal pipe specifications share a single `Pipe` instance across all
+    loaded orders. Pipes can also be referenced by designation, looked up
+    in `pipes` only, such as a `PipeCatalog`, so that an order loads the
+    same whichever orders were loaded before it. Cuts and holes are
+    interned while they are in use.
+
+    A JSON Lines file holds one order object per line::
+
+        {"number": 1, "name": "...", "date": "2024-03-01", "items": [
+            {"type": "tube", "name": "...", "count": 2, "tubes": [
+                {"pipe": "100x100x4", "length": 4500,
+                 "left_cut": {"angle": 45, "welding_ratio": 0.5},
+                 "holes": [{"type": "round", "diameter": 8, "count": 4}]}],
+             "sheet_items": [{"name": "...", "sheet_cost": 300}]},
+            {"type": "sheet", "name": "...", "sheet_cost": 150}]}
+
+    A CSV file has one row per record, its `kind` column is one of `order`,
+    `tube_item`, `sheet_item`, `tube`, `sheet`, `hole` and `bended_cut`.
+    Rows belong to the closest preceding row of the parent kind: a tube or
+    a sheet to the last tube item, a hole or a bended cut to the last tube.
+    Cuts are given by `left_angle`, `left_side`, `left_welding_ratio` and
+    the same `right_` columns, a `-` angle means no cut. Hole and pipe types
+    are given by `hole_type` and `pipe_type`. Empty cells keep the defaults.
+    """
+
+    def __init__(self, pipes: Mapping[str, Pipe] | None = None) -> None:
+        self.catalog: Mapping[str, Pipe] = pipes or {}
+        self._pipes_by_spec: dict[tuple[Any, ...], Pipe] = {}
+
+    def get_pipe(self, spec: str | Mapping[str, Any]) -> Pipe:
+        if isinstance(spec, str):
+            pipe = self.catalog.get(spec)
+            if pipe is None:
+                raise ValueError(f"unknown pipe {spec!r}")
+            return pipe
+        key = tuple(sorted(spec.items()))
+        pipe = self._pipes_by_spec.get(key)
+        if pipe is None:
+            data = dict(spec)
+            pipe_type = PIPE_TYPES[data.pop("type")]
+            pipe = self._pipes_by_spec[key] = pipe_type(**data)
+        return pipe
+
+    def get_cut(self, spec: Mapping[str, Any] | None) -> Cut | None:
+        if spec is None:
+            return None
+        return Cut(**spec).interned()
+
+    def get_hole(self, spec: Mapping[str, Any]) -> Hole:
+        data = dict(spec)
+        hole_type = HOLE_TYPES[data.pop("type")]
+        return hole_type(**data).interned()
+
+    def get_tube(self, spec: Mapping[str, Any]) -> Tube:
+        data = dict(spec)
+        pipe = self.get_pipe(data.pop("pipe"))
+        for name in ("left_cut", "right_cut"):
+            if name in data:
+                data[name] = self.get_cut(data[name])
+        data["holes"] = [self.get_hole(hole) for hole in data.get("holes", ())]
+        data["bended_cuts"] = [
+            self.get_cut(cut) for cut in data.get("bended_cuts", ())
+        ]
+        return Tube(pipe, **data)
+
+    def get_item(self, spec: Mapping[str, Any]) -> BaseItem:
+        data = dict(spec)
+        item_type = data.pop("type", "tube")
+        if item_type == "sheet":
+            return SheetItem(**data)
+        data["tubes"] = [self.get_tube(tube) for tube in data.get("tubes", ())]
+        data["sheet_items"] = [
+            SheetItem(**sheet) for sheet in data.get("sheet_items", ())
+        ]
+        return TubeItem(**data)
+
+    def get_order(self, spec: Mapping[str, Any]) -> Order:
+        data = dict(spec)
+        data["items"] = [self.get_item(item) for item in data.get("items", ())]
+        if isinstance(data.get("date"), str):
+            data["date"] = datetime.date.fromisoformat(data["date"])
+        return Order(**data)
+
+    def iter_jsonl(self, fp: TextIO) -> Iterator[Order]:
+        for spec in iter_jsonl_specs(fp):
+            yield self.get_order(spec)
+
+    def iter_csv(self, fp: TextIO) -> Iterator[Order]:
+        for spec in iter_csv_specs(fp):
+            yield self.get_order(spec)
+
+    def iter_file(self, path: str | Path) -> Iterator[Order]:
+        for spec in iter_file_specs(path):
+            yield self.get_order(spec)
+
+
+def iter_jsonl_specs(fp: TextIO) -> Iterator[dict[str, Any]]:
+    """Order specifications for `OrderLoader.get_order` from JSON Lines."""
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_csv_specs(fp: TextIO) -> Iterator[dict[str, Any]]:
+    """Order specifications for `OrderLoader.get_order` from CSV."""
+    builder: _CsvOrder | None = None
+    for row in csv.DictReader(fp):
+        kind = row.pop("kind")
+        values = {name: value for name, value in row.items() if value}
+        if kind == "order":
+            if builder is not None:
+                yield builder.build()
+            builder = _CsvOrder(_parse(Order, values))
+        elif builder is None:
+            raise ValueError(f"{kind} row before the first order row")
+        else:
+            builder.add(kind, values)
+    if builder is not None:
+        yield builder.build()
+
+
+def iter_file_specs(path: str | Path) -> Iterator[dict[str, Any]]:
+    path = Path(path)
+    with path.open(encoding="utf-8", newline="") as fp:
+        if path.suffix == ".csv":
+            yield from iter_csv_specs(fp)
+        else:
+            yield from iter_jsonl_specs(fp)
+
+
+class _CsvOrder:
+    def __init__(self, order: dict[str, Any]) -> None:
+        self.order = order
+        self.items: list[dict[str, Any]] = []
+        self.item: dict[str, Any] | None = None
+        self.tube: dict[str, Any] | None = None
+
+    def add(self, kind: str, values: dict[str, str]) -> None:
+        if kind == "tube_item":
+            self.item = _parse(TubeItem, values)
+            self.item.update(tubes=[], sheet_items=[])
+            self.items.append(self.item)
+            self.tube = None
+        elif kind == "sheet_item":
+            self.items.append({"type": "sheet", **_parse(SheetItem, values)})
+            self.item = self.tube = None
+        elif kind == "sheet":
+            self._parent(self.item, kind)["sheet_items"].append(
+                _parse(SheetItem, values)
+            )
+        elif kind == "tube":
+            self.tube = self._parse_tube(values)
+            self._parent(self.item, kind)["tubes"].append(self.tube)
+        elif kind == "hole":
+            hole_type = values.pop("hole_type")
+            hole = {"type": hole_type, **_parse(HOLE_TYPES[hole_type], values)}
+            self._parent(self.tube, kind)["holes"].append(hole)
+        elif kind == "bended_cut":
+            self._parent(self.tube, kind)["bended_cuts"].append(
+                _parse(Cut, values)
+            )
+        else:
+            raise ValueError(f"unknown row kind {kind!r}")
+
+    def build(self) -> dict[str, Any]:
+        return {**self.order, "items": self.items}
+
+    def _parse_tube(self, values: dict[str, str]) -> dict[str, Any]:
+        cuts: dict[str, Any] = {}
+        for side in ("left", "right"):
+            prefix = f"{side}_"
+            cut = {
+                name.removeprefix(prefix): values.pop(name)
+                for name in list(values)
+                if name.startswith(prefix)
+            }
+            if cut.get("angle") == "-":
+                cuts[f"{side}_cut"] = None
+            elif cut:
+                cuts[f"{side}_cut"] = _parse(Cut, cut)
+
+        if "pipe" in values:
+            pipe: Any = values.pop("pipe")
+        else:
+            pipe_type = values.pop("pipe_type")
+            pipe = {
+                "type": pipe_type,
+                **_parse(PIPE_TYPES[pipe_type], values, strict=False),
+            }
+            for name in pipe:
+                values.pop(name, None)
+
+        tube = _parse(Tube, values)
+        tube.update(cuts, pipe=pipe, holes=[], bended_cuts=[])
+        return tube
+
+    @staticmethod
+    def _parent(parent: dict[str, Any] | None, kind: str) -> dict[str, Any]:
+        if parent is None:
+            raise ValueError(f"{kind} row without a parent row")
+        return parent
+
+
+def _parse(
+    cls: type, values: Mapping[str, str], strict: bool = True
+) -> dict[str, Any]:
+    types = {field.name: field.type for field in fields(cls)}
+    result: dict[str, Any] = {}
+    for name, value in values.items():
+        if name not in types:
+            if strict:
+                raise ValueError(f"unknown {cls.__name__} column {name!r}")
+            continue
+        result[name] = _convert(value, types[name])
+    return result
+
+
+def _convert(value: str, type_: Any) -> Any:
+    if get_origin(type_) in (Union, UnionType):
+        type_ = next(arg for arg in get_args(type_) if arg is not type(None))
+    if get_origin(type_) is Literal:
+        for choice in get_args(type_):
+            if str(choice) == value:
+                return choice
+        raise ValueError(
+            f"{value!r} is not one of "
+            + ", ".join(repr(choice) for choice in get_args(type_))
+        )
+    if type_ is bool:
+        return value.strip().lower() in ("1", "true", "yes", "да")
+    if type_ is int:
+        return int(value)
+    if type_ is float:
+        # integral values stay int, so that designations read "100x100x4"
+        number = float(value)
+        if number.is_integer() and "." not in value:
+            return int(number)
+        return number
+    return value
+
+
+def init_worker(pipes: Mapping[str, Pipe] | None = None) -> None:
+    """Process pool initializer that looks pipes up in `pipes`."""
+    global _catalog
+
+    _catalog = pipes
+
+
+def get_loader() -> OrderLoader:
+    """A new loader over the catalog given to `init_worker`."""
+    return OrderLoader(_catalog)
+
+
+def calculate_specs(
+    specs: Iterable[dict[str, Any]], costs: Costs, multipliers: Multipliers
+) -> Iterator[Order | dict[str, Any]]:
+    """Load and calculate order specifications with one new loader. An
+    invalid order, or one that cannot be priced like an item of no pieces
+    with project hours, gives its `number`, `name` and `error` instead of
+    failing the rest."""
+    loader = get_loader()
+    for spec in specs:
+        try:
+            order = loader.get_order(spec)
+            order.calculate(costs, multipliers)
+        except (ValueError, TypeError, KeyError, ArithmeticError) as error:
+            yield {
+                "number": spec.get("number"),
+                "name": spec.get("name"),
+                "error": f"{type(error).__name__}: {error}",
+            }
+        else:
+            yield order
+
+
+def get_rates(spec: Mapping[str, Any]) -> tuple[Costs, Multipliers]:
+    """Rates from ``{"costs": {...}, "multipliers": {...}}``."""
+    try:
+        return Costs(**spec["costs"]), Multipliers(**spec["multipliers"])
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"invalid rates: {error}") from None
+
+
+def load_rates(path: str | Path) -> tuple[Costs, Multipliers]:
+    with Path(path).open(encoding="utf-8") as fp:
+        return get_rates(json.load(fp))
+
+
+def load_orders(
+    path: str | Path, pipes: Mapping[str, Pipe] | None = None
+) -> Iterator[Order]:
+    return OrderLoader(pipes).iter_file(path)
+
+
+__all__ = [
+    "OrderLoader",
+    "iter_jsonl_specs",
+    "iter_csv_specs",
+    "iter_file_specs",
+    "init_worker",
+    "get_loader",
+    "calculate_specs",
+    "get_rates",
+    "load_rates",
+    "load_orders",
+]
@@ -0,0 +1,525 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+from . import Order, SheetItem
+
+
+EPSILON = 1e-9
+
+# part index, sheet position x and y, and whether the part is turned 90°
+Placement = tuple[int, float, float, bool]
+
+
+@dataclass(frozen=True)
+class StockSheet:
+    width: float
+    height: float
+    thickness: float
+    cost: float
+
+    @property
+    def area(self) -> float:
+        return self.width * self.height
+
+    def __str__(self) -> str:
+        return f"{self.width}x{self.height}x{self.thickness}"
+
+
+@dataclass
+class SheetPart:
+    item: SheetItem
+    width: float
+    height: float
+    sheet: int = -1
+    x: float = 0.0
+    y: float = 0.0
+    rotated: bool = False
+    cost: float = 0.0
+
+    @property
+    def area(self) -> float:
+        return self.width * self.height
+
+
+@dataclass
+class ThicknessNestingPlan:
+    stock: StockSheet
+    spacing: float
+    parts: list[SheetPart] = field(default_factory=list[SheetPart])
+    sheets: list[list[int]] = field(default_factory=list[list[int]])
+
+    @property
+    def sheet_count(self) -> int:
+        return len(self.sheets)
+
+    @property
+    def used_area(self) -> float:
+        return sum(part.area for part in self.parts)
+
+    @property
+    def utilization(self) -> float:
+        if not self.sheets:
+            return 0.0
+        return self.used_area / (self.sheet_count * self.stock.area)
+
+    @property
+    def material_cost(self) -> float:
+        return self.sheet_count * self.stock.cost
+
+    def __str__(self) -> str:
+        return (
+            f"{self.stock}: {self.sheet_count} листов, "
+            f"использование {self.utilization:.0%}, "
+            f"{self.material_cost:,.2f} руб"
+        )
+
+
+@dataclass
+class NestingPlan:
+    thicknesses: list[ThicknessNestingPlan] = field(
+        default_factory=list[ThicknessNestingPlan]
+    )
+
+    @property
+    def sheet_count(self) -> int:
+        return sum(plan.sheet_count for plan in self.thicknesses)
+
+    @property
+    def material_cost(self) -> float:
+        return sum(plan.material_cost for plan in self.thicknesses)
+
+    @property
+    def utilization(self) -> float:
+        area = sum(
+            plan.sheet_count * plan.stock.area for plan in self.thicknesses
+        )
+        if not area:
+            return 0.0
+        return sum(plan.used_area for plan in self.thicknesses) / area
+
+    def get_item_cost(self, item: SheetItem) -> float:
+        """Average material cost of one part of `item`."""
+        costs = [
+            part.cost
+            for plan in self.thicknesses
+            for part in plan.parts
+            if part.item is item
+        ]
+        if not costs:
+            return 0.0
+        return sum(costs) / len(costs)
+
+    def apply(self) -> None:
+        """Replace the `sheet_cost` of every nested item by the average
+        cost of its parts, overwriting the cost it was loaded with.
+
+        A part costs its sheet's share by area, so the sheet costs of the
+        items times their part counts add up to `material_cost`. The
+        assignment marks the items dirty, `Order.recalculate` prices them
+        again.
+        """
+        totals: dict[int, list[float]] = {}
+        items: dict[int, SheetItem] = {}
+        for plan in self.thicknesses:
+            for part in plan.parts:
+                total = totals.setdefault(id(part.item), [0.0, 0])
+                total[0] += part.cost
+                total[1] += 1
+                items[id(part.item)] = part.item
+        for key, (cost, count) in totals.items():
+            items[key].sheet_cost = cost / count
+
+    def __str__(self) -> str:
+        return "".join(f"{plan}\n" for plan in self.thicknesses)
+
+
+def get_order_parts(order: Order) -> list[SheetPart]:
+    """Parts of all sheet items of an order that have a blank size and
+    thickness, `item.count` parts per sheet of a tube item."""
+    parts: list[SheetPart] = []
+    for item in order.items:
+        if isinstance(item, SheetItem):
+            sheets: Iterable[tuple[SheetItem, int]] = [(item, item.count)]
+        else:
+            sheets = (
+                (sheet, sheet.count * item.count)
+                for sheet in getattr(item, "sheet_items", ())
+            )
+        for sheet, count in sheets:
+            if None in (sheet.width, sheet.height, sheet.thickness):
+                continue
+            parts.extend(
+                SheetPart(sheet, sheet.width, sheet.height)  # type: ignore
+                for _ in range(count)
+            )
+    return parts
+
+
+def plan_order_sheets(
+    order: Order, stock: Sequence[StockSheet], spacing: float = 0.0
+) -> NestingPlan:
+    """Nest the sheet parts of an order onto stock sheets, one thickness at
+    a time, choosing the cheapest sheet size for each thickness."""
+    groups: dict[float, list[SheetPart]] = {}
+    for part in get_order_parts(order):
+        groups.setdefault(part.item.thickness, []).append(part)  # type: ignore
+
+    plan = NestingPlan()
+    for thickness, parts in groups.items():
+        sizes = [
+            sheet
+            for sheet in stock
+            if abs(sheet.thickness - thickness) < EPSILON
+        ]
+        if not sizes:
+            raise ValueError(f"no stock sheets {thickness} mm thick")
+        plan.thicknesses.append(
+            plan_thickness_sheets(parts, sizes, spacing)
+        )
+    return plan
+
+
+def plan_thickness_sheets(
+    parts: list[SheetPart],
+    stock: Sequence[StockSheet],
+    spacing: float = 0.0,
+) -> ThicknessNestingPlan:
+    """Nest parts onto the sheet size of `stock` that costs least overall.
+    `spacing` is kept between parts, as a kerf."""
+    candidates = [
+        sheet
+        for sheet in stock
+        if all(_fits(part, sheet, spacing) for part in parts)
+    ]
+    if not candidates:
+        raise ValueError(
+            "a part is larger than any "
+            f"{stock[0].thickness} mm stock sheet"
+        )
+
+    best: ThicknessNestingPlan | None = None
+    best_placements: list[list[Placement]] = []
+    sizes = [(part.width + spacing, part.height + spacing) for part in parts]
+    for sheet in candidates:
+        placements = pack_rectangles(
+            sizes, sheet.width + spacing, sheet.height + spacing
+        )
+        plan = ThicknessNestingPlan(sheet, spacing, parts)
+        for placed in placements:
+            plan.sheets.append([index for index, _, _, _ in placed])
+        if best is None or plan.material_cost < best.material_cost:
+            best, best_placements = plan, placements
+    assert best is not None
+
+    for index, placed in enumerate(best_placements):
+        used = sum(parts[part].area for part, _, _, _ in placed)
+        for part, x, y, rotated in placed:
+            piece = parts[part]
+            piece.sheet, piece.x, piece.y = index, x, y
+            piece.rotated = rotated
+            piece.cost = best.stock.cost * piece.area / used
+    return best
+
+
+def pack_rectangles(
+    sizes: Sequence[tuple[float, float]],
+    width: float,
+    height: float,
+    rotate: bool = True,
+) -> list[list[Placement]]:
+    """Pack rectangles onto as few `width` by `height` sheets as possible.
+
+    Rectangles go largest first, each onto the first sheet it fits, at
+    the lowest and then leftmost position of that sheet's skyline, turned
+    90° if `rotate` and that sits lower.
+    """
+    order = sorted(
+        range(len(sizes)),
+        key=lambda index: (max(sizes[index]), min(sizes[index])),
+        reverse=True,
+    )
+    # the smallest area of the parts from each one on, a sheet with less
+    # free area than that takes no more parts and is closed
+    smallest = [float("inf")] * (len(order) + 1)
+    for position in range(len(order) - 1, -1, -1):
+        part_width, part_height = sizes[order[position]]
+        smallest[position] = min(
+            smallest[position + 1], part_width * part_height
+        )
+
+    sheets: list[_Skyline] = []
+    placements: list[list[Placement]] = []
+    # open sheets by the largest square that may still fit on them, a
+    # part only needs to try those that take its short side
+    open_sheets = _SheetIndex()
+    for position, index in enumerate(order):
+        part_width, part_height = sizes[index]
+        side = min(part_width, part_height) - 2 * EPSILON
+        number = open_sheets.first(side)
+        while number is not None:
+            sheet, placed = sheets[number], placements[number]
+            place = sheet.find(part_width, part_height, rotate)
+            if place is not None:
+                break
+            open_sheets.set(number, sheet.square)
+            number = open_sheets.first(side, number + 1)
+        else:
+            number = len(sheets)
+            sheet = _Skyline(width, height)
+            sheets.append(sheet)
+            placed = []
+            placements.append(placed)
+            place = sheet.find(part_width, part_height, rotate)
+            if place is None:
+                raise ValueError(
+                    f"{part_width}x{part_height} does not fit a "
+                    f"{width}x{height} sheet"
+                )
+        segment, x, y, rotated = place
+        if rotated:
+            sheet.place(segment, part_height, part_width, y)
+        else:
+            sheet.place(segment, part_width, part_height, y)
+        placed.append((index, x, y, rotated))
+        if sheet.free_area < smallest[position + 1] - EPSILON:
+            open_sheets.set(number, -1.0)
+        else:
+            open_sheets.set(number, sheet.square)
+    return placements
+
+
+class _SheetIndex:
+    """A value per sheet number in a max segment tree, to find the first
+    sheet with at least some value in logarithmic time. Sheets not set
+    yet have -1."""
+
+    def __init__(self) -> None:
+        self.size = 1
+        self.tree = [-1.0, -1.0]
+
+    def set(self, sheet: int, value: float) -> None:
+        if sheet >= self.size:
+            self._grow(sheet + 1)
+        tree = self.tree
+        node = self.size + sheet
+        if tree[node] == value:
+            return
+        tree[node] = value
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def first(self, value: float, start: int = 0) -> int | None:
+        """Number of the first sheet from `start` on with at least
+        `value`."""
+        tree, size = self.tree, self.size
+        if start >= size:
+            return None
+        node = size + start
+        if tree[node] >= value:
+            return start
+        # climb until a right sibling holds a large enough value
+        while True:
+            if node & 1 == 0 and tree[node + 1] >= value:
+                node += 1
+                break
+            node //= 2
+            if node <= 1:
+                return None
+        # and descend to its leftmost such leaf
+        while node < size:
+            node *= 2
+            if tree[node] < value:
+                node += 1
+        return node - size
+
+    def _grow(self, sheets: int) -> None:
+        size = self.size
+        while size < sheets:
+            size *= 2
+        leaves = self.tree[self.size :]
+        tree = [-1.0] * (2 * size)
+        tree[size : size + len(leaves)] = leaves
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.size, self.tree = size, tree
+
+
+class _Skyline:
+    """Free space of a sheet as the top outline of the parts placed so far:
+    segments with their left edge, height and width, left to right."""
+
+    def __init__(self, width: float, height: float) -> None:
+        self.width = width
+        self.height = height
+        self.xs = [0.0]
+        self.ys = [0.0]
+        self.widths = [width]
+        # the area above the skyline, the space under it is lost
+        self.free_area = width * height
+        # the widest runs of segments by the height free above them, as
+        # (width, height) widest first, worked out once a part does not
+        # fit and None after a part is placed
+        self.spaces: list[tuple[float, float]] | None = [(width, height)]
+        # the side of the largest square part that may fit, exact with
+        # the spaces and an upper bound otherwise
+        self.square = min(width, height)
+        # the smallest part known not to fit, as (short side, long side)
+        # when parts may be turned
+        self.rejected: tuple[float, float] | None = None
+
+    def find(
+        self, width: float, height: float, rotate: bool
+    ) -> tuple[int, float, float, bool] | None:
+        """Segment, position and turn for the lowest placement, if any."""
+        sides = (width, height)
+        if rotate:
+            sides = (min(sides), max(sides))
+        rejected = self.rejected
+        if (
+            width * height > self.free_area + EPSILON
+            or rejected is not None
+            and sides[0] >= rejected[0] - EPSILON
+            and sides[1] >= rejected[1] - EPSILON
+        ):
+            return None
+        if self.spaces is not None and not (
+            self._has_space(width, height)
+            or rotate
+            and self._has_space(height, width)
+        ):
+            self.rejected = sides
+            return None
+
+        best: tuple[float, float, int, bool, float] | None = None
+        turns = [False, True] if rotate and width != height else [False]
+        for rotated in turns:
+            part_width, part_height = (
+                (height, width) if rotated else (width, height)
+            )
+            for segment in range(len(self.xs)):
+                y = self._fit(segment, part_width, part_height)
+                if y is None:
+                    continue
+                key = (y + part_height, self.xs[segment], segment, rotated, y)
+                if best is None or key < best:
+                    best = key
+        if best is None:
+            self.rejected = sides
+            if self.spaces is None:
+                self._find_spaces()
+            return None
+        _, x, segment, rotated, y = best
+        return segment, x, y, rotated
+
+    def place(
+        self, segment: int, width: float, height: float, y: float
+    ) -> None:
+        xs, ys, widths = self.xs, self.ys, self.widths
+        x = xs[segment]
+        right = x + width
+        top = y + height
+        # drop or shorten the segments the part now covers
+        end = segment
+        while end < len(xs) and xs[end] + widths[end] <= right + EPSILON:
+            self.free_area -= widths[end] * (top - ys[end])
+            end += 1
+        if end < len(xs) and xs[end] < right - EPSILON:
+            self.free_area -= (right - xs[end]) * (top - ys[end])
+            widths[end] -= right - xs[end]
+            xs[end] = right
+        xs[segment:end] = [x]
+        ys[segment:end] = [top]
+        widths[segment:end] = [width]
+        self.spaces = None
+        self._merge(segment)
+
+    def _has_space(self, width: float, height: float) -> bool:
+        # whether some run of segments may take the part, with the slack
+        # `_fit` allows
+        for run_width, room in self.spaces or ():
+            if run_width < width - 2 * EPSILON:
+                return False
+            if room >= height - 2 * EPSILON:
+                return True
+        return False
+
+    def _find_spaces(self) -> None:
+        # the widest run under every segment's height is the only one with
+        # that much free height worth keeping, its ends are the nearest
+        # higher segments
+        xs, ys, widths = self.xs, self.ys, self.widths
+        count = len(xs)
+        lefts = [0.0] * count
+        higher: list[int] = []
+        for index in range(count):
+            while higher and ys[higher[-1]] <= ys[index]:
+                higher.pop()
+            lefts[index] = xs[higher[-1] + 1] if higher else 0.0
+            higher.append(index)
+        runs = []
+        higher.clear()
+        for index in range(count - 1, -1, -1):
+            while higher and ys[higher[-1]] <= ys[index]:
+                higher.pop()
+            right = xs[higher[-1]] if higher else xs[-1] + widths[-1]
+            runs.append((right - lefts[index], self.height - ys[index]))
+            higher.append(index)
+        runs.sort(reverse=True)
+        spaces: list[tuple[float, float]] = []
+        for run_width, room in runs:
+            if not spaces or room > spaces[-1][1]:
+                spaces.append((run_width, room))
+        self.spaces = spaces
+        self.square = max(min(run) for run in spaces)
+
+    def _fit(self, segment: int, width: float, height: float) -> float | None:
+        xs, ys, widths = self.xs, self.ys, self.widths
+        if xs[segment] + width > self.width + EPSILON:
+            return None
+        y = 0.0
+        remaining = width
+        while remaining > EPSILON:
+            if segment == len(xs):
+                return None
+            if ys[segment] > y:
+                y = ys[segment]
+            if y + height > self.height + EPSILON:
+                return None
+            remaining -= widths[segment]
+            segment += 1
+        return y
+
+    def _merge(self, segment: int) -> None:
+        xs, ys, widths = self.xs, self.ys, self.widths
+        start = max(segment - 1, 0)
+        index = start
+        while index + 1 < len(xs) and index <= segment + 1:
+            if abs(ys[index] - ys[index + 1]) < EPSILON:
+                widths[index] += widths[index + 1]
+                del xs[index + 1], ys[index + 1], widths[index + 1]
+            else:
+                index += 1
+
+
+def _fits(part: SheetPart, sheet: StockSheet, spacing: float) -> bool:
+    width = part.width + spacing
+    height = part.height + spacing
+    sheet_width = sheet.width + spacing
+    sheet_height = sheet.height + spacing
+    return (
+        width <= sheet_width + EPSILON and height <= sheet_height + EPSILON
+    ) or (width <= sheet_height + EPSILON and height <= sheet_width + EPSILON)
+
+
+__all__ = [
+    "StockSheet",
+    "SheetPart",
+    "ThicknessNestingPlan",
+    "NestingPlan",
+    "get_order_parts",
+    "plan_order_sheets",
+    "plan_thickness_sheets",
+    "pack_rectangles",
+]
@@ -1,15 +1,37 @@
-from dataclasses import dataclass, field
+import datetime
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Callable, Iterator, TextIO
 from contextlib import contextmanager
+from functools import cached_property
 
-from . import BaseItem, Costs, Multipliers, TubeItem, SheetItem
+from . import (
+    Cached,
+    BaseItem,
+    Costs,
+    Multipliers,
+    OrderPricing,
+    Pipe,
+    TubeItem,
+    SheetItem,
+    OrderSummary,
+)
+
+if TYPE_CHECKING:
+    from .price_cache import PriceCache
 
 
 @dataclass
-class Order():
+class Order(Cached):
     number: int
     name: str
     minimum_cutting_cost: int = 500
     items: list[BaseItem] = field(default_factory=list[BaseItem])
+    date: datetime.date | None = None
+
+    _dependencies = ("items",)
+
+    def __post_init__(self) -> None:
+        self.rates: tuple[Costs, Multipliers] | None = None
 
     # def __post_init__(self) -> None:
     #     self.items: list[BaseItem] = []
@@ -18,51 +40,183 @@ class Order():
         return self.items[key]
     
     def __str__(self) -> str:
-        result = f'Заказ №{self.number}\n'
-        result += f'Резка: {self.cutting_length:,.2f} мм, {self.cutting_cost:,.2f} руб <= {self.adjusted_cutting_price:,.2f} руб\n'
+        return "".join(self.iter_report())
+
+    def iter_report(self) -> Iterator[str]:
+        summary = self.summary
+        yield f'Заказ №{self.number}\n'
+        yield f'Резка: {summary.cutting_length:,.2f} мм, {summary.cutting_cost:,.2f} руб <= {summary.adjusted_cutting_price:,.2f} руб\n'
+
+        for item in self.items:
+            yield from item.iter_report()
+
+    def write_report(self, fp: TextIO) -> None:
+        fp.writelines(self.iter_report())
+
+    @property
+    def summary(self) -> OrderSummary:
+        summary = self._summary
+        if len(summary.items) != len(self.items):
+            # items appended to or removed from the list in place do not
+            # invalidate the order, the summary is of the old items then
+            self.invalidate()
+            summary = self._summary
+        return summary
+
+    @cached_property
+    def _summary(self) -> OrderSummary:
+        return self._collect_summary()
+
+    def get_summary(
+        self, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> OrderSummary:
+        """`summary` with the tube costs of `pipes(tube.pipe)` if given."""
+        if pipes is None:
+            return self.summary
+        return self._collect_summary(pipes)
 
+    def _collect_summary(
+        self, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> OrderSummary:
+        summary = OrderSummary()
         for item in self.items:
-            result += str(item)
-        return result
+            item_summary = item.get_summary(pipes)
+            summary.items.append(item_summary)
+            summary.incuts_count += item_summary.incuts_count
+            summary.cutting_length += item_summary.cutting_length
+            summary.cutting_cost += item_summary.cutting_cost * item.count
+            summary.welding_length += item_summary.welding_length
+            summary.area += item_summary.area
+            summary.bending_count += item_summary.bending_count
+            summary.sundries_count += item_summary.sundries_count
+            summary.riveting_count += item_summary.riveting_count
+            summary.countersink_count += item_summary.countersink_count
+            summary.threading_count += item_summary.threading_count
+        summary.adjusted_cutting_price = max(
+            summary.cutting_cost, self.minimum_cutting_cost
+        )
+        return summary
 
     @property
     def incuts_count(self) -> int:
-        return sum(item.incuts_count for item in self.items)
+        return self.summary.incuts_count
 
     @property
     def cutting_length(self) -> float:
-        return sum(item.cutting_length for item in self.items)
+        return self.summary.cutting_length
 
     @property
     def cutting_cost(self) -> float:
-        return sum(item.cutting_cost * item.count for item in self.items)
+        return self.summary.cutting_cost
 
     @property
     def adjusted_cutting_price(self) -> float:
-        result = self.cutting_cost
-        if result < self.minimum_cutting_cost:
-            result = self.minimum_cutting_cost
-        return result
-
-    def calculate(self, costs: Costs, multipliers: Multipliers):
-        cutting_price = self.cutting_cost
-        adjusted_cutting_price = self.adjusted_cutting_price
-        for item in self.items:
-            item_cutting_price = (
-                adjusted_cutting_price / cutting_price * item.cutting_cost
+        return self.summary.adjusted_cutting_price
+
+    def get_pricing(
+        self,
+        costs: Costs,
+        multipliers: Multipliers,
+        pipes: Callable[[Pipe], Pipe] | None = None,
+    ) -> OrderPricing:
+        """Prices of the order, leaving the order, its items and tubes
+        unchanged, unlike `calculate`. Pipes are replaced by `pipes(pipe)`
+        if given, like `RateCard.get_pipe`.
+
+        Only the geometry of the order is memoized, which is the same under
+        any rates, so an order that is not being edited can be priced under
+        several rates from several threads at once.
+        """
+        summary = self.get_summary(pipes)
+        return OrderPricing(
+            self.number,
+            summary.adjusted_cutting_price,
+            tuple(
+                item.get_pricing(item_cutting_price, costs, multipliers, pipes)
+                for item, item_cutting_price in self.get_item_cutting_prices(
+                    summary
+                )
+            ),
+        )
+
+    def calculate(
+        self,
+        costs: Costs,
+        multipliers: Multipliers,
+        cache: "PriceCache | None" = None,
+    ):
+        self.rates = (replace(costs), replace(multipliers))
+        for item, item_cutting_price in self.get_item_cutting_prices():
+            item.calculate_price(item_cutting_price, costs, multipliers, cache)
+            item.mark_clean()
+        self.mark_clean()
+
+    def recalculate(
+        self,
+        costs: Costs | None = None,
+        multipliers: Multipliers | None = None,
+        cache: "PriceCache | None" = None,
+    ):
+        if self.rates is None:
+            raise ValueError("recalculate requires a previous calculate")
+        last_costs, last_multipliers = self.rates
+        if (costs is not None and costs != last_costs) or (
+            multipliers is not None and multipliers != last_multipliers
+        ):
+            self.calculate(
+                costs or last_costs, multipliers or last_multipliers, cache
             )
-            item.calculate_price(
-                item_cutting_price, costs, multipliers
+            return
+
+        for item, item_cutting_price in self.get_item_cutting_prices():
+            if item.is_dirty:
+                item.calculate_price(
+                    item_cutting_price, last_costs, last_multipliers, cache
+                )
+                item.mark_clean()
+            else:
+                item.update_cutting_price(item_cutting_price, last_multipliers)
+        self.mark_clean()
+
+    def get_item_cutting_prices(
+        self, summary: OrderSummary | None = None
+    ) -> Iterator[tuple[BaseItem, float]]:
+        if summary is None:
+            summary = self.summary
+        cutting_price = summary.cutting_cost
+        adjusted_cutting_price = summary.adjusted_cutting_price
+        for item, item_summary in zip(
+            self.items, summary.items, strict=True
+        ):
+            if cutting_price == 0:
+                # nothing to cut, the minimum cutting cost does not apply
+                yield item, 0.0
+                continue
+            item_cutting_price = (
+                adjusted_cutting_price
+                / cutting_price
+                * item_summary.cutting_cost
             )
+            yield item, item_cutting_price
 
     @contextmanager
     def add_tube_item(self, name: str):
         item = TubeItem(name)
-        self.items.append(item)
+        self._append("items", item)
         yield item
 
     @contextmanager
     def add_sheet_item(self, name: str):
         item = SheetItem(name, 0)
-        self.items.append(item)
+        self._append("items", item)
         yield item
+
+
+def price_order(
+    order: Order,
+    costs: Costs,
+    multipliers: Multipliers,
+    pipes: Callable[[Pipe], Pipe] | None = None,
+) -> OrderPricing:
+    """Prices of `order` without changing it, see `Order.get_pricing`."""
+    return order.get_pricing(costs, multipliers, pipes)
@@ -0,0 +1,159 @@
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from math import ceil
+from multiprocessing import get_all_start_methods, get_context
+from os import cpu_count
+from threading import active_count
+from time import perf_counter
+from typing import Iterable, Iterator, Sequence
+
+from . import BaseItem, Costs, Multipliers, Order, PriceBreakdown
+
+
+# the orders of `calculate_many`, set in forked workers only
+_shared_orders: Sequence[Order] = ()
+
+
+@dataclass
+class ItemPrices:
+    prices: PriceBreakdown
+    sheet_items: list["ItemPrices"] = field(
+        default_factory=list["ItemPrices"]
+    )
+
+    @classmethod
+    def of(cls, item: BaseItem) -> "ItemPrices":
+        return cls(
+            item.prices,
+            [cls.of(sheet) for sheet in getattr(item, "sheet_items", ())],
+        )
+
+    def apply(self, item: BaseItem) -> None:
+        item.prices = self.prices
+        for sheet, prices in zip(
+            getattr(item, "sheet_items", ()), self.sheet_items
+        ):
+            prices.apply(sheet)
+        item.mark_clean()
+
+
+@dataclass
+class BatchResult:
+    orders: list[list[ItemPrices]]
+    elapsed: float
+    workers: int
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed == 0:
+            return 0.0
+        return len(self.orders) / self.elapsed
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.orders)} заказов за {self.elapsed:,.2f} с "
+            f"({self.throughput:,.1f} заказов/с, {self.workers} процессов)"
+        )
+
+
+def calculate_many(
+    orders: Sequence[Order],
+    costs: Costs,
+    multipliers: Multipliers,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+) -> BatchResult:
+    """Price orders in a process pool and copy the prices back into them.
+
+    Orders are handed to the workers in chunks and the results come back in
+    input order, so after the call every order is priced as if
+    `Order.calculate` had been called on it. Where processes can be forked
+    the workers get the orders through the pool initializer, read them from
+    the inherited memory and only send the prices back. A process running
+    other threads is not forked, as a lock one of them holds would stay
+    locked in the workers: the chunks are pickled to `forkserver` workers
+    then, or `spawn` ones where there is no fork server.
+    """
+    workers = workers or cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, ceil(len(orders) / (workers * 4)))
+
+    start = perf_counter()
+    if workers == 1:
+        results = [_calculate_chunk(orders, costs, multipliers)]
+    elif "fork" in get_all_start_methods() and active_count() == 1:
+        # forked workers inherit the initializer arguments without pickling
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("fork"),
+            initializer=_share_orders,
+            initargs=(orders,),
+        ) as executor:
+            results = list(
+                executor.map(
+                    _calculate_shared,
+                    range(0, len(orders), chunk_size),
+                    repeat(chunk_size),
+                    repeat(costs),
+                    repeat(multipliers),
+                )
+            )
+    else:
+        method = (
+            "forkserver"
+            if "forkserver" in get_all_start_methods()
+            else "spawn"
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context(method)
+        ) as executor:
+            results = list(
+                executor.map(
+                    _calculate_chunk,
+                    _chunks(orders, chunk_size),
+                    repeat(costs),
+                    repeat(multipliers),
+                )
+            )
+
+    priced = [prices for chunk in results for prices in chunk]
+    for order, items in zip(orders, priced):
+        for item, prices in zip(order.items, items):
+            prices.apply(item)
+        order.rates = (replace(costs), replace(multipliers))
+        order.mark_clean()
+    return BatchResult(priced, perf_counter() - start, workers)
+
+
+def _calculate_chunk(
+    orders: Iterable[Order], costs: Costs, multipliers: Multipliers
+) -> list[list[ItemPrices]]:
+    result: list[list[ItemPrices]] = []
+    for order in orders:
+        order.calculate(costs, multipliers)
+        result.append([ItemPrices.of(item) for item in order.items])
+    return result
+
+
+def _share_orders(orders: Sequence[Order]) -> None:
+    global _shared_orders
+
+    _shared_orders = orders
+
+
+def _calculate_shared(
+    start: int, size: int, costs: Costs, multipliers: Multipliers
+) -> list[list[ItemPrices]]:
+    return _calculate_chunk(
+        _shared_orders[start : start + size], costs, multipliers
+    )
+
+
+def _chunks(orders: Sequence[Order], size: int) -> Iterator[list[Order]]:
+    iterator = iter(orders)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+__all__ = ["ItemPrices", "BatchResult", "calculate_many"]
@@ -1,31 +1,75 @@
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from functools import cached_property
 from math import sin, cos, pi
+from typing import Iterable
 
-from . import Cut
+from . import Cut, Cached
 
 
 @dataclass
-class Pipe(ABC):
+class Pipe(Cached, ABC):
     cost: float
     thickness: float
     incut_cost: float
     cutting_cost: float
     carrying_cost: float
 
+    cut_lengths_limit = 1024
+
     @property
     @abstractmethod
     def perimeter(self) -> float:
         pass
 
     @abstractmethod
-    def get_cut_length(self, cut: Cut) -> float:
+    def calculate_cut_length(self, cut: Cut) -> float:
         pass
 
     @abstractmethod
-    def get_bended_cut_length(self, bended_cut: Cut) -> float:
+    def calculate_bended_cut_length(self, bended_cut: Cut) -> float:
         pass
 
+    @cached_property
+    def cut_lengths(self) -> dict[tuple[int, str | None, bool], float]:
+        return {}
+
+    def get_cut_length(self, cut: Cut) -> float:
+        key = (cut.angle, cut.side, False)
+        result = self.cut_lengths.get(key)
+        if result is None:
+            result = self.calculate_cut_length(cut)
+            self._store_cut_length(key, result)
+        return result
+
+    def get_bended_cut_length(self, bended_cut: Cut) -> float:
+        key = (bended_cut.angle, bended_cut.side, True)
+        result = self.cut_lengths.get(key)
+        if result is None:
+            result = self.calculate_bended_cut_length(bended_cut)
+            self._store_cut_length(key, result)
+        return result
+
+    def get_cut_lengths(
+        self, cuts: Iterable[Cut], bended: bool = False
+    ) -> list[float]:
+        get = self.get_bended_cut_length if bended else self.get_cut_length
+        return [get(cut) for cut in cuts]
+
+    def _store_cut_length(
+        self, key: tuple[int, str | None, bool], length: float
+    ) -> None:
+        # threads pricing orders with the same pipe share its lengths, only
+        # single dict operations are safe to race
+        cut_lengths = self.cut_lengths
+        if len(cut_lengths) >= self.cut_lengths_limit:
+            try:
+                cut_lengths.pop(next(iter(cut_lengths), None), None)
+            except RuntimeError:
+                # another thread changed the lengths meanwhile
+                pass
+        cut_lengths[key] = length
+
 
 @dataclass
 class RoundPipe(Pipe):
@@ -34,14 +78,14 @@ class RoundPipe(Pipe):
     def __str__(self) -> str:
         return f"D{self.diameter}x{self.thickness}"
 
-    @property
+    @cached_property
     def perimeter(self) -> float:
         return self.diameter * pi
 
-    def get_cut_length(self, cut: Cut):
+    def calculate_cut_length(self, cut: Cut):
         return self.perimeter / sin(cut.angle / 180 * pi)
     
-    def get_bended_cut_length(self, bended_cut: Cut):
+    def calculate_bended_cut_length(self, bended_cut: Cut):
         return 0.0
 
 
@@ -55,11 +99,11 @@ class RectPipe(Pipe):
         first, second = sorted([self.width, self.height])
         return f"{first}x{second}x{self.thickness}"
 
-    @property
+    @cached_property
     def perimeter(self) -> float:
         return (self.width + self.height) * 2
 
-    def get_cut_length(self, cut: Cut):
+    def calculate_cut_length(self, cut: Cut):
         if cut.angle == 90:
             return self.perimeter
 
@@ -70,7 +114,7 @@ class RectPipe(Pipe):
             hypotenuse = self.height / sin(cut.angle * 180 / pi)
             return (hypotenuse + self.width) * 2
         
-    def get_bended_cut_length(self, bended_cut: Cut):
+    def calculate_bended_cut_length(self, bended_cut: Cut):
         angle = bended_cut.angle // 2
 
         if bended_cut.side == "width":
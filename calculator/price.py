@@ -1,9 +1,206 @@
+from array import array
 from dataclasses import dataclass
+from typing import Iterator
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Price:
     cost: float = 0.0
     final: float = 0.0
 
     def __str__(self) -> str:
-        return f'{self.cost:,.2f} руб -> {self.final:,.2f} руб'
\ No newline at end of file
+        return f'{self.cost:,.2f} руб -> {self.final:,.2f} руб'
+
+
+class PriceBreakdown:
+    """Item prices by operation stored in two fixed-layout float arrays.
+
+    Behaves like the `dict[str, Price]` it replaces: operations are read and
+    written by name and iterate in layout order, which is also the order the
+    items price them in.
+    """
+
+    operations = (
+        "cutting",
+        "pipe",
+        "sheet",
+        "welding",
+        "bending",
+        "riveting",
+        "weld_cleaning",
+        "transport",
+        "project",
+        "cleaning",
+        "painting",
+        "sundries",
+        "carrying",
+        "countersink",
+        "threading",
+        "total",
+    )
+    index = {name: index for index, name in enumerate(operations)}
+
+    __slots__ = ("cost", "final", "mask")
+
+    def __init__(self) -> None:
+        self.cost = array("d", bytes(8 * len(self.operations)))
+        self.final = array("d", bytes(8 * len(self.operations)))
+        self.mask = 0
+
+    def __getitem__(self, name: str) -> Price:
+        index = self.index[name]
+        if not self.mask >> index & 1:
+            raise KeyError(name)
+        return Price(self.cost[index], self.final[index])
+
+    def __setitem__(self, name: str, price: Price) -> None:
+        index = self.index[name]
+        self.cost[index] = price.cost
+        self.final[index] = price.final
+        self.mask |= 1 << index
+
+    def __contains__(self, name: object) -> bool:
+        index = self.index.get(name)  # type: ignore
+        return index is not None and bool(self.mask >> index & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.keys()
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PriceBreakdown):
+            return dict(self.items()) == dict(other.items())
+        if isinstance(other, dict):
+            return dict(self.items()) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PriceBreakdown({dict(self.items())!r})"
+
+    def __getstate__(self) -> tuple[bytes, bytes, int]:
+        return self.cost.tobytes(), self.final.tobytes(), self.mask
+
+    def __setstate__(self, state: tuple[bytes, bytes, int]) -> None:
+        cost, final, self.mask = state
+        self.cost = array("d", cost)
+        self.final = array("d", final)
+
+    def get(self, name: str, default: Price | None = None) -> Price | None:
+        if name in self:
+            return self[name]
+        return default
+
+    def keys(self) -> Iterator[str]:
+        mask = self.mask
+        for index, name in enumerate(self.operations):
+            if mask >> index & 1:
+                yield name
+
+    def values(self) -> Iterator[Price]:
+        for name in self.keys():
+            yield self[name]
+
+    def items(self) -> Iterator[tuple[str, Price]]:
+        for name in self.keys():
+            yield name, self[name]
+
+
+@dataclass(frozen=True, slots=True)
+class TubePricing:
+    """Rate-dependent costs of one tube of an item, `count` identical
+    tubes, with the pipe designation the rates were taken for."""
+
+    pipe: str
+    length: float
+    count: int
+    pipe_cost: float
+    cutting_cost: float
+    carrying_cost: float
+
+
+@dataclass(frozen=True, slots=True)
+class ItemPricing:
+    """Immutable prices of one item unit, laid out like `PriceBreakdown`,
+    with the tubes and priced sheet items of the item."""
+
+    name: str
+    count: int
+    cost: tuple[float, ...]
+    final: tuple[float, ...]
+    mask: int
+    tubes: tuple[TubePricing, ...] = ()
+    sheet_items: tuple["ItemPricing", ...] = ()
+
+    @classmethod
+    def of(
+        cls,
+        name: str,
+        count: int,
+        prices: PriceBreakdown,
+        tubes: tuple[TubePricing, ...] = (),
+        sheet_items: tuple["ItemPricing", ...] = (),
+    ) -> "ItemPricing":
+        return cls(
+            name,
+            count,
+            tuple(prices.cost),
+            tuple(prices.final),
+            prices.mask,
+            tubes,
+            sheet_items,
+        )
+
+    def __getitem__(self, name: str) -> Price:
+        index = PriceBreakdown.index[name]
+        if not self.mask >> index & 1:
+            raise KeyError(name)
+        return Price(self.cost[index], self.final[index])
+
+    def __contains__(self, name: object) -> bool:
+        index = PriceBreakdown.index.get(name)  # type: ignore
+        return index is not None and bool(self.mask >> index & 1)
+
+    def keys(self) -> Iterator[str]:
+        mask = self.mask
+        for index, name in enumerate(PriceBreakdown.operations):
+            if mask >> index & 1:
+                yield name
+
+    def items(self) -> Iterator[tuple[str, Price]]:
+        for name in self.keys():
+            yield name, self[name]
+
+    @property
+    def total(self) -> Price:
+        return self["total"]
+
+    def get_breakdown(self) -> PriceBreakdown:
+        """A mutable copy of the prices."""
+        prices = PriceBreakdown()
+        prices.cost = array("d", self.cost)
+        prices.final = array("d", self.final)
+        prices.mask = self.mask
+        return prices
+
+
+@dataclass(frozen=True, slots=True)
+class OrderPricing:
+    """Immutable prices of an order, items in order of `Order.items`."""
+
+    number: int
+    adjusted_cutting_price: float
+    items: tuple[ItemPricing, ...]
+
+    def __getitem__(self, key: int) -> ItemPricing:
+        return self.items[key]
+
+    @property
+    def total(self) -> Price:
+        """Prices of all items times their counts."""
+        cost = final = 0.0
+        for item in self.items:
+            total = item.total
+            cost += total.cost * item.count
+            final += total.final * item.count
+        return Price(cost, final)
@@ -0,0 +1,224 @@
+import sqlite3
+import sys
+from array import array
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterator
+
+from . import BaseItem, Costs, Multipliers, PriceBreakdown, content_hash
+
+# layout of the stored prices, part of every key and the schema version
+FORMAT_VERSION = 2
+
+
+class PriceCache:
+    """Item price breakdowns stored in SQLite by content hash.
+
+    An entry is keyed by the item, its share of the cutting cost and the
+    rates, so any change to a tube, a pipe or a rate misses. It has a row
+    per price breakdown, the item's first and then its sheet items', with
+    the `cost` and `final` arrays as little-endian float64 bytes. The least
+    recently used entries are evicted once the cache holds more than
+    `max_entries`. Writes are committed by `flush` and `close`.
+    """
+
+    def __init__(
+        self, path: str | Path = ":memory:", max_entries: int = 100_000
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            """
+        )
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version != FORMAT_VERSION:
+            # entries of another layout can never hit, drop them
+            self.connection.executescript(
+                f"""
+                DROP TABLE IF EXISTS prices;
+                PRAGMA user_version = {FORMAT_VERSION};
+                """
+            )
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS prices (
+                key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                cost BLOB NOT NULL,
+                final BLOB NOT NULL,
+                mask INTEGER NOT NULL,
+                used INTEGER NOT NULL,
+                PRIMARY KEY (key, position)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS prices_used ON prices (used);
+            """
+        )
+        self._entries, last_used = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(MAX(used), 0) FROM prices "
+            "WHERE position = 0"
+        ).fetchone()
+        self._clock = last_used
+
+    def __enter__(self) -> "PriceCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._entries
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": self._entries,
+            "max_entries": self.max_entries,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"кэш цен: {self.hits} попаданий, {self.misses} промахов "
+            f"({self.hit_rate:.1%}), {self._entries} записей"
+        )
+
+    def get_key(
+        self,
+        item: BaseItem,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+    ) -> str:
+        hasher = sha256(f"v{FORMAT_VERSION}".encode())
+        hasher.update(item.content_hash.encode())
+        hasher.update(float(adjusted_cutting_cost).hex().encode())
+        hasher.update(content_hash(costs).encode())
+        hasher.update(content_hash(multipliers).encode())
+        return hasher.hexdigest()
+
+    def load(
+        self,
+        item: BaseItem,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+    ) -> bool:
+        """Copy cached prices into `item`, return whether there were any."""
+        key = self.get_key(item, adjusted_cutting_cost, costs, multipliers)
+        rows = self.connection.execute(
+            "SELECT cost, final, mask FROM prices WHERE key = ? "
+            "ORDER BY position",
+            (key,),
+        ).fetchall()
+        items = list(_walk(item))
+        if len(rows) != len(items):
+            self.misses += 1
+            return False
+        self.hits += 1
+        self.connection.execute(
+            "UPDATE prices SET used = ? WHERE key = ?", (self._tick(), key)
+        )
+        for target, (cost, final, mask) in zip(items, rows):
+            prices = PriceBreakdown()
+            prices.cost = _unpack(cost)
+            prices.final = _unpack(final)
+            prices.mask = mask
+            target.prices = prices
+        for target in reversed(items):
+            target.mark_clean()
+        return True
+
+    def store(
+        self,
+        item: BaseItem,
+        adjusted_cutting_cost: float,
+        costs: Costs,
+        multipliers: Multipliers,
+    ) -> None:
+        key = self.get_key(item, adjusted_cutting_cost, costs, multipliers)
+        used = self._tick()
+        cursor = self.connection.execute(
+            "DELETE FROM prices WHERE key = ?", (key,)
+        )
+        if not cursor.rowcount:
+            self._entries += 1
+        self.connection.executemany(
+            "INSERT INTO prices (key, position, cost, final, mask, used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    key,
+                    position,
+                    _pack(target.prices.cost),
+                    _pack(target.prices.final),
+                    target.prices.mask,
+                    used,
+                )
+                for position, target in enumerate(_walk(item))
+            ],
+        )
+        if self._entries > self.max_entries:
+            self._evict(self._entries - self.max_entries)
+
+    def clear(self) -> None:
+        self.connection.execute("DELETE FROM prices")
+        self.connection.commit()
+        self._entries = 0
+
+    def flush(self) -> None:
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self, count: int) -> None:
+        self.connection.execute(
+            "DELETE FROM prices WHERE key IN (SELECT key FROM prices "
+            "WHERE position = 0 ORDER BY used LIMIT ?)",
+            (count,),
+        )
+        self._entries -= count
+
+
+def _walk(item: BaseItem) -> Iterator[BaseItem]:
+    # the item and its sheet items, in the order of the stored rows
+    yield item
+    for sheet in getattr(item, "sheet_items", ()):
+        yield from _walk(sheet)
+
+
+def _pack(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("d", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpack(data: bytes) -> array:
+    values = array("d")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+__all__ = ["PriceCache"]
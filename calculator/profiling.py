@@ -0,0 +1,206 @@
+import json
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cached_property, partial, wraps
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from . import (
+    Pipe,
+    RectPipe,
+    RoundPipe,
+    RectHole,
+    RoundHole,
+    Tube,
+    BaseItem,
+    SheetItem,
+    TubeItem,
+    Order,
+)
+
+
+# classes whose `calculate*` methods are timed as pricing stages
+STAGE_CLASSES: tuple[type, ...] = (Order, BaseItem, SheetItem, TubeItem)
+# classes whose properties and cut length methods are counted
+COUNTED_CLASSES: tuple[type, ...] = (
+    Order,
+    SheetItem,
+    TubeItem,
+    Tube,
+    Pipe,
+    RectPipe,
+    RoundPipe,
+    RectHole,
+    RoundHole,
+)
+COUNTED_METHODS = frozenset(
+    (
+        "get_cut_length",
+        "get_bended_cut_length",
+        "get_cut_lengths",
+        "calculate_cut_length",
+        "calculate_bended_cut_length",
+    )
+)
+
+_active: "PricingProfile | None" = None
+
+
+@dataclass
+class StageTime:
+    calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class PricingProfile:
+    """Stage times by item type and property evaluation counts.
+
+    Stage times are inclusive, `calculate_operation_prices` contains the
+    `calculate_*_price` stages it calls. Cached properties are counted when
+    they are computed, not when a cached value is read.
+    """
+
+    stages: dict[str, dict[str, StageTime]] = field(
+        default_factory=dict[str, dict[str, StageTime]]
+    )
+    counts: Counter[str] = field(default_factory=Counter[str])
+
+    def add_stage_time(self, owner: str, stage: str, seconds: float) -> None:
+        stage_time = self.stages.setdefault(owner, {}).setdefault(
+            stage, StageTime()
+        )
+        stage_time.calls += 1
+        stage_time.seconds += seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "stages": {
+                owner: {
+                    stage: {"calls": time.calls, "seconds": time.seconds}
+                    for stage, time in stages.items()
+                }
+                for owner, stages in self.stages.items()
+            },
+            "counts": dict(self.counts.most_common()),
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def __str__(self) -> str:
+        lines = []
+        for owner, stages in self.stages.items():
+            lines.append(f"{owner}:\n")
+            for stage, time in sorted(
+                stages.items(), key=lambda item: -item[1].seconds
+            ):
+                lines.append(
+                    f"  {stage:<40} {time.calls:>8} "
+                    f"{time.seconds * 1000:>10.2f} мс\n"
+                )
+        if self.counts:
+            lines.append("Вычисления:\n")
+            for name, count in self.counts.most_common():
+                lines.append(f"  {name:<40} {count:>8}\n")
+        return "".join(lines)
+
+
+@contextmanager
+def profile_pricing() -> Iterator[PricingProfile]:
+    """Time pricing stages and count property evaluations inside the block.
+
+    The pricing classes are only patched while the block runs, so there is
+    no cost outside of it. Patching is global: pricing in other threads is
+    recorded as well, and blocks cannot be nested.
+    """
+    global _active
+
+    if _active is not None:
+        raise RuntimeError("pricing is already being profiled")
+    profile = _active = PricingProfile()
+    restore: list[Callable[[], None]] = []
+    try:
+        for cls in STAGE_CLASSES:
+            _patch_stages(cls, profile, restore)
+        for cls in COUNTED_CLASSES:
+            _patch_counted(cls, profile, restore)
+        yield profile
+    finally:
+        for undo in reversed(restore):
+            undo()
+        _active = None
+
+
+def _patch_stages(
+    cls: type, profile: PricingProfile, restore: list[Callable[[], None]]
+) -> None:
+    for name, value in list(vars(cls).items()):
+        if (
+            not name.startswith(("calculate", "recalculate", "update_"))
+            or not callable(value)
+            or getattr(value, "__isabstractmethod__", False)
+        ):
+            continue
+        _replace(cls, name, _timed(value, name, profile), restore)
+
+
+def _patch_counted(
+    cls: type, profile: PricingProfile, restore: list[Callable[[], None]]
+) -> None:
+    for name, value in list(vars(cls).items()):
+        counter = f"{cls.__name__}.{name}"
+        if isinstance(value, cached_property):
+            restore.append(partial(setattr, value, "func", value.func))
+            value.func = _counted(value.func, counter, profile)
+        elif isinstance(value, property):
+            if value.fget is None or getattr(
+                value.fget, "__isabstractmethod__", False
+            ):
+                continue
+            counted = value.getter(_counted(value.fget, counter, profile))
+            _replace(cls, name, counted, restore)
+        elif name in COUNTED_METHODS and not getattr(
+            value, "__isabstractmethod__", False
+        ):
+            _replace(cls, name, _counted(value, counter, profile), restore)
+
+
+def _replace(
+    cls: type, name: str, value: Any, restore: list[Callable[[], None]]
+) -> None:
+    restore.append(partial(setattr, cls, name, vars(cls)[name]))
+    setattr(cls, name, value)
+
+
+def _timed(
+    function: Callable[..., Any], stage: str, profile: PricingProfile
+) -> Callable[..., Any]:
+    @wraps(function)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            profile.add_stage_time(
+                type(self).__name__, stage, perf_counter() - start
+            )
+
+    return wrapper
+
+
+def _counted(
+    function: Callable[..., Any], counter: str, profile: PricingProfile
+) -> Callable[..., Any]:
+    counts = profile.counts
+
+    @wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        counts[counter] += 1
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+__all__ = ["StageTime", "PricingProfile", "profile_pricing"]
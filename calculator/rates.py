@@ -0,0 +1,196 @@
+import datetime
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+
+from . import Costs, Multipliers, Order, OrderPricing, Pipe, get_rates
+
+
+@dataclass(frozen=True)
+class PipeRates:
+    cost: float
+    incut_cost: float
+    cutting_cost: float
+    carrying_cost: float
+
+
+@dataclass
+class RateCard:
+    """Rates effective from `effective` until the next card.
+
+    `pipes` holds pipe rates by designation, like ``"40x20x2"``, pipes not
+    listed keep the rates they were loaded with.
+    """
+
+    effective: datetime.date
+    costs: Costs
+    multipliers: Multipliers
+    pipes: dict[str, PipeRates] = field(default_factory=dict[str, PipeRates])
+
+    def __post_init__(self) -> None:
+        # loaded pipe and its copy with this card's rates, by the id of the
+        # loaded pipe, which the entry keeps alive
+        self._pipes: dict[int, tuple[Pipe, Pipe]] = {}
+
+    @classmethod
+    def from_spec(cls, spec: Mapping[str, Any]) -> "RateCard":
+        """Card from ``{"effective": "2024-01-01", "costs": {...},
+        "multipliers": {...}, "pipes": {"40x20x2": {"cost": ..., ...}}}``."""
+        costs, multipliers = get_rates(spec)
+        try:
+            effective = datetime.date.fromisoformat(spec["effective"])
+            pipes = {
+                designation: PipeRates(**rates)
+                for designation, rates in spec.get("pipes", {}).items()
+            }
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"invalid rate card: {error}") from None
+        return cls(effective, costs, multipliers, pipes)
+
+    def to_spec(self) -> dict[str, Any]:
+        return {
+            "effective": self.effective.isoformat(),
+            "costs": asdict(self.costs),
+            "multipliers": asdict(self.multipliers),
+            "pipes": {
+                designation: asdict(rates)
+                for designation, rates in self.pipes.items()
+            },
+        }
+
+    def get_pipe(self, pipe: Pipe) -> Pipe:
+        """`pipe` as it was loaded, with the rates of this card if it lists
+        the pipe, even if `pipe` came from another card. Pipes are made once
+        per card and loaded pipe and shared by all orders priced with it.
+        The designation only selects the rates: ``100x40x3`` and
+        ``40x100x3`` share them, not their geometry."""
+        pipe = pipe.__dict__.get("_loaded", pipe)
+        rates = self.pipes.get(str(pipe))
+        if rates is None:
+            return pipe
+        entry = self._pipes.get(id(pipe))
+        if entry is None:
+            result = replace(pipe, **asdict(rates))
+            result._loaded = pipe  # type: ignore[attr-defined]
+            entry = self._pipes[id(pipe)] = (pipe, result)
+        return entry[1]
+
+    def get_pricing(self, order: Order) -> OrderPricing:
+        """Prices of `order` with this card's rates, leaving it
+        unchanged, unlike `apply`."""
+        return order.get_pricing(self.costs, self.multipliers, self.get_pipe)
+
+    def apply(self, order: Order) -> None:
+        """Replace the pipes of `order` by the pipes with this card's
+        rates, pipes the card does not list by the pipes they were loaded
+        with."""
+        for item in order.items:
+            for tube in getattr(item, "tubes", ()):
+                pipe = self.get_pipe(tube.pipe)
+                if pipe is not tube.pipe:
+                    tube.pipe = pipe
+
+
+class RateStore:
+    """Rate cards by effective date with as-of lookup.
+
+    The file written by `save` and read by `load` is JSON,
+    ``{"versions": [card, ...]}`` with cards as in `RateCard.from_spec`.
+    """
+
+    def __init__(self, cards: Iterable[RateCard] = ()) -> None:
+        self._dates: list[datetime.date] = []
+        self._cards: list[RateCard] = []
+        for card in cards:
+            self.add(card)
+
+    @classmethod
+    def from_spec(cls, spec: Mapping[str, Any]) -> "RateStore":
+        try:
+            versions = spec["versions"]
+        except (KeyError, TypeError) as error:
+            raise ValueError(f"invalid rate store: {error}") from None
+        return cls(RateCard.from_spec(version) for version in versions)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RateStore":
+        with Path(path).open(encoding="utf-8") as fp:
+            return cls.from_spec(json.load(fp))
+
+    def save(self, path: str | Path) -> None:
+        with Path(path).open("w", encoding="utf-8") as fp:
+            json.dump(
+                {"versions": [card.to_spec() for card in self._cards]},
+                fp,
+                ensure_ascii=False,
+                indent=1,
+            )
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __iter__(self) -> Iterator[RateCard]:
+        return iter(self._cards)
+
+    @property
+    def latest(self) -> RateCard:
+        if not self._cards:
+            raise KeyError("no rates")
+        return self._cards[-1]
+
+    def add(self, card: RateCard) -> None:
+        """Add a card, replacing the one with the same effective date."""
+        index = bisect_left(self._dates, card.effective)
+        if index < len(self._dates) and self._dates[index] == card.effective:
+            self._cards[index] = card
+        else:
+            self._dates.insert(index, card.effective)
+            self._cards.insert(index, card)
+
+    def get_version(self, date: datetime.date) -> int:
+        """Index of the card effective on `date`."""
+        index = bisect_right(self._dates, date) - 1
+        if index < 0:
+            raise KeyError(f"no rates effective on {date}")
+        return index
+
+    def get(self, date: datetime.date) -> RateCard:
+        return self._cards[self.get_version(date)]
+
+    def group_orders(
+        self, orders: Iterable[Order], default: datetime.date | None = None
+    ) -> list[tuple[RateCard, list[Order]]]:
+        """Orders by the card effective on their date, orders without a
+        date use `default` or else the latest card."""
+        groups: dict[int, list[Order]] = {}
+        if default is not None:
+            default_version = self.get_version(default)
+        elif self._cards:
+            default_version = len(self._cards) - 1
+        else:
+            raise KeyError("no rates")
+        for order in orders:
+            if order.date is None:
+                version = default_version
+            else:
+                version = self.get_version(order.date)
+            groups.setdefault(version, []).append(order)
+        return [
+            (self._cards[version], groups[version])
+            for version in sorted(groups)
+        ]
+
+    def requote(
+        self, orders: Iterable[Order], default: datetime.date | None = None
+    ) -> list[tuple[RateCard, list[OrderPricing]]]:
+        """Prices of orders with the rates effective on their date, grouped
+        by card like `group_orders`. The orders are left unchanged."""
+        return [
+            (card, [card.get_pricing(order) for order in group])
+            for card, group in self.group_orders(orders, default)
+        ]
+
+
+__all__ = ["PipeRates", "RateCard", "RateStore"]
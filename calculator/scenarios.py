@@ -0,0 +1,209 @@
+from dataclasses import dataclass, fields
+from typing import Sequence
+
+import numpy as np
+
+from . import (
+    BaseItem,
+    Costs,
+    Multipliers,
+    Order,
+    Price,
+    PriceBreakdown,
+    TubeItem,
+)
+
+
+COST_FIELDS = tuple(field.name for field in fields(Costs))
+OPERATIONS = PriceBreakdown.operations
+
+_operation = PriceBreakdown.index
+_cost_field = {name: index for index, name in enumerate(COST_FIELDS)}
+
+
+@dataclass
+class ScenarioPrices:
+    """Item prices of one order under every pair of rates.
+
+    `cost` is indexed by costs, item and operation and `final` by costs,
+    multipliers, item and operation, operations follow
+    `PriceBreakdown.operations`. Operations an item does not price are zero
+    and false in `mask`. Prices are per item unit like `BaseItem.prices`.
+    """
+
+    items: list[BaseItem]
+    costs: list[Costs]
+    multipliers: list[Multipliers]
+    cost: np.ndarray
+    final: np.ndarray
+    mask: np.ndarray
+
+    @property
+    def item_totals(self) -> np.ndarray:
+        return self.final[..., _operation["total"]]
+
+    @property
+    def order_totals(self) -> np.ndarray:
+        """Final order price by costs and multipliers, items times counts."""
+        counts = np.array([item.count for item in self.items], dtype=float)
+        return self.item_totals @ counts
+
+    def get_breakdown(
+        self, costs_index: int, multipliers_index: int, item_index: int
+    ) -> PriceBreakdown:
+        prices = PriceBreakdown()
+        cost = self.cost[costs_index, item_index]
+        final = self.final[costs_index, multipliers_index, item_index]
+        for index in np.flatnonzero(self.mask[item_index]):
+            prices[OPERATIONS[index]] = Price(
+                float(cost[index]), float(final[index])
+            )
+        return prices
+
+
+@dataclass
+class OrderQuantities:
+    """Item prices of an order as linear functions of the rates.
+
+    The cost of an operation is split into a work and a materials part,
+    each a dot product of a coefficient vector with the `Costs` fields plus
+    a constant. The final price multiplies the work part by
+    `Multipliers.work` and the materials part by `Multipliers.materials`,
+    then both by the manager and VAT markups. The arrays are indexed by
+    item, operation and, for coefficients, `COST_FIELDS`.
+    """
+
+    items: list[BaseItem]
+    work: np.ndarray
+    materials: np.ndarray
+    work_constant: np.ndarray
+    materials_constant: np.ndarray
+    mask: np.ndarray
+
+    @classmethod
+    def from_order(cls, order: Order) -> "OrderQuantities":
+        items = list(order.items)
+        shape = (len(items), len(OPERATIONS))
+        quantities = cls(
+            items,
+            np.zeros((*shape, len(COST_FIELDS))),
+            np.zeros((*shape, len(COST_FIELDS))),
+            np.zeros(shape),
+            np.zeros(shape),
+            np.zeros(shape, dtype=bool),
+        )
+        for index, (item, cutting_price) in enumerate(
+            order.get_item_cutting_prices()
+        ):
+            quantities._add_item(index, item, cutting_price)
+        return quantities
+
+    def evaluate(
+        self, costs: Sequence[Costs], multipliers: Sequence[Multipliers]
+    ) -> ScenarioPrices:
+        rates = np.array(
+            [[getattr(card, name) for name in COST_FIELDS] for card in costs],
+            dtype=float,
+        ).reshape(len(costs), len(COST_FIELDS))
+        markups = np.array(
+            [
+                (card.work, card.materials, card.manager * card.vat)
+                for card in multipliers
+            ],
+            dtype=float,
+        ).reshape(len(multipliers), 3)
+
+        count, operations, cost_fields = self.work.shape
+        work = self.work.reshape(-1, cost_fields) @ rates.T
+        work = work.T.reshape(len(costs), count, operations)
+        work += self.work_constant
+        materials = self.materials.reshape(-1, cost_fields) @ rates.T
+        materials = materials.T.reshape(len(costs), count, operations)
+        materials += self.materials_constant
+
+        total = _operation["total"]
+        cost = work + materials
+        cost[..., total] = cost.sum(axis=-1) - cost[..., total]
+        final = (
+            work[:, None] * markups[None, :, None, None, 0]
+            + materials[:, None] * markups[None, :, None, None, 1]
+        ) * markups[None, :, None, None, 2]
+        final[..., total] = final.sum(axis=-1) - final[..., total]
+        return ScenarioPrices(
+            self.items, list(costs), list(multipliers), cost, final, self.mask
+        )
+
+    def _add_item(
+        self, index: int, item: BaseItem, cutting_price: float
+    ) -> None:
+        summary = item.summary
+        work = self.work[index]
+        materials = self.materials[index]
+        work_constant = self.work_constant[index]
+        materials_constant = self.materials_constant[index]
+
+        operations = [
+            "sheet",
+            "welding",
+            "bending",
+            "riveting",
+            "weld_cleaning",
+            "transport",
+            "project",
+            "cleaning",
+            "painting",
+            "sundries",
+            "countersink",
+            "threading",
+            "total",
+        ]
+        if isinstance(item, TubeItem):
+            operations += ["cutting", "pipe", "carrying"]
+            work_constant[_operation["cutting"]] = cutting_price
+            materials_constant[_operation["pipe"]] = summary.pipe_cost
+            work_constant[_operation["carrying"]] = summary.carrying_cost
+        for name in operations:
+            self.mask[index, _operation[name]] = True
+
+        def add(
+            coefficients: np.ndarray, operation: str, field: str, value: float
+        ) -> None:
+            coefficients[_operation[operation], _cost_field[field]] += value
+
+        materials_constant[_operation["sheet"]] = summary.sheet_cost
+        add(work, "welding", "welding", summary.welding_length)
+        add(work, "bending", "bending", summary.bending_count)
+        add(work, "riveting", "riveting", summary.riveting_count)
+        add(
+            work,
+            "weld_cleaning",
+            "weld_cleaning",
+            summary.weld_cleaning_length,
+        )
+        work_constant[_operation["transport"]] = item.transport_cost
+        add(work, "project", "project", item.project_hours / item.count)
+        add(work, "cleaning", "cleaning", summary.cleaning_area)
+        if item.is_painted:
+            add(work, "painting", "painting", summary.area)
+            add(materials, "painting", "paint", summary.area)
+        add(materials, "sundries", "sundry", summary.sundries_count)
+        add(work, "countersink", "countersink", summary.countersink_count)
+        add(work, "threading", "threading", summary.threading_count)
+
+
+def price_scenarios(
+    order: Order,
+    costs: Sequence[Costs],
+    multipliers: Sequence[Multipliers],
+) -> ScenarioPrices:
+    """Price `order` under every combination of `costs` and `multipliers`
+    without changing it."""
+    return OrderQuantities.from_order(order).evaluate(costs, multipliers)
+
+
+__all__ = [
+    "COST_FIELDS",
+    "ScenarioPrices",
+    "OrderQuantities",
+    "price_scenarios",
+]
@@ -0,0 +1,314 @@
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from . import Order, Pipe, Tube
+
+
+EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class LaserMachine:
+    """A tube laser: `cutting_speed` in mm per second, positive, and
+    `pierce_time` in seconds per incut. `profiles` are the pipe
+    designations it can cut, like ``"40x20x2"`` or ``"D57x3"``, any pipe if
+    not given."""
+
+    name: str
+    cutting_speed: float
+    pierce_time: float = 0.0
+    profiles: frozenset[str] | None = None
+
+    def __post_init__(self) -> None:
+        if not self.cutting_speed > 0:
+            raise ValueError(
+                f"{self.name}: cutting speed must be positive, "
+                f"not {self.cutting_speed}"
+            )
+        if not self.pierce_time >= 0:
+            raise ValueError(
+                f"{self.name}: pierce time must not be negative, "
+                f"not {self.pierce_time}"
+            )
+
+    def supports(self, pipe: Pipe) -> bool:
+        return self.profiles is None or str(pipe) in self.profiles
+
+
+@dataclass
+class CuttingJob:
+    """`count` identical pieces of `tube` of one order item."""
+
+    order: Order
+    item: int
+    tube: Tube
+    count: int
+
+    @property
+    def cutting_length(self) -> float:
+        return self.tube.cutting_length * self.count
+
+    @property
+    def incuts_count(self) -> int:
+        return self.tube.incuts_count * self.count
+
+    def __str__(self) -> str:
+        return f"№{self.order.number}, {self.tube} - {self.count} шт"
+
+
+@dataclass
+class MachineSchedule:
+    machine: LaserMachine
+    jobs: list[CuttingJob] = field(default_factory=list[CuttingJob])
+    time: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.machine.name}: {len(self.jobs)} заданий, "
+            f"{_format_time(self.time)}"
+        )
+
+
+@dataclass
+class CuttingSchedule:
+    machines: list[MachineSchedule]
+    unassigned: list[CuttingJob] = field(default_factory=list[CuttingJob])
+
+    @property
+    def makespan(self) -> float:
+        """Seconds until the last machine is done."""
+        return max((machine.time for machine in self.machines), default=0.0)
+
+    @property
+    def total_time(self) -> float:
+        return sum(machine.time for machine in self.machines)
+
+    @property
+    def utilization(self) -> float:
+        makespan = self.makespan
+        if not makespan:
+            return 0.0
+        return self.total_time / (makespan * len(self.machines))
+
+    def __str__(self) -> str:
+        result = "".join(f"{machine}\n" for machine in self.machines)
+        result += (
+            f"Итого: {_format_time(self.makespan)}, "
+            f"загрузка {self.utilization:.0%}\n"
+        )
+        if self.unassigned:
+            result += f"Нет станка: {len(self.unassigned)} заданий\n"
+        return result
+
+
+def get_cutting_jobs(orders: Iterable[Order]) -> list[CuttingJob]:
+    """One job per group of identical tubes of an item, `item.count` pieces
+    per tube."""
+    return [
+        CuttingJob(order, index, group.tube, group.count * item.count)
+        for order in orders
+        for index, item in enumerate(order.items)
+        for group in getattr(item, "tube_groups", ())
+    ]
+
+
+def schedule_cutting(
+    orders: Iterable[Order],
+    machines: Sequence[LaserMachine],
+    max_iterations: int = 1000,
+) -> CuttingSchedule:
+    """Assign the tube cutting of `orders` to `machines`, keeping the time
+    the last machine finishes as short as possible.
+
+    Jobs are placed longest first on the machine that would finish them
+    earliest, then jobs are moved or swapped away from the busiest machine
+    while that shortens the schedule, at most `max_iterations` times. Jobs
+    no machine supports are left in `unassigned`.
+    """
+    jobs = get_cutting_jobs(orders)
+    times = get_job_times(jobs, machines)
+    assignment = assign_longest_first(times)
+    if max_iterations:
+        assignment = improve_assignment(times, assignment, max_iterations)
+
+    schedule = CuttingSchedule(
+        [MachineSchedule(machine) for machine in machines]
+    )
+    for job, machine in zip(jobs, assignment.tolist()):
+        if machine < 0:
+            schedule.unassigned.append(job)
+            continue
+        schedule.machines[machine].jobs.append(job)
+    loads = _get_loads(times, assignment)
+    for machine, load in zip(schedule.machines, loads.tolist()):
+        machine.time = load
+    return schedule
+
+
+def get_job_times(
+    jobs: Sequence[CuttingJob], machines: Sequence[LaserMachine]
+) -> np.ndarray:
+    """Seconds each job takes on each machine, infinite where the machine
+    does not cut the pipe."""
+    supported: dict[int, list[bool]] = {}
+    eligible = np.empty((len(jobs), len(machines)), dtype=bool)
+    cutting_length = np.empty(len(jobs))
+    incuts_count = np.empty(len(jobs))
+    for index, job in enumerate(jobs):
+        pipe = job.tube.pipe
+        row = supported.get(id(pipe))
+        if row is None:
+            row = supported[id(pipe)] = [
+                machine.supports(pipe) for machine in machines
+            ]
+        eligible[index] = row
+        cutting_length[index] = job.cutting_length
+        incuts_count[index] = job.incuts_count
+
+    speed = np.array([machine.cutting_speed for machine in machines])
+    pierce_time = np.array([machine.pierce_time for machine in machines])
+    times = (
+        cutting_length[:, None] / speed[None, :]
+        + incuts_count[:, None] * pierce_time[None, :]
+    )
+    times[~eligible] = np.inf
+    return times
+
+
+def assign_longest_first(times: np.ndarray) -> np.ndarray:
+    """Machine of every job, -1 if no machine takes it: the longest jobs
+    first, each on the machine where it would finish earliest."""
+    count, machines = times.shape
+    assignment = np.full(count, -1, dtype=np.intp)
+    shortest = times.min(axis=1, initial=np.inf)
+    order = np.argsort(-shortest, kind="stable")
+    order = order[np.isfinite(shortest[order])]
+
+    loads = [0.0] * machines
+    rows = times.tolist()
+    machine_range = range(machines)
+    for job in order.tolist():
+        row = rows[job]
+        best, finish = -1, np.inf
+        for machine in machine_range:
+            end = loads[machine] + row[machine]
+            if end < finish:
+                best, finish = machine, end
+        loads[best] = finish
+        assignment[job] = best
+    return assignment
+
+
+def improve_assignment(
+    times: np.ndarray,
+    assignment: np.ndarray,
+    max_iterations: int = 1000,
+    candidates: int = 256,
+) -> np.ndarray:
+    """Move single jobs, or swap pairs of jobs, between the busiest machine
+    and the others while that lowers the makespan.
+
+    Swaps are searched among the `candidates` longest jobs of the busiest
+    machine and as many jobs of the other machine, spread evenly over their
+    durations.
+    """
+    assignment = assignment.copy()
+    loads = _get_loads(times, assignment)
+    if not len(loads):
+        return assignment
+    for _ in range(max_iterations):
+        busiest = int(np.argmax(loads))
+        makespan = loads[busiest]
+        jobs = np.flatnonzero(assignment == busiest)
+        if not len(jobs):
+            break
+
+        # move: the busiest machine loses the job, another one gains it
+        remaining = makespan - times[jobs, busiest]
+        gained = loads[None, :] + times[jobs]
+        gained[:, busiest] = np.inf
+        ends = np.maximum(remaining[:, None], gained)
+        position, machine = np.unravel_index(np.argmin(ends), ends.shape)
+        if ends[position, machine] < makespan - EPSILON:
+            job = jobs[position]
+            assignment[job] = machine
+            loads[busiest] -= times[job, busiest]
+            loads[machine] += times[job, machine]
+            continue
+
+        if not _swap(times, assignment, loads, busiest, jobs, candidates):
+            break
+    return assignment
+
+
+def _swap(
+    times: np.ndarray,
+    assignment: np.ndarray,
+    loads: np.ndarray,
+    busiest: int,
+    jobs: np.ndarray,
+    candidates: int,
+) -> bool:
+    makespan = loads[busiest]
+    durations = times[jobs, busiest]
+    jobs = jobs[np.argsort(-durations, kind="stable")[:candidates]]
+    for machine in np.argsort(loads).tolist():
+        if machine == busiest:
+            continue
+        others = np.flatnonzero(assignment == machine)
+        if not len(others):
+            continue
+        others = others[np.argsort(times[others, machine], kind="stable")]
+        if len(others) > candidates:
+            others = others[
+                np.linspace(0, len(others) - 1, candidates).astype(np.intp)
+            ]
+        # loads of both machines after exchanging every pair of jobs
+        busiest_ends = (
+            makespan - times[jobs, busiest][:, None]
+            + times[others, busiest][None, :]
+        )
+        machine_ends = (
+            loads[machine]
+            - times[others, machine][None, :]
+            + times[jobs, machine][:, None]
+        )
+        ends = np.maximum(busiest_ends, machine_ends)
+        first, second = np.unravel_index(np.argmin(ends), ends.shape)
+        if ends[first, second] < makespan - EPSILON:
+            job, other = jobs[first], others[second]
+            assignment[job], assignment[other] = machine, busiest
+            loads[busiest] = busiest_ends[first, second]
+            loads[machine] = machine_ends[first, second]
+            return True
+    return False
+
+
+def _get_loads(times: np.ndarray, assignment: np.ndarray) -> np.ndarray:
+    assigned = np.flatnonzero(assignment >= 0)
+    return np.bincount(
+        assignment[assigned],
+        weights=times[assigned, assignment[assigned]],
+        minlength=times.shape[1],
+    )
+
+
+def _format_time(seconds: float) -> str:
+    minutes, seconds = divmod(round(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+__all__ = [
+    "LaserMachine",
+    "CuttingJob",
+    "MachineSchedule",
+    "CuttingSchedule",
+    "get_cutting_jobs",
+    "schedule_cutting",
+    "get_job_times",
+    "assign_longest_first",
+    "improve_assignment",
+]
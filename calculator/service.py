@@ -0,0 +1,251 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+from http import HTTPStatus
+from typing import Any, Iterable, Mapping
+
+from . import (
+    Costs,
+    Multipliers,
+    Order,
+    Pipe,
+    calculate_specs,
+    get_loader,
+    get_rates,
+    init_worker,
+)
+
+
+def get_quote(order: Order) -> dict[str, Any]:
+    """JSON-ready prices of a calculated order."""
+    items = []
+    cost = final = 0.0
+    for item in order.items:
+        items.append(
+            {
+                "name": item.name,
+                "count": item.count,
+                "prices": {
+                    name: {"cost": price.cost, "final": price.final}
+                    for name, price in item.prices.items()
+                },
+            }
+        )
+        total = item.prices["total"]
+        cost += total.cost * item.count
+        final += total.final * item.count
+    return {
+        "number": order.number,
+        "name": order.name,
+        "items": items,
+        "total": {"cost": cost, "final": final},
+    }
+
+
+def quote_order(body: bytes, costs: Costs, multipliers: Multipliers) -> bytes:
+    order = get_loader().get_order(json.loads(body))
+    order.calculate(costs, multipliers)
+    return json.dumps(get_quote(order), ensure_ascii=False).encode()
+
+
+def quote_specs(
+    specs: Iterable[dict[str, Any]], costs: Costs, multipliers: Multipliers
+) -> list[dict[str, Any]]:
+    """Quotes of order specifications, an invalid order gets an `error`
+    entry instead of failing the rest."""
+    return [
+        result if isinstance(result, dict) else get_quote(result)
+        for result in calculate_specs(specs, costs, multipliers)
+    ]
+
+
+@dataclass
+class ServiceStats:
+    requests: int = 0
+    calculated: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+
+class HTTPError(Exception):
+    def __init__(self, status: HTTPStatus, message: str = "") -> None:
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class QuoteService:
+    """Prices order JSON posted over HTTP with the current rates.
+
+    ``POST /quote`` takes an order in the `OrderLoader` JSON format and
+    returns the price breakdown of every item. ``GET /rates`` and
+    ``PUT /rates`` read and replace the rates, ``GET /stats`` returns the
+    request counters. Orders are priced in `executor`, by default a
+    process pool whose workers look pipe designations up in `pipes`, the
+    catalog. Identical bodies posted while one of them is being priced
+    share its result.
+    """
+
+    max_body_size = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        costs: Costs,
+        multipliers: Multipliers,
+        workers: int | None = None,
+        executor: Executor | None = None,
+        pipes: Mapping[str, Pipe] | None = None,
+    ) -> None:
+        self.costs = costs
+        self.multipliers = multipliers
+        self.rates_version = 0
+        self.executor = executor or ProcessPoolExecutor(
+            workers, initializer=init_worker, initargs=(pipes,)
+        )
+        self.stats = ServiceStats()
+        self._pending: dict[tuple[int, bytes], asyncio.Future[bytes]] = {}
+
+    def set_rates(self, costs: Costs, multipliers: Multipliers) -> None:
+        self.costs = costs
+        self.multipliers = multipliers
+        self.rates_version += 1
+
+    async def quote(self, body: bytes) -> bytes:
+        key = (self.rates_version, sha256(body).digest())
+        future = self._pending.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                quote_order,
+                body,
+                self.costs,
+                self.multipliers,
+            )
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+            self.stats.calculated += 1
+        # a disconnected client must not cancel the calculation for the rest
+        return await asyncio.shield(future)
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 8000
+    ) -> asyncio.Server:
+        # start the workers before listening: forked later they would keep
+        # copies of client sockets open and the connections would never end
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, get_loader
+        )
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.stats.requests += 1
+        try:
+            method, path, body = await self._read_request(reader)
+            status, response = HTTPStatus.OK, await self._route(
+                method, path, body
+            )
+        except HTTPError as error:
+            self.stats.errors += 1
+            status, response = error.status, _error_body(str(error))
+        except (ValueError, TypeError, KeyError) as error:
+            self.stats.errors += 1
+            status, response = HTTPStatus.BAD_REQUEST, _error_body(str(error))
+        except Exception as error:
+            self.stats.errors += 1
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            response = _error_body(f"{type(error).__name__}: {error}")
+
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(response)}\r\n"
+            "Connection: close\r\n\r\n".encode("ascii")
+            + response
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> bytes:
+        if path == "/quote":
+            _check_method(method, "POST")
+            return await self.quote(body)
+        if path == "/rates":
+            _check_method(method, "GET", "PUT")
+            if method == "PUT":
+                self.set_rates(*get_rates(json.loads(body)))
+            return _json_body(
+                {
+                    "costs": asdict(self.costs),
+                    "multipliers": asdict(self.multipliers),
+                    "version": self.rates_version,
+                }
+            )
+        if path == "/stats":
+            _check_method(method, "GET")
+            return _json_body(asdict(self.stats))
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, str, bytes]:
+        try:
+            method, path, _ = (await reader.readline()).decode().split(" ", 2)
+        except (UnicodeDecodeError, ValueError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        length = 0
+        while line := (await reader.readline()).strip():
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value)
+                except ValueError:
+                    raise HTTPError(
+                        HTTPStatus.BAD_REQUEST, "invalid Content-Length"
+                    )
+        if length > self.max_body_size:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            body = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "incomplete body")
+        return method, path.split("?", 1)[0], body
+
+
+def _check_method(method: str, *allowed: str) -> None:
+    if method not in allowed:
+        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+
+def _json_body(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+def _error_body(message: str) -> bytes:
+    return _json_body({"error": message})
+
+
+__all__ = [
+    "ServiceStats",
+    "QuoteService",
+    "get_quote",
+    "quote_order",
+    "quote_specs",
+]
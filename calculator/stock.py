@@ -0,0 +1,292 @@
+from dataclasses import dataclass, field
+from bisect import bisect_left, insort
+from functools import cached_property
+from math import ceil
+from typing import Iterable, Sequence
+
+from . import Pipe, Tube, Order
+
+
+EPSILON = 1e-9
+
+
+@dataclass
+class StockPiece:
+    tube: Tube
+    length: float
+    bar: int = -1
+    cost: float = 0.0
+
+
+@dataclass
+class ProfileCutPlan:
+    pipe: Pipe
+    bar_length: float
+    kerf: float
+    pieces: list[StockPiece] = field(default_factory=list[StockPiece])
+    bars: list[list[int]] = field(default_factory=list[list[int]])
+
+    @property
+    def bar_count(self) -> int:
+        return len(self.bars)
+
+    @property
+    def used_length(self) -> float:
+        return sum(piece.length for piece in self.pieces)
+
+    @property
+    def waste(self) -> float:
+        return self.bar_count * self.bar_length - self.used_length
+
+    @property
+    def material_cost(self) -> float:
+        return self.bar_count * self.bar_length * self.pipe.cost
+
+    def __str__(self) -> str:
+        return (
+            f"{self.pipe}: {self.bar_count} шт x {self.bar_length} мм, "
+            f"отход {self.waste:,.2f} мм, {self.material_cost:,.2f} руб"
+        )
+
+
+@dataclass
+class CutPlan:
+    profiles: list[ProfileCutPlan] = field(
+        default_factory=list[ProfileCutPlan]
+    )
+
+    @property
+    def bar_count(self) -> int:
+        return sum(profile.bar_count for profile in self.profiles)
+
+    @property
+    def waste(self) -> float:
+        return sum(profile.waste for profile in self.profiles)
+
+    @property
+    def material_cost(self) -> float:
+        return sum(profile.material_cost for profile in self.profiles)
+
+    @cached_property
+    def tube_costs(self) -> dict[int, float]:
+        """Average material cost of one piece by the id of its tube, worked
+        out once for the finished plan."""
+        totals: dict[int, list[float]] = {}
+        for profile in self.profiles:
+            for piece in profile.pieces:
+                total = totals.setdefault(id(piece.tube), [0.0, 0])
+                total[0] += piece.cost
+                total[1] += 1
+        return {key: cost / count for key, (cost, count) in totals.items()}
+
+    def get_tube_cost(self, tube: Tube) -> float:
+        """Average material cost of one piece of `tube`."""
+        return self.tube_costs.get(id(tube), 0.0)
+
+    def __str__(self) -> str:
+        return "".join(f"{profile}\n" for profile in self.profiles)
+
+
+def plan_order_stock(
+    order: Order,
+    stock_lengths: Sequence[float] = (6000, 12000),
+    kerf: float = 0.0,
+) -> CutPlan:
+    """Cut all our tubes of an order, `item.count` pieces per tube, from
+    stock bars, one profile at a time, choosing the cheapest stock length
+    for each profile."""
+    groups: dict[tuple[type, str, float], list[StockPiece]] = {}
+    pipes: dict[tuple[type, str, float], Pipe] = {}
+    for item in order.items:
+        for tube in getattr(item, "tubes", ()):
+            if not tube.is_ours:
+                continue
+            pipe = tube.pipe
+            key = (type(pipe), str(pipe), pipe.cost)
+            pipes.setdefault(key, pipe)
+            groups.setdefault(key, []).extend(
+                StockPiece(tube, tube.length) for _ in range(item.count)
+            )
+
+    plan = CutPlan()
+    for key, pieces in groups.items():
+        plan.profiles.append(
+            plan_profile_stock(pipes[key], pieces, stock_lengths, kerf)
+        )
+    return plan
+
+
+def plan_profile_stock(
+    pipe: Pipe,
+    pieces: list[StockPiece],
+    stock_lengths: Sequence[float],
+    kerf: float = 0.0,
+) -> ProfileCutPlan:
+    for piece in pieces:
+        if piece.length <= 0:
+            raise ValueError(
+                f"{pipe}: tube of {piece.length} mm cannot be cut from a bar"
+            )
+    longest = max((piece.length for piece in pieces), default=0.0)
+    candidates = [length for length in stock_lengths if length >= longest]
+    if not candidates:
+        raise ValueError(
+            f"{pipe}: tube of {longest} mm is longer than any stock bar"
+        )
+
+    best: ProfileCutPlan | None = None
+    for bar_length in candidates:
+        sizes = [piece.length + kerf for piece in pieces]
+        bars = pack_bars(sizes, bar_length + kerf)
+        plan = ProfileCutPlan(pipe, bar_length, kerf, pieces, bars)
+        if best is None or plan.material_cost < best.material_cost:
+            best = plan
+    assert best is not None
+
+    bar_cost = best.bar_length * pipe.cost
+    for index, bar in enumerate(best.bars):
+        used = sum(pieces[piece].length for piece in bar)
+        for piece in bar:
+            pieces[piece].bar = index
+            pieces[piece].cost = bar_cost * pieces[piece].length / used
+    return best
+
+
+def pack_bars(
+    sizes: Sequence[float],
+    capacity: float,
+    exact_limit: int = 20,
+    node_limit: int = 100_000,
+) -> list[list[int]]:
+    """Pack sizes into as few bins of `capacity` as possible.
+
+    Best-fit decreasing gives the first solution, which is then improved
+    by emptying the least filled bins into the gaps of the others. Small
+    instances are solved exactly with branch and bound.
+    """
+    if capacity <= 0:
+        raise ValueError(f"bins of {capacity} hold nothing")
+    order = sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True)
+    bound = ceil(sum(sizes) / capacity - EPSILON) if sizes else 0
+
+    bins = _best_fit_decreasing(sizes, capacity, order)
+    if len(bins) > bound:
+        bins = _empty_bins(sizes, capacity, bins)
+    if len(bins) > bound and len(sizes) <= exact_limit:
+        bins = _branch_and_bound(sizes, capacity, order, bins, node_limit)
+    return bins
+
+
+def _best_fit_decreasing(
+    sizes: Sequence[float], capacity: float, order: Iterable[int]
+) -> list[list[int]]:
+    bins: list[list[int]] = []
+    # (residual, bin index), sorted by residual
+    residuals: list[tuple[float, int]] = []
+    for piece in order:
+        size = sizes[piece]
+        position = bisect_left(residuals, (size - EPSILON, -1))
+        if position < len(residuals):
+            residual, index = residuals.pop(position)
+        else:
+            residual, index = capacity, len(bins)
+            bins.append([])
+        bins[index].append(piece)
+        insort(residuals, (residual - size, index))
+    return bins
+
+
+def _empty_bins(
+    sizes: Sequence[float],
+    capacity: float,
+    bins: list[list[int]],
+    candidates: int = 16,
+) -> list[list[int]]:
+    loads = [sum(sizes[piece] for piece in bin) for bin in bins]
+    improved = True
+    while improved and len(bins) > 1:
+        improved = False
+        targets = sorted(range(len(bins)), key=loads.__getitem__)
+        for target in targets[:candidates]:
+            residuals = sorted(
+                (capacity - load, index)
+                for index, load in enumerate(loads)
+                if index != target
+            )
+            moves: list[tuple[int, int]] = []
+            for piece in sorted(
+                bins[target], key=sizes.__getitem__, reverse=True
+            ):
+                position = bisect_left(residuals, (sizes[piece] - EPSILON, -1))
+                if position == len(residuals):
+                    break
+                residual, index = residuals.pop(position)
+                insort(residuals, (residual - sizes[piece], index))
+                moves.append((piece, index))
+            else:
+                for piece, index in moves:
+                    bins[index].append(piece)
+                    loads[index] += sizes[piece]
+                del bins[target]
+                del loads[target]
+                improved = True
+                break
+    return bins
+
+
+def _branch_and_bound(
+    sizes: Sequence[float],
+    capacity: float,
+    order: list[int],
+    incumbent: list[list[int]],
+    node_limit: int,
+) -> list[list[int]]:
+    bound = ceil(sum(sizes) / capacity - EPSILON)
+    best = [list(bin) for bin in incumbent]
+    bins: list[list[int]] = []
+    residuals: list[float] = []
+    nodes = 0
+
+    def search(position: int) -> bool:
+        nonlocal best, nodes
+        nodes += 1
+        if nodes > node_limit:
+            return True
+        if position == len(order):
+            if len(bins) < len(best):
+                best = [list(bin) for bin in bins]
+            return len(best) <= bound
+        piece = order[position]
+        size = sizes[piece]
+        tried: set[float] = set()
+        for index, residual in enumerate(residuals):
+            if residual < size - EPSILON or residual in tried:
+                continue
+            tried.add(residual)
+            bins[index].append(piece)
+            residuals[index] -= size
+            if search(position + 1):
+                return True
+            residuals[index] += size
+            bins[index].pop()
+        if len(bins) + 1 < len(best):
+            bins.append([piece])
+            residuals.append(capacity - size)
+            if search(position + 1):
+                return True
+            residuals.pop()
+            bins.pop()
+        return False
+
+    search(0)
+    return best
+
+
+__all__ = [
+    "StockPiece",
+    "ProfileCutPlan",
+    "CutPlan",
+    "plan_order_stock",
+    "plan_profile_stock",
+    "pack_bars",
+]
@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ItemSummary:
+    """Totals of one item collected in a single walk over its tubes and
+    sheets, per one unit of the item."""
+
+    incuts_count: int = 0
+    cutting_length: float = 0.0
+    cutting_cost: float = 0.0
+    welding_length: float = 0.0
+    area: float = 0.0
+    bending_count: int = 0
+    sundries_count: int = 0
+    riveting_count: int = 0
+    countersink_count: int = 0
+    threading_count: int = 0
+    pipe_cost: float = 0.0
+    carrying_cost: float = 0.0
+    sheet_cost: float = 0.0
+    cleaning_area: float = 0.0
+    weld_cleaning_length: float = 0.0
+
+
+@dataclass
+class OrderSummary:
+    """Totals of an order built from the item summaries in one pass.
+
+    Like the `Order` properties, quantities are summed per item unit and
+    only `cutting_cost` is weighted by the item count.
+    """
+
+    items: list[ItemSummary] = field(default_factory=list[ItemSummary])
+    incuts_count: int = 0
+    cutting_length: float = 0.0
+    cutting_cost: float = 0.0
+    adjusted_cutting_price: float = 0.0
+    welding_length: float = 0.0
+    area: float = 0.0
+    bending_count: int = 0
+    sundries_count: int = 0
+    riveting_count: int = 0
+    countersink_count: int = 0
+    threading_count: int = 0
+
+
+__all__ = ["ItemSummary", "OrderSummary"]
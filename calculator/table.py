@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from . import Pipe, Tube, TubeItem, Order
+
+
+@dataclass
+class TubeTable:
+    """Columnar view of many tubes for vectorized geometry and cutting costs.
+
+    Every per-tube array is indexed by tube position, holes and bended cuts
+    are stored flat with the index of the tube they belong to. Cut lengths
+    come from the lookup tables of the shared `Pipe` instances. Results match
+    the `Tube` properties up to floating point summation order.
+    """
+
+    pipes: list[Pipe]
+    pipe_index: np.ndarray
+    item_index: np.ndarray
+    item_counts: np.ndarray
+    length: np.ndarray
+    cuts_count: np.ndarray
+    cuts_length: np.ndarray
+    cuts_welding_length: np.ndarray
+    hole_tube: np.ndarray
+    hole_length: np.ndarray
+    hole_count: np.ndarray
+    hole_through: np.ndarray
+    bended_cut_tube: np.ndarray
+    bended_cut_length: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+    @classmethod
+    def from_tubes(cls, tubes: Iterable[Tube]) -> "TubeTable":
+        return cls._build([(tube, 0) for tube in tubes], [1])
+
+    @classmethod
+    def from_item(cls, item: TubeItem) -> "TubeTable":
+        return cls.from_tubes(item.tubes)
+
+    @classmethod
+    def from_order(cls, order: Order) -> "TubeTable":
+        rows: list[tuple[Tube, int]] = []
+        for index, item in enumerate(order.items):
+            for tube in getattr(item, "tubes", ()):
+                rows.append((tube, index))
+        return cls._build(rows, [item.count for item in order.items])
+
+    @classmethod
+    def _build(
+        cls, rows: list[tuple[Tube, int]], item_counts: list[int]
+    ) -> "TubeTable":
+        pipes: list[Pipe] = []
+        pipe_ids: dict[int, int] = {}
+
+        count = len(rows)
+        pipe_index = np.empty(count, dtype=np.intp)
+        item_index = np.empty(count, dtype=np.intp)
+        length = np.empty(count, dtype=np.float64)
+        cuts_count = np.empty(count, dtype=np.int64)
+        cuts_length = np.empty(count, dtype=np.float64)
+        cuts_welding_length = np.empty(count, dtype=np.float64)
+        hole_tube: list[int] = []
+        hole_length: list[float] = []
+        hole_count: list[int] = []
+        hole_through: list[bool] = []
+        bended_cut_tube: list[int] = []
+        bended_cut_length: list[float] = []
+
+        for index, (tube, item) in enumerate(rows):
+            pipe = tube.pipe
+            pipe_id = pipe_ids.get(id(pipe))
+            if pipe_id is None:
+                pipe_id = pipe_ids[id(pipe)] = len(pipes)
+                pipes.append(pipe)
+            pipe_index[index] = pipe_id
+            item_index[index] = item
+            length[index] = tube.length
+
+            count_ = 0
+            total = 0.0
+            welding = 0.0
+            for cut in (tube.left_cut, tube.right_cut):
+                if cut is None:
+                    continue
+                value = pipe.get_cut_length(cut)
+                count_ += 1
+                total += value
+                welding += value * cut.welding_ratio
+            cuts_count[index] = count_
+            cuts_length[index] = total
+            cuts_welding_length[index] = welding
+
+            for hole in tube.holes:
+                hole_tube.append(index)
+                hole_length.append(hole.length)
+                hole_count.append(hole.count)
+                hole_through.append(hole.through)
+
+            bended_cut_tube.extend([index] * len(tube.bended_cuts))
+            bended_cut_length.extend(
+                pipe.get_cut_lengths(tube.bended_cuts, bended=True)
+            )
+
+        return cls(
+            pipes=pipes,
+            pipe_index=pipe_index,
+            item_index=item_index,
+            item_counts=np.asarray(item_counts, dtype=np.int64),
+            length=length,
+            cuts_count=cuts_count,
+            cuts_length=cuts_length,
+            cuts_welding_length=cuts_welding_length,
+            hole_tube=np.asarray(hole_tube, dtype=np.intp),
+            hole_length=np.asarray(hole_length, dtype=np.float64),
+            hole_count=np.asarray(hole_count, dtype=np.int64),
+            hole_through=np.asarray(hole_through, dtype=bool),
+            bended_cut_tube=np.asarray(bended_cut_tube, dtype=np.intp),
+            bended_cut_length=np.asarray(bended_cut_length, dtype=np.float64),
+        )
+
+    def _pipe_column(self, name: str) -> np.ndarray:
+        values = np.fromiter(
+            (getattr(pipe, name) for pipe in self.pipes),
+            dtype=np.float64,
+            count=len(self.pipes),
+        )
+        return values[self.pipe_index]
+
+    def _per_tube(self, owners: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        return np.bincount(owners, weights=weights, minlength=len(self))
+
+    @property
+    def incuts_count(self) -> np.ndarray:
+        holes = self.hole_count * np.where(self.hole_through, 2, 1)
+        bended = np.bincount(self.bended_cut_tube, minlength=len(self))
+        return (
+            self.cuts_count
+            + self._per_tube(self.hole_tube, holes).astype(np.int64)
+            + bended
+        )
+
+    @property
+    def cutting_length(self) -> np.ndarray:
+        holes = (
+            self.hole_length
+            * self.hole_count
+            * np.where(self.hole_through, 2, 1)
+        )
+        return (
+            self._per_tube(self.hole_tube, holes)
+            + self._per_tube(self.bended_cut_tube, self.bended_cut_length)
+            + self.cuts_length
+        )
+
+    @property
+    def welding_length(self) -> np.ndarray:
+        return self.cuts_welding_length + self._per_tube(
+            self.bended_cut_tube, self.bended_cut_length / 2
+        )
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.length * self._pipe_column("perimeter")
+
+    @property
+    def cutting_cost(self) -> np.ndarray:
+        return (
+            self.incuts_count * self._pipe_column("incut_cost")
+            + self.cutting_length * self._pipe_column("cutting_cost")
+        )
+
+    def item_totals(self, values: np.ndarray) -> np.ndarray:
+        return np.bincount(
+            self.item_index, weights=values, minlength=len(self.item_counts)
+        )
+
+    @property
+    def order_cutting_cost(self) -> float:
+        return float(self.item_totals(self.cutting_cost) @ self.item_counts)
+
+
+__all__ = ["TubeTable"]
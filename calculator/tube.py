@@ -1,10 +1,22 @@
-from dataclasses import dataclass, field
-
-from . import Pipe, Hole, Cut, Costs, Multipliers, Price
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+from typing import Any, Callable, Iterable
+
+from . import (
+    Cached,
+    Pipe,
+    Hole,
+    Cut,
+    Costs,
+    Multipliers,
+    Price,
+    TubePricing,
+    group_holes,
+)
 
 
 @dataclass
-class Tube:
+class Tube(Cached):
     pipe: Pipe
     length: float
     is_ours: bool = True
@@ -19,6 +31,8 @@ class Tube:
     bended_cuts: list[Cut] = field(default_factory=list[Cut])
     countersink_count: int = 0
 
+    _dependencies = ("pipe",)
+
     def __post_init__(self) -> None:
         self.price: Price | None = None
 
@@ -26,29 +40,81 @@ class Tube:
         return f"{self.length} {self.pipe}"
 
     @property
+    def shape(self) -> tuple[Any, ...]:
+        """Equal for tubes that cut and price the same, hashable but for
+        the pipe."""
+        return (
+            self.pipe,
+            self.length,
+            self.is_ours,
+            self.is_weld_cleaned,
+            self.is_bended,
+            self.is_cleaned,
+            tuple(self.holes),
+            self.left_cut,
+            self.right_cut,
+            self.extra_bending_count,
+            self.threading_count,
+            tuple(self.bended_cuts),
+            self.countersink_count,
+        )
+
+    @property
+    def hole_groups(self) -> list[Hole]:
+        return group_holes(self.holes)
+
+    @cached_property
     def bending_count(self) -> int:
         if not self.is_bended:
             return 0
         return len(self.bended_cuts) + self.extra_bending_count
 
-    @property
+    @cached_property
     def pipe_cost(self) -> float:
-        if not self.is_ours:
-            return 0.0
-        return self.pipe.cost * self.length
-    
-    @property
+        return self.get_pipe_cost(self.pipe)
+
+    @cached_property
     def carrying_cost(self) -> float:
-        return self.pipe.carrying_cost * self.length
+        return self.get_carrying_cost(self.pipe)
 
-    @property
+    @cached_property
     def cutting_cost(self) -> float:
+        return self.get_cutting_cost(self.pipe)
+
+    # `pipe` is `self.pipe` or the same pipe with other rates
+
+    def get_pipe_cost(self, pipe: Pipe) -> float:
+        if not self.is_ours:
+            return 0.0
+        return pipe.cost * self.length
+
+    def get_carrying_cost(self, pipe: Pipe) -> float:
+        return pipe.carrying_cost * self.length
+
+    def get_cutting_cost(self, pipe: Pipe) -> float:
         return (
-            self.incuts_count * self.pipe.incut_cost
-            + self.cutting_length * self.pipe.cutting_cost
+            self.incuts_count * pipe.incut_cost
+            + self.cutting_length * pipe.cutting_cost
         )
 
-    @property
+    def get_pricing(
+        self, count: int = 1, pipes: Callable[[Pipe], Pipe] | None = None
+    ) -> TubePricing:
+        """Costs of the tube, with the rates of `pipes(self.pipe)` if
+        given."""
+        if pipes is None:
+            pipe = self.pipe
+            costs = (self.pipe_cost, self.cutting_cost, self.carrying_cost)
+        else:
+            pipe = pipes(self.pipe)
+            costs = (
+                self.get_pipe_cost(pipe),
+                self.get_cutting_cost(pipe),
+                self.get_carrying_cost(pipe),
+            )
+        return TubePricing(str(pipe), self.length, count, *costs)
+
+    @cached_property
     def incuts_count(self) -> int:
         holes_count = 0
         for hole in self.holes:
@@ -63,40 +129,46 @@ class Tube:
             + len(self.bended_cuts)
         )
 
-    @property
+    @cached_property
     def cutting_length(self) -> float:
         result = 0.0
         for hole in self.holes:
             result += hole.length * hole.count * (2 if hole.through else 1)
-        result += sum(
-            self.pipe.get_bended_cut_length(cut) for cut in self.bended_cuts
-        )
+        result += sum(self.bended_cut_lengths)
         if self.left_cut is not None:
-            result += self.pipe.get_cut_length(self.left_cut)
+            result += self.left_cut_length
         if self.right_cut is not None:
-            result += self.pipe.get_cut_length(self.right_cut)
+            result += self.right_cut_length
         return result
 
-    @property
+    @cached_property
     def area(self) -> float:
         return self.length * self.pipe.perimeter
 
-    @property
+    @cached_property
+    def left_cut_length(self) -> float:
+        if self.left_cut is None:
+            return 0.0
+        return self.pipe.get_cut_length(self.left_cut)
+
+    @cached_property
+    def right_cut_length(self) -> float:
+        if self.right_cut is None:
+            return 0.0
+        return self.pipe.get_cut_length(self.right_cut)
+
+    @cached_property
+    def bended_cut_lengths(self) -> list[float]:
+        return self.pipe.get_cut_lengths(self.bended_cuts, bended=True)
+
+    @cached_property
     def welding_length(self) -> float:
         result = 0.0
         if self.left_cut is not None:
-            result += (
-                self.pipe.get_cut_length(self.left_cut)
-                * self.left_cut.welding_ratio
-            )
+            result += self.left_cut_length * self.left_cut.welding_ratio
         if self.right_cut is not None:
-            result += (
-                self.pipe.get_cut_length(self.right_cut)
-                * self.right_cut.welding_ratio
-            )
-        result += sum(
-            self.pipe.get_bended_cut_length(cut) / 2 for cut in self.bended_cuts
-        )
+            result += self.right_cut_length * self.right_cut.welding_ratio
+        result += sum(length / 2 for length in self.bended_cut_lengths)
         return result
 
     def calculate_price(
@@ -127,7 +199,46 @@ class Tube:
 
     def add_hole(self, hole: Hole) -> None:
         self.holes.append(hole)
+        self.invalidate()
 
     def add_bended_cuts(self, cut: Cut, count: int = 1) -> None:
         for _ in range(count):
             self.bended_cuts.append(cut)
+        self.invalidate()
+
+
+@dataclass
+class TubeGroup:
+    """Identical tubes of an item: one of them and how many there are."""
+
+    tube: Tube
+    count: int = 1
+
+    def __str__(self) -> str:
+        if self.count == 1:
+            return str(self.tube)
+        return f"{self.tube} - {self.count} шт"
+
+
+def group_tubes(tubes: Iterable[Tube]) -> list[TubeGroup]:
+    """Tubes with equal `Tube.shape` grouped, in the order they first occur.
+
+    Groups are found by a hash of the shape, with cuts and holes hashed as
+    they are and pipes by their field values, worked out once per pipe.
+    """
+    groups: dict[tuple[Any, ...], TubeGroup] = {}
+    # pipe and its key by id, the pipe keeps the id from being reused
+    pipes: dict[int, tuple[Pipe, tuple[Any, ...]]] = {}
+    for tube in tubes:
+        pipe, *shape = tube.shape
+        entry = pipes.get(id(pipe))
+        if entry is None:
+            values = (getattr(pipe, item.name) for item in fields(pipe))
+            entry = pipes[id(pipe)] = (pipe, (type(pipe), *values))
+        key = (entry[1], *shape)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = TubeGroup(tube)
+        else:
+            group.count += 1
+    return list(groups.values())
@@ -0,0 +1,82 @@
+import pytest
+
+from calculator import (
+    Costs,
+    Cut,
+    Multipliers,
+    Order,
+    RectHole,
+    RectPipe,
+    RoundHole,
+    SheetItem,
+    Tube,
+    TubeItem,
+)
+
+
+@pytest.fixture
+def costs() -> Costs:
+    return Costs(
+        welding=600 / 1000,
+        sundry=5,
+        cleaning=1000 / 1_000_000,
+        weld_cleaning=90 / 1000,
+        painting=260 / 1_000_000,
+        paint=280 / 1_000_000,
+        riveting=10,
+        bending=15,
+        countersink=20,
+        threading=20,
+        project=500,
+    )
+
+
+@pytest.fixture
+def multipliers() -> Multipliers:
+    return Multipliers(work=2.0, materials=1.3, manager=1.1, vat=1.2)
+
+
+@pytest.fixture
+def pipe() -> RectPipe:
+    return RectPipe(
+        width=100,
+        height=100,
+        thickness=4,
+        cost=1018 / 1000,
+        incut_cost=5,
+        cutting_cost=34 / 1000,
+        carrying_cost=75 / 1000,
+    )
+
+
+@pytest.fixture
+def order(pipe: RectPipe) -> Order:
+    """A tube item with three sheet items and a separate sheet item."""
+    return Order(
+        1,
+        "Заказ",
+        items=[
+            TubeItem(
+                "Рама",
+                count=3,
+                project_hours=1,
+                is_painted=True,
+                tubes=[
+                    Tube(
+                        pipe,
+                        4500,
+                        left_cut=Cut(45, welding_ratio=0.5),
+                        right_cut=Cut(90, welding_ratio=1),
+                        holes=[RectHole(98, 398), RoundHole(8, count=4)],
+                    ),
+                    Tube(pipe, 647, left_cut=Cut(90), right_cut=Cut(90)),
+                ],
+                sheet_items=[
+                    SheetItem("Фланец", 300, count=2),
+                    SheetItem("Заглушка", 150),
+                    SheetItem("Кронштейн", 75, bending_count=2),
+                ],
+            ),
+            SheetItem("Лист", 500, count=4),
+        ],
+    )
@@ -0,0 +1,78 @@
+import copy
+import datetime
+
+import numpy as np
+import pytest
+
+from calculator import Costs, Multipliers, Order, Portfolio, get_records
+
+DATES = [
+    datetime.date(2026, 1, 15),
+    None,
+    datetime.date(2026, 2, 3),
+    datetime.date(2026, 1, 20),
+    None,
+]
+
+
+@pytest.fixture
+def orders(
+    order: Order, costs: Costs, multipliers: Multipliers
+) -> list[Order]:
+    orders = []
+    for number, date in enumerate(DATES, 1):
+        dated = copy.deepcopy(order)
+        dated.number = number
+        dated.date = date
+        dated.calculate(costs, multipliers)
+        orders.append(dated)
+    return orders
+
+
+def test_orders_without_date_group_together(orders: list[Order]) -> None:
+    portfolio = Portfolio.from_orders(orders)
+
+    months = portfolio.group_by("orders", ["month"], "quantity")
+    assert [str(month) for month in months.keys["month"]] == [
+        "2026-01",
+        "2026-02",
+        "NaT",
+    ]
+    assert months.values["quantity"].tolist() == [2, 1, 2]
+
+    items = portfolio.group_by("items", ["month"], "quantity", None)
+    assert items.values["quantity"].tolist() == [2 * 7, 7, 2 * 7]
+
+
+def test_nested_rows_are_renumbered_without_copies(
+    orders: list[Order],
+) -> None:
+    records = get_records(orders)
+    portfolio = Portfolio(**records)
+
+    assert portfolio.tables["orders"] is records["orders"]
+    assert portfolio.tables["tubes"] is records["tubes"]
+    assert portfolio.get_size("items") == 2 * len(orders)
+    assert portfolio.get_size("sheet_items") == 3 * len(orders)
+
+    first_item = portfolio.get_column("orders", "first_item")
+    assert first_item.tolist() == list(range(0, 2 * len(orders), 2))
+    rows = first_item.tolist()
+    item = portfolio.get_column("tubes", "item")
+    assert item.tolist() == [row for row in rows for _ in range(2)]
+    parent = portfolio.get_column("sheet_items", "parent")
+    assert parent.tolist() == [row for row in rows for _ in range(3)]
+    first_sheet_item = portfolio.get_column("items", "first_sheet_item")
+    assert first_sheet_item[first_item].tolist() == list(
+        range(0, 3 * len(orders), 3)
+    )
+
+    totals = portfolio.operation_totals("final", ["order_number"])
+    by_order = {
+        number: final
+        for (number, operation), (final,) in totals.to_dict().items()
+        if operation == "total"
+    }
+    assert by_order == pytest.approx(
+        {order.number: portfolio.orders["final"][0] for order in orders}
+    )
@@ -0,0 +1,88 @@
+import io
+
+import numpy as np
+import pytest
+
+from calculator import PipeCatalog, RectPipe
+from calculator.catalog import KINDS, PROFILE_DTYPE
+
+CSV = """\
+type,width,height,diameter,thickness,cost,incut_cost,cutting_cost,\
+carrying_cost
+rect,100,100,,4,1.0,5,0.03,0.07
+rect,100,100,,3,0.8,5,0.03,0.07
+rect,60,120,,4,0.9,5,0.03,0.07
+rect,40,40,,2,0.3,5,0.03,0.07
+round,,,50,3,0.5,5,0.03,0.07
+"""
+
+
+def random_catalog(size: int, seed: int) -> PipeCatalog:
+    rng = np.random.default_rng(seed)
+    profiles = np.zeros(size, dtype=PROFILE_DTYPE)
+    profiles["kind"] = rng.integers(0, 2, size)
+    profiles["width"] = rng.integers(1, 40, size) * 5
+    profiles["height"] = np.where(
+        profiles["kind"] == 1,
+        profiles["width"],
+        rng.integers(1, 40, size) * 5,
+    )
+    profiles["thickness"] = rng.integers(1, 10, size)
+    profiles["cost"] = rng.integers(1, 4, size)
+    return PipeCatalog(profiles)
+
+
+def find_reference(
+    catalog: PipeCatalog,
+    pipe_type: str,
+    width: float,
+    height: float,
+    thickness: float | None,
+) -> int | None:
+    small, large = sorted((width, height))
+    candidates = []
+    for index, profile in enumerate(catalog.profiles):
+        sides = sorted((profile["width"], profile["height"]))
+        if (
+            profile["kind"] == KINDS.index(pipe_type)
+            and sides[0] >= small
+            and sides[1] >= large
+            and (thickness is None or profile["thickness"] >= thickness)
+        ):
+            candidates.append(
+                (sum(sides), profile["thickness"], profile["cost"], index)
+            )
+    return min(candidates)[-1] if candidates else None
+
+
+def test_find_larger() -> None:
+    catalog = PipeCatalog.from_csv(io.StringIO(CSV))
+
+    pipe = catalog.find_larger("rect", 110, 50)
+    assert isinstance(pipe, RectPipe)
+    assert (pipe.width, pipe.height) == (60, 120)
+    assert catalog.find_larger("rect", 90, 90) is catalog["100x100x3"]
+    assert catalog.find_larger("rect", 90, 90, 4) is catalog["100x100x4"]
+    assert catalog.find_larger("rect", 100, 100, 5) is None
+    assert catalog.find_larger("round", 40) is catalog["D50x3"]
+    assert catalog.find_larger("round", 60) is None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_larger_matches_a_scan(seed: int) -> None:
+    catalog = random_catalog(1000, seed)
+    rng = np.random.default_rng(seed + 100)
+    for _ in range(100):
+        pipe_type = KINDS[rng.integers(0, 2)]
+        width = float(rng.integers(1, 45) * 5)
+        height = float(rng.integers(1, 45) * 5)
+        if pipe_type == "round":
+            height = width
+        thickness = None if rng.random() < 0.3 else float(rng.integers(1, 11))
+
+        index = find_reference(catalog, pipe_type, width, height, thickness)
+        pipe = catalog.find_larger(pipe_type, width, height, thickness)
+        if index is None:
+            assert pipe is None
+        else:
+            assert pipe is catalog.get_pipe(index)
@@ -0,0 +1,56 @@
+import csv
+from pathlib import Path
+
+from calculator import (
+    Costs,
+    Multipliers,
+    Order,
+    TubeItem,
+    export_orders,
+    get_order_rows,
+)
+
+
+def test_order_rows_include_nested_sheet_items(
+    order: Order, costs: Costs, multipliers: Multipliers
+) -> None:
+    order.calculate(costs, multipliers)
+    tables = get_order_rows(order)
+
+    items = tables["items"]
+    assert len(items) == 2 + 3
+    assert [row[2] for row in items] == [-1, -1, 0, 0, 0]
+    assert [row[1] for row in items] == [0, 1, 2, 3, 4]
+    tube_item = order.items[0]
+    assert isinstance(tube_item, TubeItem)
+    assert [row[3] for row in items[2:]] == [
+        sheet.name for sheet in tube_item.sheet_items
+    ]
+
+    operations = tables["operations"]
+    priced = [*order.items, *tube_item.sheet_items]
+    assert len(operations) == sum(len(item.prices) for item in priced)
+    assert {row[1] for row in operations} == set(range(5))
+
+    (order_row,) = tables["orders"]
+    assert order_row[2] == 2
+    assert order_row[-1] == sum(
+        item.prices["total"].final * item.count for item in order.items
+    )
+
+
+def test_export_counts_nested_rows(
+    order: Order, costs: Costs, multipliers: Multipliers, tmp_path: Path
+) -> None:
+    order.calculate(costs, multipliers)
+    operations = len(get_order_rows(order)["operations"])
+    counts = export_orders([order], tmp_path)
+    assert counts == {
+        "orders": 1,
+        "items": 5,
+        "tubes": 2,
+        "operations": operations,
+    }
+    with (tmp_path / "items.csv").open(encoding="utf-8") as fp:
+        rows = list(csv.DictReader(fp))
+    assert [row["parent"] for row in rows] == ["-1", "-1", "0", "0", "0"]
@@ -0,0 +1,77 @@
+import io
+from typing import Any
+
+import pytest
+
+from calculator import (
+    Costs,
+    Multipliers,
+    Order,
+    OrderLoader,
+    calculate_specs,
+    iter_csv_specs,
+)
+
+PIPE = {
+    "type": "rect",
+    "width": 40,
+    "height": 20,
+    "thickness": 2,
+    "cost": 1.0,
+    "incut_cost": 5,
+    "cutting_cost": 0.03,
+    "carrying_cost": 0.06,
+}
+
+CSV = """\
+kind,number,name,count,pipe_type,width,height,thickness,cost,incut_cost,\
+cutting_cost,carrying_cost,length,left_angle,left_side,sheet_cost
+order,1,Заказ,,,,,,,,,,,,,
+tube_item,,Рама,2,,,,,,,,,,,,
+tube,,,,rect,100,40,3,1.0,5,0.03,0.06,1000,45,{side},
+sheet,,Косынка,4,,,,,,,,,,,,150
+"""
+
+
+def make_spec(number: int, **item: Any) -> dict[str, Any]:
+    tube = {"pipe": PIPE, "length": 1000, **item.pop("tube", {})}
+    return {
+        "number": number,
+        "name": f"Заказ {number}",
+        "items": [
+            {
+                "type": "tube",
+                "name": "Рама",
+                "tubes": [tube],
+                **item,
+            }
+        ],
+    }
+
+
+def test_arithmetic_errors_are_reported_per_order(
+    costs: Costs, multipliers: Multipliers
+) -> None:
+    specs = [
+        make_spec(1, count=0, project_hours=1),
+        make_spec(2, tube={"left_cut": {"angle": 0}}),
+        make_spec(3, count=2),
+    ]
+    results = list(calculate_specs(specs, costs, multipliers))
+    assert [result["number"] for result in results[:2]] == [1, 2]
+    assert all(
+        result["error"].startswith("ZeroDivisionError")
+        for result in results[:2]
+    )
+    assert isinstance(results[2], Order) and results[2].number == 3
+
+
+def test_csv_literal_columns_are_checked() -> None:
+    (spec,) = iter_csv_specs(io.StringIO(CSV.format(side="height")))
+    tube = spec["items"][0]["tubes"][0]
+    assert tube["left_cut"] == {"angle": 45, "side": "height"}
+    order = OrderLoader().get_order(spec)
+    assert order.items[0].tubes[0].left_cut.side == "height"
+
+    with pytest.raises(ValueError, match="'depth' is not one of"):
+        list(iter_csv_specs(io.StringIO(CSV.format(side="depth"))))
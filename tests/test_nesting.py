@@ -0,0 +1,183 @@
+import random
+
+import pytest
+
+from calculator import (
+    Order,
+    SheetItem,
+    StockSheet,
+    TubeItem,
+    pack_rectangles,
+    plan_order_sheets,
+)
+from calculator.nesting import EPSILON, Placement, _Skyline
+
+
+def random_sizes(seed: int, count: int) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    return [
+        (rng.uniform(20, 400), rng.uniform(20, 400)) for _ in range(count)
+    ]
+
+
+def first_fit(
+    sizes: list[tuple[float, float]],
+    width: float,
+    height: float,
+    rotate: bool = True,
+) -> list[list[Placement]]:
+    """Every part tried on every earlier sheet, without the sheet index
+    and the closing of `pack_rectangles`."""
+    order = sorted(
+        range(len(sizes)),
+        key=lambda index: (max(sizes[index]), min(sizes[index])),
+        reverse=True,
+    )
+    sheets: list[_Skyline] = []
+    placements: list[list[Placement]] = []
+    for index in order:
+        part_width, part_height = sizes[index]
+        for sheet, placed in zip(sheets, placements):
+            found = sheet.find(part_width, part_height, rotate)
+            if found is not None:
+                break
+        else:
+            sheet = _Skyline(width, height)
+            sheets.append(sheet)
+            placed = []
+            placements.append(placed)
+            found = sheet.find(part_width, part_height, rotate)
+            assert found is not None
+        segment, x, y, rotated = found
+        if rotated:
+            sheet.place(segment, part_height, part_width, y)
+        else:
+            sheet.place(segment, part_width, part_height, y)
+        placed.append((index, x, y, rotated))
+    return placements
+
+
+def check_placements(
+    sizes: list[tuple[float, float]],
+    placements: list[list[Placement]],
+    width: float,
+    height: float,
+) -> None:
+    indexes = sorted(index for placed in placements for index, *_ in placed)
+    assert indexes == list(range(len(sizes)))
+    for placed in placements:
+        rects = []
+        for index, x, y, rotated in placed:
+            part_width, part_height = sizes[index]
+            if rotated:
+                part_width, part_height = part_height, part_width
+            assert x >= -EPSILON and y >= -EPSILON
+            assert x + part_width <= width + 1e-6
+            assert y + part_height <= height + 1e-6
+            rects.append((x, y, x + part_width, y + part_height))
+        rects.sort()
+        for position, first in enumerate(rects):
+            for second in rects[position + 1 :]:
+                if second[0] >= first[2] - 1e-6:
+                    break
+                assert (
+                    second[1] >= first[3] - 1e-6
+                    or first[1] >= second[3] - 1e-6
+                ), (first, second)
+
+
+@pytest.mark.parametrize("rotate", [True, False])
+@pytest.mark.parametrize("seed", range(5))
+def test_placements_stay_on_the_sheet_without_overlaps(
+    seed: int, rotate: bool
+) -> None:
+    sizes = random_sizes(seed, 400)
+    placements = pack_rectangles(sizes, 1500, 3000, rotate)
+    check_placements(sizes, placements, 1500, 3000)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_no_more_sheets_than_first_fit(seed: int) -> None:
+    sizes = random_sizes(seed, 600)
+    placements = pack_rectangles(sizes, 1500, 3000)
+    expected = first_fit(sizes, 1500, 3000)
+    assert len(placements) <= len(expected)
+    assert placements == expected
+
+
+@pytest.mark.parametrize(
+    "sizes, sheets",
+    [
+        ([(500, 500)] * 4, 1),
+        ([(500, 500)] * 5, 2),
+        ([(1000, 400)] * 5, 3),
+        ([(500, 1000), (500, 500), (500, 500)], 1),
+        ([(400, 1000)] * 2 + [(600, 600)], 2),
+        ([(999, 999), (10, 10)], 2),
+    ],
+)
+def test_sheet_counts_on_fixed_inputs(
+    sizes: list[tuple[float, float]], sheets: int
+) -> None:
+    placements = pack_rectangles(sizes, 1000, 1000)
+    check_placements(sizes, placements, 1000, 1000)
+    assert len(placements) == sheets
+
+
+def test_part_larger_than_the_sheet() -> None:
+    with pytest.raises(ValueError):
+        pack_rectangles([(100, 100), (1200, 50)], 1000, 1000)
+
+
+def test_apply_keeps_the_material_cost() -> None:
+    rng = random.Random(1)
+    items = [
+        SheetItem(
+            f"Фланец {index}",
+            0,
+            width=rng.choice([80, 150, 200, 333]),
+            height=rng.choice([60, 100, 420]),
+            thickness=rng.choice([2, 3]),
+            count=rng.randint(1, 20),
+        )
+        for index in range(40)
+    ]
+    frame = TubeItem(
+        "Рама",
+        count=5,
+        sheet_items=[
+            SheetItem(
+                "Косынка", 0, width=100, height=100, thickness=3, count=4
+            )
+        ],
+    )
+    order = Order(1, "Заказ", items=[*items, frame])
+    stock = [
+        StockSheet(width, height, thickness, width * height * thickness / 1e4)
+        for thickness in (2, 3)
+        for width, height in ((1250, 2500), (1500, 3000))
+    ]
+    plan = plan_order_sheets(order, stock, spacing=5)
+    for thickness_plan in plan.thicknesses:
+        sizes = [(part.width, part.height) for part in thickness_plan.parts]
+        placements = [
+            [
+                (index, part.x, part.y, part.rotated)
+                for index, part in enumerate(thickness_plan.parts)
+                if part.sheet == sheet
+            ]
+            for sheet in range(thickness_plan.sheet_count)
+        ]
+        check_placements(
+            sizes,
+            placements,
+            thickness_plan.stock.width,
+            thickness_plan.stock.height,
+        )
+
+    plan.apply()
+    sheet_costs = sum(item.sheet_cost * item.count for item in items) + sum(
+        sheet.sheet_cost * sheet.count * frame.count
+        for sheet in frame.sheet_items
+    )
+    assert sheet_costs == pytest.approx(plan.material_cost)
@@ -0,0 +1,38 @@
+import copy
+
+import pytest
+
+from calculator import Costs, Multipliers, Order, SheetItem
+
+
+def get_totals(order: Order) -> list[float]:
+    return [item.prices["total"].final for item in order.items]
+
+
+def test_recalculate_after_items_changed_in_place(
+    order: Order, costs: Costs, multipliers: Multipliers
+) -> None:
+    order.minimum_cutting_cost = 10_000
+    order.calculate(costs, multipliers)
+
+    order.items.append(SheetItem("Косынка", 200, count=2))
+    order.recalculate()
+    assert len(order.summary.items) == 3
+    expected = copy.deepcopy(order)
+    expected.calculate(costs, multipliers)
+    assert get_totals(order) == pytest.approx(get_totals(expected))
+
+    # the cutting cost of the order is shared by the items left
+    order.items.pop(1)
+    order.recalculate()
+    assert len(order.summary.items) == 2
+    expected = copy.deepcopy(order)
+    expected.calculate(costs, multipliers)
+    assert get_totals(order) == pytest.approx(get_totals(expected))
+
+
+def test_item_cutting_prices_reject_another_summary(order: Order) -> None:
+    summary = order.summary
+    order.items.append(SheetItem("Косынка", 200))
+    with pytest.raises(ValueError):
+        list(order.get_item_cutting_prices(summary))
@@ -0,0 +1,55 @@
+import copy
+import threading
+from typing import Iterator
+
+import pytest
+
+from calculator import Costs, Multipliers, Order, calculate_many
+
+
+def get_prices(order: Order) -> list[object]:
+    return [
+        (item.prices, [sheet.prices for sheet in item.sheet_items])
+        if hasattr(item, "sheet_items")
+        else item.prices
+        for item in order.items
+    ]
+
+
+@pytest.fixture
+def running_thread() -> Iterator[None]:
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_calculate_many_matches_calculate(
+    request: pytest.FixtureRequest,
+    order: Order,
+    costs: Costs,
+    multipliers: Multipliers,
+    threaded: bool,
+) -> None:
+    if threaded:
+        request.getfixturevalue("running_thread")
+    orders = []
+    for number in range(1, 6):
+        copied = copy.deepcopy(order)
+        copied.number = number
+        copied.items[1].count = number
+        orders.append(copied)
+    expected = copy.deepcopy(orders)
+    for reference in expected:
+        reference.calculate(costs, multipliers)
+
+    result = calculate_many(orders, costs, multipliers, workers=2)
+
+    assert result.workers == 2
+    assert len(result.orders) == len(orders)
+    for priced, reference in zip(orders, expected):
+        assert not priced.is_dirty
+        assert get_prices(priced) == get_prices(reference)
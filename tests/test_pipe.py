@@ -0,0 +1,40 @@
+import sys
+import threading
+
+import pytest
+
+from calculator import Cut, RectPipe
+
+
+def test_cut_lengths_evict_under_concurrent_use(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pipe = RectPipe(1.0, 3, 5, 0.03, 0.06, width=100, height=40)
+    monkeypatch.setattr(RectPipe, "cut_lengths_limit", 8)
+    errors: list[BaseException] = []
+
+    def measure(offset: int) -> None:
+        try:
+            for step in range(2000):
+                cut = Cut((step + offset) % 89 + 1, side="width")
+                assert pipe.get_cut_length(cut) == pipe.calculate_cut_length(
+                    cut
+                )
+        except BaseException as error:
+            errors.append(error)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=measure, args=(offset,))
+            for offset in range(16)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    assert len(pipe.cut_lengths) <= 8 + len(threads)
@@ -0,0 +1,92 @@
+import copy
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from calculator import Costs, Multipliers, Order, PriceCache, SheetItem
+from calculator.price_cache import FORMAT_VERSION
+
+
+def get_prices(order: Order) -> list[object]:
+    return [
+        (item.prices, [sheet.prices for sheet in item.sheet_items])
+        if hasattr(item, "sheet_items")
+        else item.prices
+        for item in order.items
+    ]
+
+
+def test_prices_survive_reopening(
+    tmp_path: Path, order: Order, costs: Costs, multipliers: Multipliers
+) -> None:
+    path = tmp_path / "prices.db"
+    cached = copy.deepcopy(order)
+    with PriceCache(path) as cache:
+        order.calculate(costs, multipliers, cache)
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    with PriceCache(path) as cache:
+        assert len(cache) == 2
+        cached.calculate(costs, multipliers, cache)
+        assert (cache.hits, cache.misses) == (2, 0)
+    assert get_prices(cached) == get_prices(order)
+    assert not any(item.is_dirty for item in cached.items)
+
+
+def test_other_format_version_drops_entries(
+    tmp_path: Path, order: Order, costs: Costs, multipliers: Multipliers
+) -> None:
+    path = tmp_path / "prices.db"
+    with PriceCache(path) as cache:
+        order.calculate(costs, multipliers, cache)
+    connection = sqlite3.connect(path)
+    connection.execute(f"PRAGMA user_version = {FORMAT_VERSION - 1}")
+    connection.close()
+
+    with PriceCache(path) as cache:
+        assert len(cache) == 0
+        order.calculate(costs, multipliers, cache)
+        assert (cache.hits, cache.misses) == (0, 2)
+    connection = sqlite3.connect(path)
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    connection.close()
+    assert version == FORMAT_VERSION
+
+
+def test_least_recently_used_entries_are_evicted(
+    costs: Costs, multipliers: Multipliers
+) -> None:
+    first = SheetItem("A", 100)
+    second = SheetItem("B", 200)
+    third = SheetItem("C", 300)
+    with PriceCache(max_entries=2) as cache:
+        first.calculate_price(0.0, costs, multipliers, cache)
+        second.calculate_price(0.0, costs, multipliers, cache)
+        # using the first entry leaves the second the least recent one
+        assert cache.load(first, 0.0, costs, multipliers)
+        third.calculate_price(0.0, costs, multipliers, cache)
+
+        assert len(cache) == 2
+        assert cache.load(first, 0.0, costs, multipliers)
+        assert cache.load(third, 0.0, costs, multipliers)
+        assert not cache.load(second, 0.0, costs, multipliers)
+
+
+def test_stats(order: Order, costs: Costs, multipliers: Multipliers) -> None:
+    with PriceCache() as cache:
+        assert cache.hit_rate == 0.0
+        order.calculate(costs, multipliers, cache)
+        copy.deepcopy(order).calculate(costs, multipliers, cache)
+        copy.deepcopy(order).calculate(costs, multipliers, cache)
+
+        assert cache.stats() == {
+            "hits": 4,
+            "misses": 2,
+            "hit_rate": pytest.approx(4 / 6),
+            "entries": 2,
+            "max_entries": 100_000,
+        }
+        assert str(cache) == (
+            "кэш цен: 4 попаданий, 2 промахов (66.7%), 2 записей"
+        )
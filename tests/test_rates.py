@@ -0,0 +1,59 @@
+import datetime
+from dataclasses import asdict, replace
+
+from calculator import (
+    Costs,
+    Cut,
+    Multipliers,
+    Order,
+    PipeRates,
+    RateCard,
+    RectPipe,
+    Tube,
+    TubeItem,
+)
+
+
+def make_pipe(width: float, height: float) -> RectPipe:
+    return RectPipe(1.0, 3, 5, 0.03, 0.06, width=width, height=height)
+
+
+def test_card_pipes_keep_their_geometry(
+    costs: Costs, multipliers: Multipliers
+) -> None:
+    wide, tall = make_pipe(100, 40), make_pipe(40, 100)
+    assert str(wide) == str(tall)
+    rates = PipeRates(
+        cost=2.0, incut_cost=7, cutting_cost=0.05, carrying_cost=0.1
+    )
+    card = RateCard(
+        datetime.date(2025, 1, 1), costs, multipliers, {str(wide): rates}
+    )
+
+    priced_wide, priced_tall = card.get_pipe(wide), card.get_pipe(tall)
+    assert (priced_wide.width, priced_wide.height) == (100, 40)
+    assert (priced_tall.width, priced_tall.height) == (40, 100)
+    assert priced_wide.cost == priced_tall.cost == 2.0
+    assert card.get_pipe(wide) is priced_wide
+    assert card.get_pipe(priced_tall) is priced_tall
+
+    def make_order(first: RectPipe, second: RectPipe) -> Order:
+        cut = Cut(45, side="width")
+        return Order(
+            1,
+            "Заказ",
+            items=[
+                TubeItem(
+                    "Рама",
+                    tubes=[
+                        Tube(first, 1000, left_cut=cut, right_cut=Cut(90)),
+                        Tube(second, 1000, left_cut=cut, right_cut=Cut(90)),
+                    ],
+                )
+            ],
+        )
+
+    expected = make_order(
+        replace(wide, **asdict(rates)), replace(tall, **asdict(rates))
+    ).get_pricing(costs, multipliers)
+    assert card.get_pricing(make_order(wide, tall)) == expected
@@ -0,0 +1,50 @@
+import copy
+from dataclasses import replace
+
+import pytest
+
+from calculator import Costs, Multipliers, Order, OrderQuantities
+
+
+def test_evaluate_matches_calculate(
+    order: Order, costs: Costs, multipliers: Multipliers
+) -> None:
+    costs_cards = [
+        costs,
+        replace(costs, welding=costs.welding * 1.5, paint=0),
+        replace(costs, sundry=9, bending=0.5, project=800),
+    ]
+    multipliers_cards = [
+        multipliers,
+        replace(multipliers, work=1.4, materials=1.05, vat=1.0),
+    ]
+    scenarios = OrderQuantities.from_order(order).evaluate(
+        costs_cards, multipliers_cards
+    )
+
+    for costs_index, costs_card in enumerate(costs_cards):
+        for multipliers_index, multipliers_card in enumerate(
+            multipliers_cards
+        ):
+            calculated = copy.deepcopy(order)
+            calculated.calculate(costs_card, multipliers_card)
+            for item_index, item in enumerate(calculated.items):
+                prices = scenarios.get_breakdown(
+                    costs_index, multipliers_index, item_index
+                )
+                assert set(prices) == set(item.prices)
+                for operation in item.prices:
+                    assert prices[operation].cost == pytest.approx(
+                        item.prices[operation].cost
+                    )
+                    assert prices[operation].final == pytest.approx(
+                        item.prices[operation].final
+                    )
+            assert scenarios.order_totals[
+                costs_index, multipliers_index
+            ] == pytest.approx(
+                sum(
+                    item.prices["total"].final * item.count
+                    for item in calculated.items
+                )
+            )
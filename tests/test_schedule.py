@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from calculator import (
+    LaserMachine,
+    Order,
+    assign_longest_first,
+    improve_assignment,
+    schedule_cutting,
+)
+
+
+def random_times(seed: int, jobs: int, machines: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    speeds = rng.uniform(0.5, 2.0, machines)
+    times = rng.lognormal(3, 1, jobs)[:, None] / speeds[None, :]
+    # some jobs only some machines cut, a few none
+    times[rng.random(times.shape) < 0.2] = np.inf
+    return times
+
+
+def makespan(times: np.ndarray, assignment: np.ndarray) -> float:
+    loads = np.zeros(times.shape[1])
+    for job, machine in enumerate(assignment.tolist()):
+        if machine >= 0:
+            loads[machine] += times[job, machine]
+    return float(loads.max(initial=0.0))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_local_search_never_lengthens_the_schedule(seed: int) -> None:
+    times = random_times(seed, 60 + seed * 10, 2 + seed % 4)
+    initial = assign_longest_first(times)
+    improved = improve_assignment(times, initial)
+    assert makespan(times, improved) <= makespan(times, initial) + 1e-9
+
+    # the same jobs stay assigned, each to a machine that cuts it
+    assert np.array_equal(improved < 0, initial < 0)
+    assigned = np.flatnonzero(improved >= 0)
+    assert np.isfinite(times[assigned, improved[assigned]]).all()
+    assert (~np.isfinite(times[improved < 0])).all()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_every_iteration_keeps_the_makespan(seed: int) -> None:
+    times = random_times(seed, 80, 3)
+    assignment = assign_longest_first(times)
+    previous = makespan(times, assignment)
+    for _ in range(20):
+        assignment = improve_assignment(times, assignment, max_iterations=1)
+        current = makespan(times, assignment)
+        assert current <= previous + 1e-9
+        previous = current
+
+
+def test_machines_without_speed_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        LaserMachine("Стоп", cutting_speed=0)
+    with pytest.raises(ValueError):
+        LaserMachine("Назад", cutting_speed=10, pierce_time=-1)
+
+
+def test_schedule_without_machines(order: Order) -> None:
+    schedule = schedule_cutting([order], [])
+    assert schedule.machines == []
+    assert schedule.makespan == 0.0
+    assert len(schedule.unassigned) == 2
+
+
+def test_schedule_covers_every_job(order: Order) -> None:
+    machines = [LaserMachine("Один", 20, 1.0), LaserMachine("Два", 10, 0.5)]
+    schedule = schedule_cutting([order], machines)
+    assert not schedule.unassigned
+    assert sum(len(machine.jobs) for machine in schedule.machines) == 2
+    assert schedule.makespan > 0
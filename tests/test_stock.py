@@ -0,0 +1,105 @@
+import random
+
+import pytest
+
+from calculator import (
+    Order,
+    RectPipe,
+    StockPiece,
+    Tube,
+    TubeItem,
+    pack_bars,
+    plan_order_stock,
+    plan_profile_stock,
+)
+
+# best-fit decreasing needs three bins, two of 49 + 26 + 25 suffice
+TIGHT = [49, 49, 26, 26, 25, 25]
+
+
+def check_bins(
+    sizes: list[float], capacity: float, bins: list[list[int]]
+) -> None:
+    assert sorted(piece for bin in bins for piece in bin) == list(
+        range(len(sizes))
+    )
+    for bin in bins:
+        assert bin
+        assert sum(sizes[piece] for piece in bin) <= capacity + 1e-9
+
+
+def make_pipe() -> RectPipe:
+    return RectPipe(1.0, 3, 5, 0.03, 0.06, width=40, height=20)
+
+
+def test_branch_and_bound_finds_the_optimum() -> None:
+    bins = pack_bars(TIGHT, 100)
+    check_bins(TIGHT, 100, bins)
+    assert len(bins) == 2
+
+
+def test_best_fit_decreasing_without_the_exact_search() -> None:
+    bins = pack_bars(TIGHT, 100, exact_limit=0)
+    check_bins(TIGHT, 100, bins)
+    assert len(bins) == 3
+
+
+def test_exact_search_respects_the_node_limit() -> None:
+    bins = pack_bars(TIGHT, 100, node_limit=1)
+    check_bins(TIGHT, 100, bins)
+    assert len(bins) == 3
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_fit_decreasing_on_many_pieces(seed: int) -> None:
+    rng = random.Random(seed)
+    sizes = [rng.uniform(200, 4000) for _ in range(300)]
+    bins = pack_bars(sizes, 6000)
+    check_bins(sizes, 6000, bins)
+    # each bin but one is more than half full, or two would fit in one
+    assert len(bins) < 2 * sum(sizes) / 6000 + 1
+
+
+def test_empty_and_exact_inputs() -> None:
+    assert pack_bars([], 100) == []
+    assert pack_bars([50, 50, 100], 100) in ([[2], [0, 1]], [[2], [1, 0]])
+
+
+def test_zero_capacity_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        pack_bars([1.0], 0)
+
+
+def test_zero_length_pieces_are_rejected() -> None:
+    pipe = make_pipe()
+    pieces = [StockPiece(Tube(pipe, 0), 0.0)]
+    with pytest.raises(ValueError):
+        plan_profile_stock(pipe, pieces, [6000])
+
+
+def test_piece_costs_add_up_to_the_material_cost() -> None:
+    pipe = make_pipe()
+    tubes = [Tube(pipe, length) for length in (4500, 2500, 1700, 1200, 800)]
+    order = Order(
+        1,
+        "Заказ",
+        items=[
+            TubeItem("Рама", count=3, tubes=tubes[:3]),
+            TubeItem("Стойка", count=2, tubes=tubes[3:]),
+        ],
+    )
+    plan = plan_order_stock(order, (6000, 12000), kerf=3)
+    (profile,) = plan.profiles
+    assert sum(piece.cost for piece in profile.pieces) == pytest.approx(
+        plan.material_cost
+    )
+    for bar in profile.bars:
+        used = sum(profile.pieces[piece].length + 3 for piece in bar)
+        assert used <= profile.bar_length + 3 + 1e-9
+    total = sum(
+        plan.get_tube_cost(tube) * item.count
+        for item in order.items
+        for tube in item.tubes
+    )
+    assert total == pytest.approx(plan.material_cost)
+    assert plan.get_tube_cost(Tube(pipe, 100)) == 0.0
@@ -0,0 +1,35 @@
+from calculator import Cut, RectPipe, RoundHole, Tube, group_tubes
+
+
+def make_pipe() -> RectPipe:
+    return RectPipe(1.0, 3, 5, 0.03, 0.06, width=100, height=40)
+
+
+def test_group_tubes_by_shape() -> None:
+    pipe = make_pipe()
+    tubes = [
+        Tube(pipe, 1000, holes=[RoundHole(8)]),
+        Tube(pipe, 1000),
+        Tube(make_pipe(), 1000, holes=[RoundHole(8)]),
+        Tube(pipe, 1000, left_cut=Cut(45)),
+        Tube(pipe, 1000, holes=[RoundHole(8, count=2)]),
+        Tube(pipe, 1000),
+    ]
+    groups = group_tubes(tubes)
+    assert [(group.tube, group.count) for group in groups] == [
+        (tubes[0], 2),
+        (tubes[1], 2),
+        (tubes[3], 1),
+        (tubes[4], 1),
+    ]
+
+
+def test_group_many_tubes_of_one_length() -> None:
+    pipe = make_pipe()
+    tubes = [
+        Tube(pipe, 6000, holes=[RoundHole(8, count=count)])
+        for count in range(2000)
+    ]
+    groups = group_tubes(tubes + tubes)
+    assert [group.tube for group in groups] == tubes
+    assert {group.count for group in groups} == {2}